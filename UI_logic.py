@@ -1,6 +1,124 @@
+import threading
+from collections import OrderedDict
+
 import logic
 
+class CacheResultados:
+    # LRU acotada compartida por todas las entradas de UILogic:
+    # texto normalizado -> [árbol o error, final, pasos]. Cada expresión
+    # distinta se parsea y se simplifica una sola vez mientras siga en caché.
+    # pasos es None si solo se pidió el resultado (sin registrar pasos).
+    # Con un almacen.AlmacenResultados detrás, lo que no está en memoria se
+    # busca en disco y lo calculado se guarda también allí. Las expresiones
+    # nuevas comparten un logic.MemoSubarboles: al editar una expresión solo
+    # se rehace lo que cambió.
+    def __init__(self, max_entradas=256, almacen=None, subarboles=None):
+        self.max_entradas = max_entradas
+        self.almacen = almacen
+        self.subarboles = logic.MemoSubarboles() if subarboles is None else subarboles
+        self._candado_memo = threading.Lock()
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _entrada(self, clave):
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+            return entrada
+
+    def _guardar(self, clave, entrada):
+        with self._candado:
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def _contar(self, acierto):
+        with self._candado:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+    @staticmethod
+    def _nueva(clave):
+        try:
+            return [logic.parsear(clave), None, None, None]
+        except Exception as err:
+            return [None, str(err), None, None]
+
+    def parseo(self, expr):
+        # (árbol, None) o (None, mensaje de error)
+        clave = logic.normalizar(expr)
+        entrada = self._entrada(clave)
+        self._contar(entrada is not None)
+        if entrada is None:
+            entrada = self._nueva(clave)
+            self._guardar(clave, entrada)
+        return entrada[0], entrada[1]
+
+    def simplificacion(self, expr, detener=None, observar=None):
+        # (final, pasos), como logic.simplificar_expresion; si `detener`
+        # interrumpe el cálculo (logic.Cancelado) no se guarda nada.
+        # `observar` recibe la Traza mientras se llena (solo si se calcula)
+        return self._simplificar(expr, detener, traza=True, observar=observar)
+
+    def final(self, expr, detener=None):
+        # solo el resultado: sin registro de pasos si no estaba ya en caché
+        return self._simplificar(expr, detener, traza=False)[0]
+
+    def _simplificar(self, expr, detener, traza, observar=None):
+        clave = logic.normalizar(expr)
+        entrada = self._entrada(clave)
+        if entrada is not None and entrada[2] is not None and (entrada[3] is not None or not traza):
+            self._contar(True)
+            return entrada[2], entrada[3]
+        self._contar(False)
+        if entrada is None:
+            entrada = self._nueva(clave)
+        guardado = None
+        if self.almacen is not None and entrada[0] is not None:
+            guardado = self.almacen.obtener(clave, con_pasos=traza)
+        if entrada[0] is None:
+            entrada[2], entrada[3] = "error", [logic.Paso("entrada", "error parseo", entrada[1], "")]
+        elif guardado is not None:
+            entrada[2], entrada[3] = guardado
+        else:
+            with self._candado_memo:
+                entrada[2], entrada[3] = logic.simplificar_arbol(
+                    entrada[0], detener=detener, traza=traza, memo=self.subarboles, observar=observar
+                )
+            if self.almacen is not None:
+                self.almacen.guardar(clave, entrada[2], entrada[3])
+        self._guardar(clave, entrada)
+        return entrada[2], entrada[3]
+
+    def estadisticas(self):
+        with self._candado:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "disco": self.almacen.estadisticas() if self.almacen is not None else None,
+                "subarboles": self.subarboles.estadisticas(),
+            }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = self.fallos = 0
+        with self._candado_memo:
+            self.subarboles.limpiar()
+
 class UILogic:
+    cache = CacheResultados()
+
     @staticmethod
     def normalizar(expr):
         return logic.normalizar(expr)
@@ -10,18 +128,32 @@ class UILogic:
         # Solo verifica que no esté vacía y que no tenga símbolos raros
         if not expr:
             return False, "Expresión vacía."
-        try:
-            logic.parsear(expr)
-            return True, ""
-        except Exception as e:
-            return False, str(e)
+        _, error = UILogic.cache.parseo(expr)
+        if error is not None:
+            return False, error
+        return True, ""
 
     @staticmethod
-    def simplificar_pasos(expr):
-        final, pasos = logic.simplificar_expresion(expr)
+    def simplificar_pasos(expr, detener=None, observar=None):
+        _, pasos = UILogic.cache.simplificacion(expr, detener, observar)
         return pasos
 
     @staticmethod
-    def simplificar_final(expr):
-        final, pasos = logic.simplificar_expresion(expr)
-        return final
\ No newline at end of file
+    def simplificar_final(expr, detener=None):
+        return UILogic.cache.final(expr, detener)
+
+    @staticmethod
+    def estadisticas_cache():
+        return UILogic.cache.estadisticas()
+
+    @staticmethod
+    def usar_almacen(ruta):
+        # caché persistente en disco detrás de la de memoria
+        import almacen
+        UILogic.cache.almacen = almacen.AlmacenResultados(ruta)
+
+    @staticmethod
+    def cerrar_almacen():
+        if UILogic.cache.almacen is not None:
+            UILogic.cache.almacen.cerrar()
+            UILogic.cache.almacen = None
@@ -0,0 +1,227 @@
+# Caché persistente de simplificaciones en SQLite, para no repetir entre
+# ejecuciones (lote, interfaz) las expresiones que ya se vieron.
+#   - clave: texto normalizado (logic.normalizar) + modo (modo_leyes(), el
+#     mismo para lote y la interfaz) + versión del motor (hash de logic.py y
+#     de las leyes activas). Si cambia el motor o una ley, las filas viejas
+#     dejan de coincidir y se borran al abrir.
+#   - valor: forma final y pasos (JSON comprimido con zlib; NULL si solo se
+#     calculó el final).
+#   - escrituras por lotes: se acumulan en memoria y se vuelcan en una sola
+#     transacción cada `lote` entradas o al cerrar.
+#   - tamaño acotado: al volcar, si hay más de `max_entradas` filas se
+#     borran las de uso más antiguo.
+#   - lectores concurrentes: modo WAL y una conexión por hilo; varios
+#     procesos pueden leer mientras uno escribe.
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import logic
+
+MAX_ENTRADAS = 100_000
+LOTE_ESCRITURA = 64
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    version TEXT NOT NULL,
+    modo TEXT NOT NULL,
+    expresion TEXT NOT NULL,
+    final TEXT NOT NULL,
+    pasos BLOB,
+    usado REAL NOT NULL,
+    PRIMARY KEY (version, modo, expresion)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+"""
+
+
+def version_leyes(leyes=None):
+    # hash del código del motor (logic.py entero: reescribir, los índices de
+    # operandos, las condiciones de las leyes, los auxiliares...) y del código
+    # y el orden de las leyes activas: cambia si se edita cualquiera de ellos
+    # o se agrega, quita o reordena una ley
+    h = hashlib.sha256()
+    with open(logic.__file__, "rb") as f:
+        h.update(f.read())
+    for ley in leyes if leyes is not None else logic.boolean_laws:
+        h.update(ley.__name__.encode())
+        try:
+            h.update(inspect.getsource(ley).encode())
+        except (OSError, TypeError):
+            h.update(ley.__code__.co_code)
+    return h.hexdigest()[:16]
+
+
+def modo_leyes(max_pasos=logic.MAX_PASOS):
+    # modo de las simplificaciones del motor de leyes (con su tope de pasos);
+    # lote y la interfaz usan esta misma clave y comparten las filas
+    return f"leyes:{max_pasos}"
+
+
+def _empaquetar(pasos):
+    if pasos is None:
+        return None
+    # acepta Paso (o una Traza) y filas [antes, ley, despues, nota, ruta]
+    filas = [[p[0], p[1], p[2], p[3], list(p[4] if len(p) > 4 else getattr(p, "ruta", ()))] for p in pasos]
+    return zlib.compress(json.dumps(filas, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def _desempaquetar(blob):
+    if blob is None:
+        return None
+    return [logic.Paso(a, ley, d, nota, tuple(ruta)) for a, ley, d, nota, ruta in json.loads(zlib.decompress(blob))]
+
+
+class AlmacenResultados:
+    # con solo_lectura=True (procesos de un pool que solo consultan) no se
+    # crea el esquema ni se purgan versiones viejas al abrir
+    def __init__(self, ruta, max_entradas=MAX_ENTRADAS, lote=LOTE_ESCRITURA, version=None, solo_lectura=False):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.lote = lote
+        self.version = version or version_leyes()
+        self._local = threading.local()
+        self._candado = threading.Lock()
+        self._escritura = threading.Lock()
+        self._pendientes = {}   # (modo, expresion) -> (final, blob, instante)
+        self._usados = {}       # (modo, expresion) -> instante de la última lectura
+        self.aciertos = 0
+        self.fallos = 0
+        if not solo_lectura:
+            con = self._conexion()
+            con.executescript(_ESQUEMA)
+            con.execute("DELETE FROM resultados WHERE version != ?", (self.version,))
+
+    def _conexion(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            carpeta = os.path.dirname(os.path.abspath(self.ruta))
+            os.makedirs(carpeta, exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def obtener(self, texto, modo=None, con_pasos=False):
+        # (final, pasos) o None; con con_pasos=True solo vale una entrada que
+        # guardó los pasos. Sin modo, el del motor de leyes (modo_leyes())
+        clave = (modo or modo_leyes(), logic.normalizar(texto))
+        with self._candado:
+            pendiente = self._pendientes.get(clave)
+        if pendiente is not None:
+            final, blob, _ = pendiente
+        else:
+            # fetchall y no fetchone: una sentencia a medio leer deja abierta la
+            # transacción de lectura y las siguientes consultas no verían
+            # lo que escriben otros
+            filas = self._conexion().execute(
+                "SELECT final, pasos FROM resultados WHERE version = ? AND modo = ? AND expresion = ?",
+                (self.version, *clave),
+            ).fetchall()
+            final, blob = filas[0] if filas else (None, None)
+        acierto = final is not None and (blob is not None or not con_pasos)
+        with self._candado:
+            if acierto:
+                self.aciertos += 1
+                self._usados[clave] = time.time()
+            else:
+                self.fallos += 1
+        if not acierto:
+            return None
+        return final, _desempaquetar(blob)
+
+    def guardar(self, texto, final, pasos=None, modo=None):
+        # los errores de parseo no se guardan: repetirlos es barato
+        if final == "error":
+            return
+        clave = (modo or modo_leyes(), logic.normalizar(texto))
+        blob = _empaquetar(pasos)
+        with self._candado:
+            self._pendientes[clave] = (final, blob, time.time())
+            lleno = len(self._pendientes) >= self.lote
+        if lleno:
+            self.volcar()
+
+    def volcar(self):
+        # las entradas siguen visibles en _pendientes hasta que se confirma
+        # la transacción, así un lector no las pierde a mitad del volcado
+        with self._escritura:
+            self._volcar()
+
+    def _volcar(self):
+        with self._candado:
+            pendientes = dict(self._pendientes)
+            usados, self._usados = self._usados, {}
+        if not pendientes and not usados:
+            return
+        con = self._conexion()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            # no se pisa una entrada con pasos con otra que no los tiene
+            con.executemany(
+                "INSERT INTO resultados (version, modo, expresion, final, pasos, usado) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (version, modo, expresion) DO UPDATE SET final = excluded.final, "
+                "pasos = COALESCE(excluded.pasos, resultados.pasos), usado = MAX(usado, excluded.usado)",
+                [(self.version, modo, expr, final, blob, t) for (modo, expr), (final, blob, t) in pendientes.items()],
+            )
+            con.executemany(
+                "UPDATE resultados SET usado = MAX(usado, ?) WHERE version = ? AND modo = ? AND expresion = ?",
+                [(t, self.version, modo, expr) for (modo, expr), t in usados.items()],
+            )
+            sobran = con.execute("SELECT COUNT(*) FROM resultados").fetchone()[0] - self.max_entradas
+            if sobran > 0:
+                con.execute(
+                    "DELETE FROM resultados WHERE (version, modo, expresion) IN "
+                    "(SELECT version, modo, expresion FROM resultados ORDER BY usado LIMIT ?)",
+                    (sobran,),
+                )
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        with self._candado:
+            for clave, valor in pendientes.items():
+                if self._pendientes.get(clave) is valor:
+                    del self._pendientes[clave]
+
+    def __len__(self):
+        self.volcar()
+        return self._conexion().execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def estadisticas(self):
+        with self._candado:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "pendientes": len(self._pendientes),
+                "max_entradas": self.max_entradas,
+                "version": self.version,
+            }
+
+    def limpiar(self):
+        with self._candado:
+            self._pendientes.clear()
+            self._usados.clear()
+            self.aciertos = self.fallos = 0
+        self._conexion().execute("DELETE FROM resultados")
+
+    def cerrar(self):
+        self.volcar()
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,253 @@
+# Almacén compacto de expresiones (estructura de arrays) para entradas muy
+# grandes o muy profundas. En lugar de un objeto de Python por nodo, cada
+# nodo es un índice en tres arrays:
+#   tipo[u]  CERO, UNO, VAR, NOT, AND u OR (1 byte)
+#   dato[u]  VAR: id de símbolo (logic.tabla_simbolos); NOT: índice del hijo;
+#            AND/OR: posición de su lista en `hijos` (4 bytes)
+#   hijos    listas de AND/OR seguidas: [n, h1, ..., hn] (4 bytes por entrada)
+# Los hijos siempre se crean antes que el padre, así que los índices ya están
+# en orden topológico y todos los recorridos son bucles sin recursión.
+# Los literales (x y x') se comparten; el resto de nodos no se internan.
+from array import array
+
+from logic import And, Const, Not, Or, Var, analizar, tabla_simbolos
+
+CERO, UNO, VAR, NOT, AND, OR = range(6)
+
+
+class Arena:
+    def __init__(self):
+        self.tipo = array("B", (CERO, UNO))
+        self.dato = array("i", (0, 0))
+        self.hijos = array("i")
+        self._literales = {}  # id de símbolo -> nodo VAR; -1-nodo VAR -> su NOT
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def _nuevo(self, tipo, dato):
+        self.tipo.append(tipo)
+        self.dato.append(dato)
+        return len(self.tipo) - 1
+
+    def constante(self, v):
+        return UNO if int(v) else CERO
+
+    def variable(self, nombre):
+        # acepta un nombre o un id de la tabla de símbolos
+        i = nombre if isinstance(nombre, int) else tabla_simbolos.id(nombre.upper())
+        u = self._literales.get(i)
+        if u is None:
+            u = self._literales[i] = self._nuevo(VAR, i)
+        return u
+
+    def no(self, x):
+        if self.tipo[x] != VAR:
+            return self._nuevo(NOT, x)
+        u = self._literales.get(-1 - x)
+        if u is None:
+            u = self._literales[-1 - x] = self._nuevo(NOT, x)
+        return u
+
+    def nario(self, tipo, hs):
+        inicio = len(self.hijos)
+        self.hijos.append(len(hs))
+        self.hijos.extend(hs)
+        return self._nuevo(tipo, inicio)
+
+    def hijos_de(self, u):
+        t = self.tipo[u]
+        if t == NOT:
+            return (self.dato[u],)
+        if t == AND or t == OR:
+            inicio = self.dato[u]
+            return self.hijos[inicio + 1:inicio + 1 + self.hijos[inicio]]
+        return ()
+
+    def nombre(self, u):
+        return tabla_simbolos.nombre(self.dato[u])
+
+    def bytes(self):
+        # memoria de los buffers (sin la cabecera de los objetos array)
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self.tipo, self.dato, self.hijos))
+
+
+def alcanzables(arena, raiz):
+    # marcas (un byte por nodo) de los nodos que cuelgan de raiz
+    marcas = bytearray(len(arena))
+    marcas[raiz] = 1
+    pila = [raiz]
+    while pila:
+        for h in arena.hijos_de(pila.pop()):
+            if not marcas[h]:
+                marcas[h] = 1
+                pila.append(h)
+    return marcas
+
+
+def parsear(txt, arena=None):
+    # mismo lenguaje y mismos errores que logic.parsear (el mismo
+    # logic.analizar, con los constructores de la arena); devuelve (arena, raíz)
+    arena = Arena() if arena is None else arena
+    raiz = analizar(txt, arena.variable, arena.constante, arena.no,
+                    lambda hs: arena.nario(AND, hs), lambda hs: arena.nario(OR, hs))
+    return arena, raiz
+
+
+def texto(arena, raiz):
+    # mismo formato que logic.texto (y str() de los nodos)
+    tipo, dato = arena.tipo, arena.dato
+    partes = []
+    pila = [raiz]
+    while pila:
+        u = pila.pop()
+        if type(u) is str:
+            partes.append(u)
+            continue
+        t = tipo[u]
+        if t == VAR:
+            partes.append(tabla_simbolos.nombre(dato[u]))
+        elif t == NOT:
+            x = dato[u]
+            if tipo[x] == AND or tipo[x] == OR:
+                pila += (")'", x, "(")
+            else:
+                pila += ("'", x)
+        elif t == AND:
+            for i, h in enumerate(reversed(arena.hijos_de(u))):
+                if i:
+                    pila.append("*")
+                if tipo[h] == OR:
+                    pila += (")", h, "(")
+                else:
+                    pila.append(h)
+        elif t == OR:
+            for i, h in enumerate(reversed(arena.hijos_de(u))):
+                if i:
+                    pila.append("+")
+                pila.append(h)
+        else:
+            partes.append("1" if t == UNO else "0")
+    return "".join(partes)
+
+
+def desde_ast(expr, arena=None):
+    # AST de logic -> (arena, raíz); los subárboles compartidos del AST
+    # (nodos internados) se guardan una sola vez
+    arena = Arena() if arena is None else arena
+    hechos = {}
+    pila = [expr]
+    while pila:
+        e = pila[-1]
+        if e in hechos:
+            pila.pop()
+            continue
+        if isinstance(e, Not):
+            pendientes = [] if e.x in hechos else [e.x]
+        elif isinstance(e, (And, Or)):
+            pendientes = [h for h in e.cosas if h not in hechos]
+        else:
+            pendientes = []
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(e, Const):
+            u = arena.constante(e.v)
+        elif isinstance(e, Var):
+            u = arena.variable(e.id)
+        elif isinstance(e, Not):
+            u = arena.no(hechos[e.x])
+        else:
+            u = arena.nario(AND if isinstance(e, And) else OR, [hechos[h] for h in e.cosas])
+        hechos[e] = u
+    return arena, hechos[expr]
+
+
+def a_ast(arena, raiz):
+    # (arena, raíz) -> AST de logic; en orden de índices, que ya es topológico
+    marcas = alcanzables(arena, raiz)
+    nodos = {}
+    for u in range(raiz + 1):
+        if not marcas[u]:
+            continue
+        t = arena.tipo[u]
+        if t == CERO or t == UNO:
+            e = Const(t)
+        elif t == VAR:
+            e = Var(arena.nombre(u))
+        elif t == NOT:
+            e = Not(nodos[arena.dato[u]])
+        else:
+            hs = [nodos[h] for h in arena.hijos_de(u)]
+            e = And(hs) if t == AND else Or(hs)
+        nodos[u] = e
+    return nodos[raiz]
+
+
+def copiar(destino, tipo, dato, hs):
+    # regla neutra de reescribir(): el mismo nodo en la arena de destino
+    if tipo == CERO or tipo == UNO:
+        return tipo
+    if tipo == VAR:
+        return destino.variable(dato)
+    if tipo == NOT:
+        return destino.no(hs[0])
+    return destino.nario(tipo, hs)
+
+
+def regla_basica(destino, tipo, dato, hs):
+    # leyes que solo necesitan comparar índices: doble negación, asociativa,
+    # neutro, anulador, idempotencia y complemento (x y x' son literales
+    # compartidos, así que basta con comparar sus índices)
+    t = destino.tipo
+    if tipo == NOT:
+        x = hs[0]
+        if t[x] == NOT:
+            return destino.dato[x]
+        if t[x] == CERO or t[x] == UNO:
+            return UNO - t[x]
+        return destino.no(x)
+    if tipo != AND and tipo != OR:
+        return copiar(destino, tipo, dato, hs)
+    neutro, anulador = (UNO, CERO) if tipo == AND else (CERO, UNO)
+    planos = {}
+    pendientes = list(reversed(hs))
+    while pendientes:
+        h = pendientes.pop()
+        if t[h] == tipo:
+            pendientes.extend(reversed(destino.hijos_de(h)))
+        elif h == anulador:
+            return anulador
+        elif h != neutro:
+            planos[h] = None
+    for h in planos:
+        if t[h] == NOT and destino.dato[h] in planos:
+            return anulador
+    if not planos:
+        return neutro
+    if len(planos) == 1:
+        return next(iter(planos))
+    return destino.nario(tipo, list(planos))
+
+
+def reescribir(arena, raiz, regla=regla_basica):
+    # Recorrido de abajo arriba en orden de índices: cada nodo alcanzable se
+    # reconstruye en una arena nueva con `regla`, ya con los hijos reescritos.
+    # La arena nueva solo contiene lo alcanzable (sirve también para compactar).
+    marcas = alcanzables(arena, raiz)
+    destino = Arena()
+    nuevo = array("i", bytes(4 * (raiz + 1)))
+    tipo, dato = arena.tipo, arena.dato
+    for u in range(raiz + 1):
+        if not marcas[u]:
+            continue
+        t = tipo[u]
+        if t == NOT:
+            hs = (nuevo[dato[u]],)
+        elif t == AND or t == OR:
+            hs = [nuevo[h] for h in arena.hijos_de(u)]
+        else:
+            hs = ()
+        nuevo[u] = regla(destino, t, dato[u], hs)
+    return destino, nuevo[raiz]
@@ -0,0 +1,270 @@
+# Diagramas de decisión binarios reducidos y ordenados (ROBDD).
+# Los nodos son enteros: 0 y 1 son las hojas; el resto son índices en las
+# listas var/bajo/alto del gestor. La tabla única garantiza que dos funciones
+# iguales (con el mismo orden) tengan el mismo índice, así que la
+# equivalencia es comparar enteros.
+from logic import And, Const, Not, Or, Var, hijos
+from tabla_verdad import variables
+
+HOJA = 1 << 30  # nivel de las hojas: por debajo de cualquier variable
+
+# tamaño máximo de la caché de ITE; al llenarse se vacía entera
+MAX_CACHE = 1 << 18
+
+
+class BDD:
+    def __init__(self, orden=(), max_cache=MAX_CACHE):
+        self.orden = []
+        self.nivel = {}
+        self.nivel_id = {}  # id de símbolo -> nivel, para desde_ast
+        for nombre in orden:
+            self.nivel_de(nombre)
+        self.var = [HOJA, HOJA]
+        self.bajo = [0, 1]
+        self.alto = [0, 1]
+        self.unica = {}
+        self.cache = {}
+        self.max_cache = max_cache
+
+    def nivel_de(self, nombre):
+        # las variables que no estaban en el orden se añaden al final
+        nombre = nombre.upper()
+        if nombre not in self.nivel:
+            self.nivel[nombre] = len(self.orden)
+            self.orden.append(nombre)
+        return self.nivel[nombre]
+
+    def nodo(self, v, bajo, alto):
+        if bajo == alto:
+            return bajo
+        clave = (v, bajo, alto)
+        u = self.unica.get(clave)
+        if u is None:
+            u = len(self.var)
+            self.var.append(v)
+            self.bajo.append(bajo)
+            self.alto.append(alto)
+            self.unica[clave] = u
+        return u
+
+    def variable(self, nombre):
+        return self.nodo(self.nivel_de(nombre), 0, 1)
+
+    def ite(self, f, g, h):
+        # if f then g else h
+        if f == 1:
+            return g
+        if f == 0:
+            return h
+        if g == h:
+            return g
+        if g == 1 and h == 0:
+            return f
+        clave = (f, g, h)
+        r = self.cache.get(clave)
+        if r is not None:
+            return r
+        v = min(self.var[f], self.var[g], self.var[h])
+        f0, f1 = self._cofactores(f, v)
+        g0, g1 = self._cofactores(g, v)
+        h0, h1 = self._cofactores(h, v)
+        r = self.nodo(v, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        if len(self.cache) >= self.max_cache:
+            self.cache.clear()
+        self.cache[clave] = r
+        return r
+
+    def _cofactores(self, u, v):
+        if self.var[u] != v:
+            return u, u
+        return self.bajo[u], self.alto[u]
+
+    def no(self, f):
+        return self.ite(f, 0, 1)
+
+    def y(self, f, g):
+        return self.ite(f, g, 0)
+
+    def o(self, f, g):
+        return self.ite(f, 1, g)
+
+    def desde_ast(self, expr):
+        # recorrido iterativo de abajo arriba; los subárboles compartidos
+        # del AST (nodos internados) se traducen una sola vez
+        hechos = {}
+        pila = [expr]
+        while pila:
+            e = pila[-1]
+            if e in hechos:
+                pila.pop()
+                continue
+            pendientes = [h for h in hijos(e) if h not in hechos]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            if isinstance(e, Const):
+                u = 1 if e.v else 0
+            elif isinstance(e, Var):
+                nivel = self.nivel_id.get(e.id)
+                if nivel is None:
+                    nivel = self.nivel_id[e.id] = self.nivel_de(e.nombre)
+                u = self.nodo(nivel, 0, 1)
+            elif isinstance(e, Not):
+                u = self.no(hechos[e.x])
+            elif isinstance(e, And):
+                u = 1
+                for h in e.cosas:
+                    u = self.y(u, hechos[h])
+            else:
+                u = 0
+                for h in e.cosas:
+                    u = self.o(u, hechos[h])
+            hechos[e] = u
+        return hechos[expr]
+
+    def a_ast(self, u):
+        # expansión de Shannon de cada nodo, con los casos de hoja simplificados
+        hechos = {0: Const(0), 1: Const(1)}
+        pila = [u]
+        while pila:
+            w = pila[-1]
+            if w in hechos:
+                pila.pop()
+                continue
+            b, a = self.bajo[w], self.alto[w]
+            pendientes = [x for x in (b, a) if x not in hechos]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            x = Var(self.orden[self.var[w]])
+            lo, hi = hechos[b], hechos[a]
+            if b == 0 and a == 1:
+                r = x
+            elif b == 1 and a == 0:
+                r = Not(x)
+            elif b == 0:
+                r = _y(x, hi)
+            elif a == 0:
+                r = _y(Not(x), lo)
+            elif b == 1:
+                r = _o(Not(x), hi)
+            elif a == 1:
+                r = _o(x, lo)
+            else:
+                r = _o(_y(x, hi), _y(Not(x), lo))
+            hechos[w] = r
+        return hechos[u]
+
+    def nodos(self, u):
+        vistos, pila = set(), [u]
+        while pila:
+            w = pila.pop()
+            if w > 1 and w not in vistos:
+                vistos.add(w)
+                pila.append(self.bajo[w])
+                pila.append(self.alto[w])
+        return vistos
+
+    def tamano(self, *raices):
+        vistos = set()
+        for u in raices:
+            vistos |= self.nodos(u)
+        return len(vistos)
+
+    def es_constante(self, u):
+        return u <= 1
+
+    def literal(self, u):
+        # (nombre, positivo) si u es una variable o su negación; si no, None
+        if u > 1 and self.bajo[u] + self.alto[u] == 1 and self.bajo[u] in (0, 1):
+            return self.orden[self.var[u]], self.alto[u] == 1
+        return None
+
+    def contar_soluciones(self, u, nvars=None):
+        # asignaciones de las primeras nvars variables del orden que hacen u = 1
+        nvars = len(self.orden) if nvars is None else nvars
+        cuenta = {0: 0, 1: 1}
+
+        def nivel(w):
+            return nvars if w <= 1 else self.var[w]
+
+        pila = [u]
+        while pila:
+            w = pila[-1]
+            if w in cuenta:
+                pila.pop()
+                continue
+            b, a = self.bajo[w], self.alto[w]
+            pendientes = [x for x in (b, a) if x not in cuenta]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            v = self.var[w]
+            cuenta[w] = (cuenta[b] << (nivel(b) - v - 1)) + (cuenta[a] << (nivel(a) - v - 1))
+        return cuenta[u] << nivel(u)
+
+    def solucion(self, u):
+        # una asignación que satisface u (las variables ausentes no importan)
+        if u == 0:
+            return None
+        asig = {}
+        while u > 1:
+            nombre = self.orden[self.var[u]]
+            if self.alto[u] != 0:
+                asig[nombre] = 1
+                u = self.alto[u]
+            else:
+                asig[nombre] = 0
+                u = self.bajo[u]
+        return asig
+
+
+def _y(a, b):
+    partes = []
+    for t in (a, b):
+        partes.extend(t.cosas if isinstance(t, And) else (t,))
+    return And(partes)
+
+
+def _o(a, b):
+    partes = []
+    for t in (a, b):
+        partes.extend(t.cosas if isinstance(t, Or) else (t,))
+    return Or(partes)
+
+
+def sifting(exprs, orden=None, max_cache=MAX_CACHE):
+    # Reordenación por sifting: cada variable, empezando por las que más
+    # aparecen, se prueba en todas las posiciones y se deja en la que da el
+    # BDD compartido más pequeño. Cada prueba reconstruye el BDD desde el AST.
+    orden = list(orden) if orden is not None else sorted(set().union(*map(variables, exprs)))
+
+    def tamano(o):
+        g = BDD(o, max_cache)
+        return g.tamano(*[g.desde_ast(e) for e in exprs])
+
+    g = BDD(orden, max_cache)
+    raices = [g.desde_ast(e) for e in exprs]
+    apariciones = {}
+    for w in set().union(*[g.nodos(u) for u in raices]):
+        nombre = g.orden[g.var[w]]
+        apariciones[nombre] = apariciones.get(nombre, 0) + 1
+    mejor = g.tamano(*raices)
+    for nombre in sorted(orden, key=lambda n: -apariciones.get(n, 0)):
+        base = [x for x in orden if x != nombre]
+        for pos in range(len(orden)):
+            prueba = base[:pos] + [nombre] + base[pos:]
+            if prueba == orden:
+                continue
+            t = tamano(prueba)
+            if t < mejor:
+                mejor, orden = t, prueba
+    return orden
+
+
+def equivalentes(a, b, orden=None):
+    g = BDD(orden or ())
+    return g.desde_ast(a) == g.desde_ast(b)
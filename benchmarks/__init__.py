@@ -0,0 +1,3 @@
+# Benchmarks del simplificador. Se ejecutan como módulos desde la raíz:
+#   python -m benchmarks.suite          (suite completa con umbrales)
+#   python -m benchmarks.bench_parser   (y demás bench_* sueltos)
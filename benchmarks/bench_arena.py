@@ -0,0 +1,66 @@
+# Memoria retenida por nodo: AST de objetos (logic) frente a la arena de arrays.
+#   python -m benchmarks.bench_arena [nodos ...]
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import arena
+import logic
+from benchmarks.generadores import nombres
+
+
+def suma_de_productos(rng, nodos, nvars=64):
+    vs = nombres(nvars)
+    partes, total = [], 0
+    while total < nodos:
+        k = rng.randint(2, 5)
+        partes.append("*".join(rng.choice(vs) + rng.choice(("", "'")) for _ in range(k)))
+        total += k + 1
+    return "+".join(partes)
+
+
+def anidada(nodos):
+    # (((A+B)*C+D)*C+D...): profundidad proporcional al tamaño
+    n = max(nodos // 4, 1)
+    return "(" * n + "A+B" + ")*C+D" * n
+
+
+def medir(construir):
+    # (resultado, bytes retenidos, segundos); el tiempo se toma aparte, sin
+    # tracemalloc, que lo distorsiona mucho
+    gc.collect()
+    t0 = time.perf_counter()
+    construir()
+    dt = time.perf_counter() - t0
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = construir()
+    retenido = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+    return resultado, retenido, dt
+
+
+def main(tamanos=(50_000, 200_000), semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'forma':<10} {'nodos':>8} {'AST B/nodo':>11} {'arena B/nodo':>13} {'ahorro':>7} "
+          f"{'parse AST':>10} {'parse arena':>12} {'reescr. arena':>14}")
+    for n in tamanos:
+        for forma, texto in (("sop", suma_de_productos(rng, n)), ("anidada", anidada(n))):
+            (a, raiz), b_arena, t_arena = medir(lambda: arena.parsear(texto))
+            nodos = sum(arena.alcanzables(a, raiz))
+            e, b_ast, t_ast = medir(lambda: logic.parsear(texto))
+            del e
+            t0 = time.perf_counter()
+            arena.texto(*arena.reescribir(a, raiz))
+            t_reescribir = time.perf_counter() - t0
+            print(
+                f"{forma:<10} {nodos:>8} {b_ast / nodos:>11.1f} {b_arena / nodos:>13.1f} "
+                f"{b_ast / max(b_arena, 1):>6.1f}x {t_ast:>9.3f}s {t_arena:>11.3f}s {t_reescribir:>13.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main(tuple(int(x) for x in sys.argv[1:]) or (50_000, 200_000))
@@ -0,0 +1,61 @@
+# Pasos por segundo del motor de reescritura con el despacho indexado de
+# leyes frente al recorrido lineal de boolean_laws con doble renderizado.
+#   python -m benchmarks.bench_despacho [n_expresiones]
+import sys
+import time
+
+import logic
+from benchmarks import generadores
+
+
+def aplicar_leyes_lineal(e):
+    # el bucle anterior: todas las leyes, renderizando antes y después
+    for ley in logic.boolean_laws:
+        antes = logic.representar(e)
+        e2, nombre = ley(e)
+        despues = logic.representar(e2)
+        if nombre and despues != antes:
+            return e2, nombre
+    return e, ""
+
+
+def medir(exprs, aplicar):
+    original = logic.aplicar_leyes
+    logic.aplicar_leyes = aplicar
+    try:
+        pasos = 0
+        t0 = time.perf_counter()
+        for e in exprs:
+            pasos += len(logic.reescribir(e)[1])
+        return pasos, time.perf_counter() - t0
+    finally:
+        logic.aplicar_leyes = original
+
+
+def subterminos(exprs):
+    vistos, pila = set(), list(exprs)
+    while pila:
+        e = pila.pop()
+        if e not in vistos:
+            vistos.add(e)
+            pila.extend(logic.hijos(e))
+    return list(vistos)
+
+
+def main(n=300, semilla=0):
+    textos = generadores.lote(semilla, n, nvars=5, profundidad=5, ancho=4, forma="anidada")
+    exprs = [logic.parsear(t) for t in textos]
+    nodos = subterminos(exprs)
+    # pasos completos (incluye el registro de pasos) y despacho aislado
+    print(f"{'despacho':<10} {'pasos':>8} {'pasos/s':>10} {'nodos/s (solo despacho)':>24}")
+    for nombre, fn in (("lineal", aplicar_leyes_lineal), ("indexado", logic.aplicar_leyes)):
+        pasos, dt = medir(exprs, fn)
+        t0 = time.perf_counter()
+        for e in nodos:
+            fn(e)
+        dn = time.perf_counter() - t0
+        print(f"{nombre:<10} {pasos:>8} {pasos / dt:>10.0f} {len(nodos) / dn:>24.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
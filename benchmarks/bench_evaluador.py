@@ -0,0 +1,63 @@
+# Filas por segundo al evaluar una expresión sobre una tabla de señales 0/1:
+# recorrido del árbol por fila, función compilada por fila, compilada por
+# columnas (enteros empaquetados; desde filas o con los datos ya por
+# columnas), CSV por trozos y, si está, NumPy. Una expresión pequeña y otra
+# grande: por columnas el coste por nodo se reparte entre miles de filas.
+#   python -m benchmarks.bench_evaluador [filas]
+import io
+import random
+import sys
+import time
+
+import evaluador
+import logic
+from benchmarks.generadores import expresion
+
+# el recorrido del árbol es lento: se mide sobre estas filas como mucho
+MAX_INTERPRETADAS = 20_000
+
+
+def medir(funcion, filas):
+    t0 = time.perf_counter()
+    funcion()
+    return filas / (time.perf_counter() - t0)
+
+
+def medir_expresion(texto, n, rng):
+    e = logic.parsear(texto)
+    f = evaluador.compilar(e)
+    k = len(f.orden)
+    filas = [[rng.getrandbits(1) for _ in range(k)] for _ in range(n)]
+    columnas = {nombre: bytes(c) for nombre, c in zip(f.orden, zip(*filas))}
+    csv_texto = ",".join(f.orden) + "\n" + "".join(",".join(map(str, fila)) + "\n" for fila in filas)
+    print(f"expresión: {texto[:60]}{'...' if len(texto) > 60 else ''} ({k} variables, {n:,} filas)")
+
+    m = min(n, MAX_INTERPRETADAS)
+    res = {
+        "árbol por fila": medir(lambda: [evaluador.interpretar(e, dict(zip(f.orden, fila))) for fila in filas[:m]], m),
+        "compilada por fila": medir(lambda: [f(*fila) for fila in filas], n),
+        "columnas desde filas": medir(lambda: sum(evaluador.evaluar(f, filas)), n),
+        "columnas": medir(lambda: sum(evaluador.evaluar_columnas(f, columnas)), n),
+        "CSV por trozos": medir(lambda: sum(sum(r) for _, r in evaluador.evaluar_csv(f, io.StringIO(csv_texto))), n),
+    }
+    if evaluador.np is not None:
+        matriz = evaluador.np.array(filas, dtype=bool)
+        res["NumPy por columnas"] = medir(lambda: evaluador.evaluar_matriz(f, matriz).sum(), n)
+    base = res["árbol por fila"]
+    for nombre, v in res.items():
+        print(f"  {nombre:<22} {v:>14,.0f} filas/s {v / base:>8.1f}x")
+
+
+def main(n=1_000_000, semilla=0):
+    rng = random.Random(semilla)
+    pequena, _ = logic.simplificar_expresion(expresion(semilla, nvars=10, profundidad=4, ancho=4))
+    # la grande sin simplificar (simplificada suele quedar en pocos literales)
+    grande = logic.representar(logic.parsear(expresion(semilla, nvars=16, profundidad=5, ancho=4)))
+    for texto in (pequena, grande):
+        medir_expresion(texto, n, rng)
+    if evaluador.np is None:
+        print("(NumPy no está instalado: sin la ruta evaluar_matriz)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
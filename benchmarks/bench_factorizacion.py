@@ -0,0 +1,44 @@
+# Factorización algebraica de sumas de productos grandes frente al motor de
+# leyes (factor común y distributiva): literales y compuertas antes y
+# después, y tiempo. La equivalencia se comprueba con la tabla de verdad.
+#   python -m benchmarks.bench_factorizacion [productos]
+import random
+import sys
+import time
+
+import factorizacion
+import logic
+import tabla_verdad
+
+
+def sop(rng, nvars, productos, minimo=4, maximo=7):
+    nombres = [chr(ord("A") + i) for i in range(nvars)]
+    return "+".join(
+        "*".join(v + ("'" if rng.random() < 0.3 else "") for v in rng.sample(nombres, rng.randint(minimo, maximo)))
+        for _ in range(productos)
+    )
+
+
+def main(productos=(100, 300, 600), nvars=16, semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'productos':>9} {'literales':>10} {'motor':>12} {'kernels':>12} {'compuertas':>11} "
+          f"{'motor':>7} {'kernels':>8} {'t motor':>8} {'t kernels':>9}")
+    for n in productos:
+        texto = sop(rng, nvars, n)
+        expr = logic.parsear(texto)
+        lits, comp = factorizacion.contar(expr)
+        t0 = time.perf_counter()
+        motor, _ = logic.simplificar_expresion(texto, traza=False)
+        t_motor = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        resultado, info = factorizacion.factorizar(expr)
+        t_fact = time.perf_counter() - t0
+        if not tabla_verdad.equivalentes(expr, resultado):
+            raise SystemExit(f"la factorización de {n} productos no es equivalente")
+        lm, cm = factorizacion.contar(logic.parsear(motor))
+        print(f"{n:>9} {lits:>10} {lm:>12} {info['literales_despues']:>12} {comp:>11} "
+              f"{cm:>7} {info['compuertas_despues']:>8} {t_motor:>7.2f}s {t_fact:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or (100, 300, 600))
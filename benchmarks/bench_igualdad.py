@@ -0,0 +1,119 @@
+# Compara la igualdad por texto (repr/str) que usaban las leyes con la
+# igualdad por identidad de los nodos internados.
+#   python -m benchmarks.bench_igualdad
+import random
+import sys
+import time
+
+import logic
+from logic import And, Not, Or, Var
+
+
+def sop_aleatorio(rng, nodos, nvars=8):
+    # suma de productos con ~nodos nodos en total
+    vs = [Var(chr(ord("A") + i)) for i in range(nvars)]
+    terms, total = [], 1
+    while total < nodos:
+        lits = []
+        for v in rng.sample(vs, rng.randint(2, 4)):
+            lits.append(Not(v) if rng.random() < 0.5 else v)
+        terms.append(And(lits))
+        total += 1 + len(lits) + sum(isinstance(x, Not) for x in lits)
+    return Or(terms)
+
+
+def contar_nodos(e):
+    pila, n = [e], 0
+    while pila:
+        x = pila.pop()
+        n += 1
+        if isinstance(x, Not):
+            pila.append(x.x)
+        elif isinstance(x, (And, Or)):
+            pila.extend(x.cosas)
+    return n
+
+
+# --- versiones anteriores (comparación por texto) ---------------------------
+
+def idempotencia_texto(e):
+    vistos, nuevos = set(), []
+    for t in e.cosas:
+        k = repr(t)
+        if k not in vistos:
+            vistos.add(k)
+            nuevos.append(t)
+    return len(nuevos) != len(e.cosas)
+
+
+def comp_texto(a, b):
+    return (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a))
+
+
+def complemento_ext_texto(e):
+    t = e.cosas
+    for i in range(len(t)):
+        for j in range(i + 1, len(t)):
+            if comp_texto(t[i], t[j]):
+                return True
+    return False
+
+
+def comunes_texto(a, b):
+    return [x for x in a if any(str(x) == str(y) for y in b)]
+
+
+# --- versiones actuales (identidad) -----------------------------------------
+
+def idempotencia_nodos(e):
+    return logic.ley_idempotencia(e)[1] != ""
+
+
+def complemento_ext_nodos(e):
+    t = e.cosas
+    for i in range(len(t)):
+        for j in range(i + 1, len(t)):
+            if logic.son_complementarios(t[i], t[j]):
+                return True
+    return False
+
+
+def comunes_nodos(a, b):
+    return [x for x in a if x in b]
+
+
+def medir(fn, *args, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn(*args)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def main(tamanos=(1_000, 10_000, 100_000), semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'nodos':>8} {'caso':<26} {'texto (s)':>11} {'nodos (s)':>11} {'aceleración':>12}")
+    for n in tamanos:
+        # idempotencia sobre una suma ancha
+        ancha = sop_aleatorio(rng, n)
+        # complemento extendido sobre un producto de 32 subárboles grandes,
+        # la mitad negados (sin pares complementarios: recorre todos los pares)
+        bloques = [sop_aleatorio(rng, max(n // 32, 8)) for _ in range(32)]
+        producto = And([Not(b) if k % 2 else b for k, b in enumerate(bloques)])
+        # factor común entre dos productos de subárboles grandes
+        a = tuple(bloques[:16])
+        b = tuple(bloques[8:24])
+        casos = [
+            ("ley_idempotencia", (ancha,), contar_nodos(ancha), idempotencia_texto, idempotencia_nodos),
+            ("ley_complemento_ext", (producto,), contar_nodos(producto), complemento_ext_texto, complemento_ext_nodos),
+            ("factores comunes", (a, b), sum(map(contar_nodos, a + b)), comunes_texto, comunes_nodos),
+        ]
+        for nombre, args, total, viejo, nuevo in casos:
+            tv = medir(viejo, *args)
+            tn = medir(nuevo, *args)
+            print(f"{total:>8} {nombre:<26} {tv:>11.5f} {tn:>11.5f} {tv / max(tn, 1e-9):>11.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(x) for x in sys.argv[1:]) or (1_000, 10_000, 100_000))
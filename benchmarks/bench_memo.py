@@ -0,0 +1,63 @@
+# Memo de subárboles: volver a simplificar una expresión grande tras cambiar
+# un literal (solo se rehace el camino hasta la raíz), un lote con casi
+# duplicados y el sobrecoste cuando no se repite nada.
+#   python -m benchmarks.bench_memo [bloques]
+import random
+import sys
+import time
+
+import logic
+from benchmarks.generadores import expresion, lote
+
+
+def grande(rng, bloques):
+    # suma de bloques anidados independientes: un cambio toca un solo bloque
+    return "+".join(f"({expresion(rng.randrange(10**6), nvars=6, profundidad=3, ancho=3)})" for _ in range(bloques))
+
+
+def editar(rng, texto):
+    posiciones = [k for k, c in enumerate(texto) if c.isalpha()]
+    k = rng.choice(posiciones)
+    return texto[:k] + ("A" if texto[k] != "A" else "B") + texto[k + 1:]
+
+
+def medir(textos, memo):
+    t0 = time.perf_counter()
+    for t in textos:
+        final, pasos = logic.simplificar_expresion(t, memo=memo)
+        len(pasos)
+    return time.perf_counter() - t0
+
+
+def fila(nombre, sin, con, memo):
+    est = memo.estadisticas()
+    print(f"{nombre:<24} {sin:>9.3f}s {con:>9.3f}s {sin / con:>7.1f}x {est['tasa_aciertos']:>7.1%} "
+          f"{est['entradas']:>8} {est['bytes_aprox'] / 1024:>9.0f}")
+
+
+def main(bloques=200, semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'caso':<24} {'sin memo':>10} {'con memo':>10} {'mejora':>8} {'aciertos':>8} {'entradas':>8} {'KiB memo':>9}")
+
+    texto = grande(rng, bloques)
+    ediciones = [editar(rng, texto) for _ in range(5)]
+    memo = logic.MemoSubarboles()
+    medir([texto], memo)
+    fila("editar un literal", medir(ediciones, None), medir(ediciones, memo), memo)
+
+    base = lote(semilla, 500, nvars=6, profundidad=4)
+    casi = base + [editar(rng, t) for t in base]
+    memo = logic.MemoSubarboles()
+    fila("lote casi duplicado", medir(casi, None), medir(casi, memo), memo)
+
+    distintos = lote(semilla + 1, 1000, nvars=8, profundidad=4)
+    memo = logic.MemoSubarboles()
+    fila("sin repeticiones", medir(distintos, None), medir(distintos, memo), memo)
+
+    for politica, max_entradas in (("lru", 2_000), ("costo", 2_000)):
+        memo = logic.MemoSubarboles(max_entradas, politica=politica)
+        fila(f"casi dup. {politica} {max_entradas}", medir(casi, None), medir(casi, memo), memo)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
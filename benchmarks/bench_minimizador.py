@@ -0,0 +1,31 @@
+# Minimización SOP exacta (minimizar_sop) frente al camino por leyes
+# (simplificar_expresion): tiempo y literales del resultado. Ojo: las leyes
+# pueden dejar formas factorizadas (multinivel), que no son sumas de productos.
+#   python -m benchmarks.bench_minimizador [n_vars ...]
+import random
+import sys
+import time
+
+import logic
+from benchmarks import generadores
+from minimizador import minimizar_sop
+
+
+def contar_literales(texto):
+    return sum(ch.isalpha() for ch in texto)
+
+
+def main(tamanos=(12, 14, 16), semilla=0, repeticiones=5):
+    rng = random.Random(semilla)
+    print(f"{'vars':>4} {'modo':<8} {'segundos':>9} {'literales':>10}")
+    for n in tamanos:
+        casos = [generadores.sop(rng, n, 24, 3, 5) for _ in range(repeticiones)]
+        for nombre, fn in (("leyes", logic.simplificar_expresion), ("SOP", minimizar_sop)):
+            t0 = time.perf_counter()
+            lits = sum(contar_literales(fn(c)[0]) for c in casos)
+            dt = (time.perf_counter() - t0) / len(casos)
+            print(f"{n:>4} {nombre:<8} {dt:>9.3f} {lits / len(casos):>10.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(x) for x in sys.argv[1:]) or (12, 14, 16))
@@ -0,0 +1,63 @@
+# Sumas y productos muy anchos (1k-10k operandos): detección de complementos,
+# repetidos y constantes con el índice de polaridad de cada nodo frente a la
+# búsqueda por pares.
+#   python -m benchmarks.bench_operandos [operandos ...]
+import random
+import sys
+import time
+
+import logic
+
+# la búsqueda por pares de referencia solo se mide hasta este tamaño
+MAX_PARES = 3000
+
+
+def literales(rng, n):
+    return [f"x{i}" + rng.choice(("", "'")) for i in range(n)]
+
+
+def casos(rng, n):
+    lits = literales(rng, n)
+    yield "suma sin pares", "+".join(lits)
+    # un complemento y un repetido al final: hay que recorrer todo para verlos
+    yield "suma x+...+x'", "+".join(lits + ["x0" if lits[0].endswith("'") else "x0'", lits[1]])
+    productos = [f"{lits[i]}*{lits[i + 1]}" for i in range(0, n - 1, 2)]
+    yield "absorción", "+".join(productos + [lits[n - 2]])
+    sumas = [f"({lits[i]}+{lits[i + 1]})" for i in range(0, n - 1, 2)]
+    yield "(c+x)(c+x')", "*".join(sumas + ["(c_0+x0)", "(c_0+x0')"])
+
+
+def complemento_por_pares(e):
+    # referencia cuadrática: la comprobación que hacían las leyes antes
+    t = e.cosas
+    for i in range(len(t)):
+        for j in range(i + 1, len(t)):
+            if logic.son_complementarios(t[i], t[j]):
+                return True
+    return False
+
+
+def main(tamanos=(1_000, 2_000, 5_000, 10_000), semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'caso':<16} {'operandos':>9} {'simplificar':>12} {'índice':>10} {'por pares':>10}  final")
+    for n in tamanos:
+        for nombre, texto in casos(rng, n):
+            e = logic.parsear(texto)
+            t0 = time.perf_counter()
+            final, _ = logic.simplificar_arbol(e, traza=False)
+            t_simpl = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            logic.IndiceOperandos(e.cosas).complemento
+            t_indice = time.perf_counter() - t0
+            if n <= MAX_PARES:
+                t0 = time.perf_counter()
+                complemento_por_pares(e)
+                pares = f"{time.perf_counter() - t0:>9.4f}s"
+            else:
+                pares = f"{'-':>10}"
+            resumen = final if len(final) <= 24 else final[:21] + "..."
+            print(f"{nombre:<16} {len(e.cosas):>9} {t_simpl:>11.3f}s {t_indice:>9.4f}s {pares}  {resumen}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(x) for x in sys.argv[1:]) or (1_000, 2_000, 5_000, 10_000))
@@ -0,0 +1,37 @@
+# Tiempo de parsear() frente al tamaño de la entrada (debe crecer linealmente).
+#   python -m benchmarks.bench_parser [bytes ...]
+import random
+import sys
+import time
+
+import logic
+
+
+def suma_plana(rng, nbytes):
+    # A*B'+C*D+... (la forma que antes agotaba la recursión)
+    partes, total = [], 0
+    while total < nbytes:
+        t = rng.choice("ABCDEFGH") + rng.choice(("", "'")) + rng.choice("ABCDEFGH")
+        partes.append(t)
+        total += len(t) + 1
+    return "+".join(partes)
+
+
+def anidada(nbytes):
+    n = max(nbytes // 2, 1)
+    return "(" * n + "A" + ")" * n
+
+
+def main(tamanos=(250_000, 1_000_000, 4_000_000), semilla=0):
+    rng = random.Random(semilla)
+    print(f"{'forma':<12} {'bytes':>10} {'segundos':>10} {'µs/byte':>9}")
+    for n in tamanos:
+        for nombre, texto in (("suma plana", suma_plana(rng, n)), ("anidada", anidada(n))):
+            t0 = time.perf_counter()
+            logic.parsear(texto)
+            dt = time.perf_counter() - t0
+            print(f"{nombre:<12} {len(texto):>10} {dt:>10.3f} {dt / len(texto) * 1e6:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(x) for x in sys.argv[1:]) or (250_000, 1_000_000, 4_000_000))
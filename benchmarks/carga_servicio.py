@@ -0,0 +1,74 @@
+# Prueba de carga del servicio HTTP: `conexiones` clientes persistentes
+# envían `peticiones` expresiones cada uno y se miden rendimiento,
+# latencias vistas por el cliente y las estadísticas del servidor. Sin
+# --puerto levanta un servicio propio en un puerto libre.
+#   python -m benchmarks.carga_servicio [--conexiones 32] [--peticiones 100] [--puerto 8765]
+import argparse
+import asyncio
+import time
+
+import servicio
+from benchmarks.generadores import lote
+
+
+async def cliente(host, puerto, textos, latencias, rechazos):
+    c = servicio.Cliente(host, puerto)
+    try:
+        for texto in textos:
+            t0 = time.perf_counter()
+            while True:
+                estado, _ = await c.simplificar(texto)
+                if estado != 503:
+                    break
+                # back-pressure: esperar y reintentar
+                rechazos.append(1)
+                await asyncio.sleep(0.01)
+            latencias.append(time.perf_counter() - t0)
+    finally:
+        await c.cerrar()
+
+
+async def carga(args):
+    propio = None
+    host, puerto = args.host, args.puerto
+    if puerto is None:
+        propio = servicio.Servicio(args.procesos, args.lote, args.ventana_ms, args.max_cola)
+        puerto = await propio.iniciar(host, 0)
+    textos = lote(args.semilla, args.conexiones * args.peticiones, nvars=5)
+    latencias, rechazos = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(host, puerto, textos[i::args.conexiones], latencias, rechazos) for i in range(args.conexiones)
+    ))
+    total = time.perf_counter() - t0
+    c = servicio.Cliente(host, puerto)
+    est = await c.estadisticas()
+    await c.cerrar()
+    if propio is not None:
+        await propio.cerrar()
+
+    lat = servicio.percentiles(latencias)
+    print(f"{len(latencias)} peticiones en {total:.2f}s: {len(latencias) / total:,.0f} por segundo "
+          f"({args.conexiones} conexiones, {len(rechazos)} reintentos por 503)")
+    print("cliente  (ms): " + "  ".join(f"{k}={v * 1000:.2f}" for k, v in lat.items()))
+    print("servidor (ms): " + "  ".join(f"{k}={v}" for k, v in est["latencia_ms"].items()))
+    print(f"lotes: {est['lotes']}, {est['media_por_lote']:.1f} expresiones por lote; "
+          f"conexiones atendidas: {est['conexiones']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.carga_servicio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=None, help="servicio ya en marcha (por defecto se levanta uno)")
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--peticiones", type=int, default=100, help="peticiones por conexión")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("-p", "--procesos", type=int, default=None)
+    parser.add_argument("--lote", type=int, default=servicio.TAM_LOTE)
+    parser.add_argument("--ventana-ms", type=float, default=servicio.VENTANA_MS)
+    parser.add_argument("--max-cola", type=int, default=servicio.MAX_COLA)
+    asyncio.run(carga(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Generadores de expresiones aleatorias reproducibles (misma semilla, mismo
+# texto). Formas: "sop" (suma de productos), "pos" (producto de sumas) y
+# "anidada" (árbol aleatorio con paréntesis y negaciones de grupo).
+import random
+
+FORMAS = ("sop", "pos", "anidada")
+
+
+def nombres(nvars):
+    # hasta 26 variables, letras sueltas; con más, x0, x1, ... (multiletra)
+    if nvars < 1:
+        raise ValueError("nvars debe ser al menos 1")
+    if nvars <= 26:
+        return [chr(ord("A") + i) for i in range(nvars)]
+    return [f"x{i}" for i in range(nvars)]
+
+
+def literal(rng, vs, prob_neg=0.4):
+    v = rng.choice(vs)
+    return v + "'" if rng.random() < prob_neg else v
+
+
+def _termino(rng, vs, min_lits, max_lits, op):
+    k = min(rng.randint(min_lits, max_lits), len(vs))
+    return op.join(literal(rng, [v]) for v in rng.sample(vs, k))
+
+
+def sop(rng, nvars, ancho, min_lits=2, max_lits=4):
+    vs = nombres(nvars)
+    return "+".join(_termino(rng, vs, min_lits, max_lits, "*") for _ in range(ancho))
+
+
+def pos(rng, nvars, ancho, min_lits=2, max_lits=4):
+    vs = nombres(nvars)
+    return "*".join(f"({_termino(rng, vs, min_lits, max_lits, '+')})" for _ in range(ancho))
+
+
+def anidada(rng, nvars, profundidad, ancho, prob_hoja=0.25, prob_neg_grupo=0.15):
+    vs = nombres(nvars)
+
+    def nodo(p):
+        if p == 0 or (p < profundidad and rng.random() < prob_hoja):
+            return literal(rng, vs)
+        op = rng.choice("+*")
+        s = op.join(f"({nodo(p - 1)})" for _ in range(rng.randint(2, ancho)))
+        return f"({s})'" if rng.random() < prob_neg_grupo else s
+
+    return nodo(profundidad)
+
+
+def expresion(semilla, nvars=4, profundidad=3, ancho=3, forma="anidada"):
+    rng = random.Random(semilla)
+    if forma == "sop":
+        return sop(rng, nvars, ancho)
+    if forma == "pos":
+        return pos(rng, nvars, ancho)
+    if forma == "anidada":
+        return anidada(rng, nvars, profundidad, ancho)
+    raise ValueError(f"Forma desconocida: {forma}")
+
+
+def lote(semilla, cantidad, **parametros):
+    # `cantidad` expresiones con semillas derivadas de `semilla`
+    return [expresion(semilla * 100_003 + i, **parametros) for i in range(cantidad)]
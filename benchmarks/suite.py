@@ -0,0 +1,156 @@
+# Suite de rendimiento con umbrales de regresión.
+#   python -m benchmarks.suite                         (mide y compara con la base)
+#   python -m benchmarks.suite --guardar-base          (mide y guarda la base)
+#   python -m benchmarks.suite --umbral 0.3 --salida r.json
+# Mide normalizar, parsear, cada ley de boolean_laws y simplificar_expresion
+# sobre lotes generados con semilla fija, más el pico de memoria de la
+# simplificación (tracemalloc). Sale con código 1 si alguna métrica empeora
+# más que el umbral respecto a la base guardada.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import logic
+from benchmarks import generadores
+
+BASE = os.path.join(os.path.dirname(__file__), "base.json")
+
+CASOS = [
+    {"nombre": "sop-6v-16", "forma": "sop", "nvars": 6, "ancho": 16},
+    {"nombre": "sop-10v-64", "forma": "sop", "nvars": 10, "ancho": 64},
+    {"nombre": "pos-6v-16", "forma": "pos", "nvars": 6, "ancho": 16},
+    {"nombre": "pos-10v-48", "forma": "pos", "nvars": 10, "ancho": 48},
+    {"nombre": "anidada-4v-p4", "forma": "anidada", "nvars": 4, "profundidad": 4, "ancho": 3},
+    {"nombre": "anidada-8v-p6", "forma": "anidada", "nvars": 8, "profundidad": 6, "ancho": 3},
+]
+
+# por debajo de este tiempo (s) las diferencias son ruido y no se comparan
+MINIMO_COMPARABLE = 0.002
+
+
+def mejor_tiempo(fn, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def subterminos(arboles):
+    vistos, pila = set(), list(arboles)
+    while pila:
+        e = pila.pop()
+        if e not in vistos:
+            vistos.add(e)
+            pila.extend(logic.hijos(e))
+    return list(vistos)
+
+
+def medir_caso(caso, cantidad, repeticiones, semilla):
+    parametros = {k: v for k, v in caso.items() if k != "nombre"}
+    textos = generadores.lote(semilla, cantidad, **parametros)
+    normalizados = [logic.normalizar(t) for t in textos]
+    arboles = [logic.parsear(t) for t in normalizados]
+    nodos = subterminos(arboles)
+
+    metricas = {
+        "normalizar_s": mejor_tiempo(lambda: [logic.normalizar(t) for t in textos], repeticiones),
+        "parsear_s": mejor_tiempo(lambda: [logic.parsear(t) for t in normalizados], repeticiones),
+        "simplificar_s": mejor_tiempo(lambda: [logic.simplificar_expresion(t) for t in textos], repeticiones),
+    }
+    leyes = {}
+    for ley in logic.boolean_laws:
+        leyes[ley.__name__] = mejor_tiempo(lambda: [ley(e) for e in nodos], repeticiones)
+
+    tracemalloc.start()
+    for t in textos:
+        logic.simplificar_expresion(t)
+    metricas["pico_memoria_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return {"metricas": metricas, "leyes": leyes, "nodos": len(nodos)}
+
+
+def ejecutar(cantidad=20, repeticiones=3, semilla=1, casos=CASOS):
+    resultados = {
+        "python": platform.python_version(),
+        "semilla": semilla,
+        "cantidad": cantidad,
+        "casos": {},
+    }
+    for caso in casos:
+        resultados["casos"][caso["nombre"]] = medir_caso(caso, cantidad, repeticiones, semilla)
+    return resultados
+
+
+def aplanar(resultados):
+    planos = {}
+    for nombre, r in resultados["casos"].items():
+        for k, v in r["metricas"].items():
+            planos[f"{nombre}/{k}"] = v
+        for k, v in r["leyes"].items():
+            planos[f"{nombre}/{k}"] = v
+    return planos
+
+
+def regresiones(actual, base, umbral):
+    # [(métrica, base, actual)] que empeoran más de `umbral` (fracción)
+    peores = []
+    a, b = aplanar(actual), aplanar(base)
+    for clave, vb in b.items():
+        va = a.get(clave)
+        if va is None:
+            continue
+        if clave.endswith("_s") or "/ley_" in clave:
+            if vb < MINIMO_COMPARABLE and va < MINIMO_COMPARABLE:
+                continue
+        if va > vb * (1 + umbral):
+            peores.append((clave, vb, va))
+    return peores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--cantidad", type=int, default=20, help="expresiones por caso")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    parser.add_argument("--base", default=BASE, help="resultados de referencia")
+    parser.add_argument("--umbral", type=float, default=0.25, help="empeoramiento tolerado (0.25 = 25%%)")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar estos resultados como base")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.cantidad, args.repeticiones, args.semilla)
+    for nombre, r in resultados["casos"].items():
+        m = r["metricas"]
+        print(f"{nombre:<16} nodos={r['nodos']:>6}  normalizar={m['normalizar_s']:.4f}s  "
+              f"parsear={m['parsear_s']:.4f}s  simplificar={m['simplificar_s']:.4f}s  "
+              f"pico={m['pico_memoria_kb']:.0f} KiB")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Base guardada en {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        print("Sin base de referencia: no se comparan regresiones (usa --guardar-base).")
+        return 0
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    peores = regresiones(resultados, base, args.umbral)
+    for clave, vb, va in peores:
+        print(f"REGRESIÓN {clave}: {vb:.6g} -> {va:.6g} (+{(va / vb - 1) * 100:.0f}%)")
+    if peores:
+        return 1
+    print(f"Sin regresiones por encima del {args.umbral:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
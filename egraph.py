@@ -0,0 +1,410 @@
+# Simplificación por saturación de igualdades (e-graph). En lugar de aplicar
+# las leyes en un orden fijo, se aplican todas a la vez sobre un e-graph que
+# guarda todas las formas equivalentes descubiertas; al final se extrae la de
+# menor coste. Así una ley que se aplica primero no bloquea otra mejor.
+#   - e-nodos internados (memo): ("v", nombre), ("c", 0/1), ("n", clase),
+#     ("a", clases) y ("o", clases). Los operandos de "a"/"o" se guardan
+#     ordenados y sin repetir, así que la conmutativa y la idempotencia van
+#     incluidas en la forma canónica.
+#   - union-find sobre e-clases y reconstrucción (rebuild) que vuelve a
+#     canonizar los e-nodos y une los que pasan a ser iguales (congruencia).
+#   - reglas: las leyes de logic (doble negación, De Morgan, complemento,
+#     neutro/anulador, asociativa, absorción, complemento absorbido, factor
+#     común y su dual) como reescrituras; De Morgan en ambos sentidos.
+#   - límites de e-nodos y de tiempo; extracción por número de literales o
+#     por profundidad.
+import time
+
+from logic import And, Const, Not, Or, Var, clave_orden, hijos, simplificar_con
+
+MAX_NODOS = 20_000
+LIMITE_SEGUNDOS = 2.0
+MAX_ITERACIONES = 30
+# coincidencias por regla e iteración antes de suspenderla
+MAX_COINCIDENCIAS = 200
+# elementos recorridos entre dos consultas del reloj
+CADA_CONSULTA = 64
+# parte de max_segundos que optimizar reserva para la extracción
+RESERVA_EXTRACCION = 0.1
+
+
+class _Agotado(Exception):
+    # se acabó el tiempo en mitad de una fase de saturar
+    pass
+
+
+def _vencido(limite, k):
+    return limite is not None and k % CADA_CONSULTA == 0 and time.monotonic() > limite
+
+
+class EGraph:
+    def __init__(self):
+        self.padre = []
+        self.memo = {}      # e-nodo canónico -> clase
+        self.clases = {}    # clase raíz -> [e-nodos]
+        self.uniones = 0
+
+    def buscar(self, c):
+        padre = self.padre
+        while padre[c] != c:
+            padre[c] = padre[padre[c]]
+            c = padre[c]
+        return c
+
+    def canonico(self, nodo):
+        tipo = nodo[0]
+        if tipo == "n":
+            return ("n", self.buscar(nodo[1]))
+        if tipo == "a" or tipo == "o":
+            return (tipo, tuple(sorted({self.buscar(c) for c in nodo[1]})))
+        return nodo
+
+    def agregar(self, nodo):
+        nodo = self.canonico(nodo)
+        if (nodo[0] == "a" or nodo[0] == "o") and len(nodo[1]) == 1:
+            return nodo[1][0]
+        c = self.memo.get(nodo)
+        if c is not None:
+            return self.buscar(c)
+        c = len(self.padre)
+        self.padre.append(c)
+        self.memo[nodo] = c
+        self.clases[c] = [nodo]
+        return c
+
+    def unir(self, a, b):
+        a, b = self.buscar(a), self.buscar(b)
+        if a == b:
+            return a
+        if len(self.clases[a]) < len(self.clases[b]):
+            a, b = b, a
+        self.padre[b] = a
+        self.clases[a].extend(self.clases.pop(b))
+        self.uniones += 1
+        return a
+
+    def reconstruir(self, limite=None):
+        # vuelve a canonizar todos los e-nodos hasta que no haya nuevas
+        # uniones por congruencia (dos e-nodos iguales en clases distintas).
+        # Si pasa `limite` (time.monotonic()) lanza _Agotado: las uniones
+        # hechas valen y extraer canoniza por su cuenta, así que el e-graph
+        # se puede seguir usando
+        while True:
+            antes = self.uniones
+            memo = {}
+            colapsados = []
+            for k, (nodo, c) in enumerate(self.memo.items()):
+                if _vencido(limite, k):
+                    raise _Agotado
+                nodo = self.canonico(nodo)
+                c = self.buscar(c)
+                if (nodo[0] == "a" or nodo[0] == "o") and len(nodo[1]) == 1:
+                    colapsados.append((c, nodo[1][0]))
+                    continue
+                otra = memo.get(nodo)
+                if otra is not None and self.buscar(otra) != c:
+                    c = self.unir(otra, c)
+                memo[nodo] = c
+            for c, x in colapsados:
+                self.unir(c, x)
+            self.memo = memo
+            if self.uniones == antes:
+                break
+        clases = {}
+        for nodo, c in self.memo.items():
+            clases.setdefault(self.buscar(c), []).append(nodo)
+        self.clases = clases
+
+    def __len__(self):
+        return len(self.memo)
+
+    def agregar_ast(self, expr):
+        hechos = {}
+        pila = [expr]
+        while pila:
+            e = pila[-1]
+            if e in hechos:
+                pila.pop()
+                continue
+            pendientes = [h for h in hijos(e) if h not in hechos]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            if isinstance(e, Const):
+                c = self.agregar(("c", e.v))
+            elif isinstance(e, Var):
+                c = self.agregar(("v", e.nombre))
+            elif isinstance(e, Not):
+                c = self.agregar(("n", hechos[e.x]))
+            else:
+                c = self.agregar(("a" if isinstance(e, And) else "o", tuple(hechos[h] for h in e.cosas)))
+            hechos[e] = c
+        return hechos[expr]
+
+
+def _dual(tipo):
+    return "o" if tipo == "a" else "a"
+
+
+def _coincidencias(g, limite=None):
+    # (regla, clase, función que construye un término equivalente) para cada
+    # regla que se aplica; se calculan todas antes de modificar el e-graph.
+    # Lanza _Agotado si pasa `limite`
+    const_de, negaciones, negados, compuestos = {}, {}, {}, {}
+    for c, nodos in g.clases.items():
+        for nodo in nodos:
+            if nodo[0] == "c":
+                const_de[c] = nodo[1]
+            elif nodo[0] == "n":
+                negaciones.setdefault(c, []).append(nodo[1])
+                negados.setdefault(nodo[1], []).append(c)
+            elif nodo[0] in ("a", "o"):
+                compuestos.setdefault((nodo[0], c), []).append(nodo[1])
+
+    def complementos(x):
+        return negaciones.get(x, []) + negados.get(x, [])
+
+    res = []
+    for k, (c, nodos) in enumerate(g.clases.items()):
+        if _vencido(limite, k):
+            raise _Agotado
+        if c in const_de:
+            # ya se sabe que vale 0 o 1: nada que ganar reescribiéndola
+            continue
+        for nodo in nodos:
+            tipo = nodo[0]
+            if tipo == "n":
+                x = nodo[1]
+                for y in negaciones.get(x, ()):
+                    res.append(("doble negación", c, lambda y=y: y))  # x'' = x
+                if x in const_de:
+                    res.append(("constante", c, lambda v=1 - const_de[x]: g.agregar(("c", v))))
+                for t in ("a", "o"):
+                    for xs in compuestos.get((t, x), ()):
+                        # De Morgan
+                        res.append(("De Morgan", c, lambda t=t, xs=xs: g.agregar(
+                            (_dual(t), tuple(g.agregar(("n", y)) for y in xs)))))
+            elif tipo in ("a", "o"):
+                res.extend(_reglas_nario(g, c, tipo, nodo[1], const_de, negaciones, complementos, compuestos))
+    return res
+
+
+def _reglas_nario(g, c, tipo, xs, const_de, negaciones, complementos, compuestos):
+    dual = _dual(tipo)
+    neutro, anulador = (1, 0) if tipo == "a" else (0, 1)
+    conjunto = set(xs)
+    res = []
+
+    # anulador, neutro y complemento
+    if any(const_de.get(x) == anulador for x in xs):
+        return [("anulador", c, lambda: g.agregar(("c", anulador)))]
+    if any(conjunto.intersection(complementos(x)) for x in xs):
+        return [("complemento", c, lambda: g.agregar(("c", anulador)))]
+    sin_neutro = tuple(x for x in xs if const_de.get(x) != neutro)
+    if len(sin_neutro) != len(xs):
+        res.append(("neutro", c, lambda: g.agregar((tipo, sin_neutro)) if sin_neutro else g.agregar(("c", neutro))))
+
+    # De Morgan inverso: x'*y'*... = (x+y+...)'
+    if all(negaciones.get(x) for x in xs):
+        res.append(("De Morgan", c, lambda: g.agregar(("n", g.agregar((dual, tuple(negaciones[x][0] for x in xs)))))))
+
+    for i, x in enumerate(xs):
+        resto = xs[:i] + xs[i + 1:]
+        # asociativa: aplanar un operando del mismo tipo
+        for ys in compuestos.get((tipo, x), ()):
+            res.append(("asociativa", c, lambda resto=resto, ys=ys: g.agregar((tipo, resto + ys))))
+        for ys in compuestos.get((dual, x), ()):
+            # absorción: x + x*y = x ; x * (x + y) = x
+            if conjunto.intersection(ys) - {x}:
+                res.append(("absorción", c, lambda resto=resto: g.agregar((tipo, resto))))
+            else:
+                # complemento absorbido: x' + x*y = x' + y ; x' * (x + y) = x' * y
+                for z in ys:
+                    if conjunto.intersection(complementos(z)):
+                        sin_z = tuple(y for y in ys if y != z)
+                        res.append(("complemento absorbido", c, lambda resto=resto, sin_z=sin_z: g.agregar(
+                            (tipo, resto + (g.agregar((dual, sin_z)),)))))
+
+    # factor común: x*y + x*z + w = x*(y + z) + w (y su dual)
+    apariciones = {}
+    for i, x in enumerate(xs):
+        for ys in compuestos.get((dual, x), ()):
+            for f in ys:
+                lista = apariciones.setdefault(f, [])
+                if not lista or lista[-1][0] != i:
+                    lista.append((i, ys))
+    for f, lista in apariciones.items():
+        if len(lista) < 2:
+            continue
+        usados = {i for i, _ in lista}
+        otros = tuple(x for i, x in enumerate(xs) if i not in usados)
+
+        def factorizar(f=f, lista=lista, otros=otros):
+            restos = []
+            for _, ys in lista:
+                r = tuple(y for y in ys if y != f)
+                # sin resto queda el neutro del dual (x = x*1 ; x = x + 0),
+                # que es el anulador de `tipo`
+                restos.append(g.agregar((dual, r)) if r else g.agregar(("c", anulador)))
+            # con tipo "o": f*(r1 + r2 + ...) ; con tipo "a": f + r1*r2*...
+            interno = g.agregar((tipo, tuple(restos)))
+            factor = g.agregar((dual, (f, interno)))
+            return g.agregar((tipo, otros + (factor,))) if otros else factor
+
+        res.append(("factor común", c, factorizar))
+    return res
+
+
+def saturar(g, max_nodos=MAX_NODOS, max_segundos=LIMITE_SEGUNDOS, max_iteraciones=MAX_ITERACIONES):
+    # aplica las reglas hasta el punto fijo o hasta un límite; devuelve el
+    # motivo. Una regla que da más de su cupo de coincidencias en una
+    # iteración (asociativa y factor común crecen combinatoriamente) se
+    # suspende unas iteraciones y su cupo se duplica, como en egg.
+    # El tiempo se consulta también al buscar coincidencias y al reconstruir.
+    limite = time.monotonic() + max_segundos
+    try:
+        return _saturar(g, max_nodos, limite, max_iteraciones)
+    except _Agotado:
+        return "límite de tiempo"
+
+
+def _saturar(g, max_nodos, limite, max_iteraciones):
+    cupo, suspendida = {}, {}
+    for it in range(max_iteraciones):
+        nodos, uniones = len(g), g.uniones
+        por_regla = {}
+        for regla, c, construir in _coincidencias(g, limite):
+            por_regla.setdefault(regla, []).append((c, construir))
+        hubo_suspension = False
+        for regla, lista in por_regla.items():
+            if suspendida.get(regla, -1) >= it:
+                hubo_suspension = True
+                continue
+            k = cupo.get(regla, MAX_COINCIDENCIAS)
+            if len(lista) > k:
+                cupo[regla] = 2 * k
+                suspendida[regla] = it + k // MAX_COINCIDENCIAS
+                hubo_suspension = True
+                continue
+            for c, construir in lista:
+                if len(g) > max_nodos:
+                    g.reconstruir(limite)
+                    return "límite de nodos"
+                if time.monotonic() > limite:
+                    return "límite de tiempo"
+                g.unir(c, construir())
+        g.reconstruir(limite)
+        if len(g) == nodos and g.uniones == uniones and not hubo_suspension:
+            return "saturado"
+    return "límite de iteraciones"
+
+
+def _costo_literales(nodo, costos):
+    # (literales, compuertas)
+    tipo = nodo[0]
+    if tipo == "v":
+        return (1, 0)
+    if tipo == "c":
+        return (0, 0)
+    if tipo == "n":
+        l, k = costos[nodo[1]]
+        return (l, k + 1)
+    ls = [costos[x] for x in nodo[1]]
+    return (sum(l for l, _ in ls), sum(k for _, k in ls) + 1)
+
+
+def _costo_profundidad(nodo, costos):
+    # (profundidad, literales)
+    tipo = nodo[0]
+    if tipo == "v":
+        return (0, 1)
+    if tipo == "c":
+        return (0, 0)
+    if tipo == "n":
+        p, l = costos[nodo[1]]
+        return (p + 1, l)
+    cs = [costos[x] for x in nodo[1]]
+    return (max(p for p, _ in cs) + 1, sum(l for _, l in cs))
+
+
+COSTOS = {"literales": _costo_literales, "profundidad": _costo_profundidad}
+
+
+def extraer(g, raiz, costo="literales", limite=None):
+    # mejor e-nodo de cada clase por punto fijo (los costes solo bajan) y
+    # reconstrucción del AST desde la raíz. Los e-nodos se canonizan aquí,
+    # así que vale un e-graph sin reconstruir (saturar cortada por tiempo).
+    # Pasado `limite` se queda con lo encontrado si la raíz ya tiene coste;
+    # si no, devuelve (None, None)
+    funcion = COSTOS[costo]
+    raiz = g.buscar(raiz)
+    costos, mejor = {}, {}
+    cambio, vueltas = True, 0
+    while cambio:
+        cambio = False
+        for c, nodos in g.clases.items():
+            vueltas += 1
+            if _vencido(limite, vueltas):
+                if raiz not in costos:
+                    return None, None
+                cambio = False
+                break
+            for nodo in nodos:
+                nodo = g.canonico(nodo)
+                if nodo[0] == "n":
+                    if nodo[1] not in costos:
+                        continue
+                elif nodo[0] in ("a", "o") and any(x not in costos for x in nodo[1]):
+                    continue
+                k = funcion(nodo, costos)
+                if c not in costos or k < costos[c]:
+                    costos[c], mejor[c] = k, nodo
+                    cambio = True
+
+    hechos = {}
+    pila = [raiz]
+    while pila:
+        c = pila[-1]
+        if c in hechos:
+            pila.pop()
+            continue
+        nodo = mejor[c]
+        hs = (nodo[1],) if nodo[0] == "n" else (nodo[1] if nodo[0] in ("a", "o") else ())
+        pendientes = [x for x in hs if x not in hechos]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if nodo[0] == "v":
+            e = Var(nodo[1])
+        elif nodo[0] == "c":
+            e = Const(nodo[1])
+        elif nodo[0] == "n":
+            e = Not(hechos[nodo[1]])
+        else:
+            ops = sorted((hechos[x] for x in nodo[1]), key=clave_orden)
+            e = And(ops) if nodo[0] == "a" else Or(ops)
+        hechos[c] = e
+    return hechos[raiz], costos[raiz]
+
+
+def optimizar(expr, costo="literales", max_nodos=MAX_NODOS, max_segundos=LIMITE_SEGUNDOS):
+    # AST -> (AST de menor coste, estadísticas); saturación y extracción
+    # comparten los `max_segundos` (si no da tiempo a extraer, la entrada)
+    limite = time.monotonic() + max_segundos
+    g = EGraph()
+    raiz = g.agregar_ast(expr)
+    motivo = saturar(g, max_nodos, max_segundos * (1 - RESERVA_EXTRACCION))
+    mejor, valor = extraer(g, raiz, costo, limite)
+    if mejor is None:
+        mejor, valor, motivo = expr, None, "límite de tiempo"
+    return mejor, {"motivo": motivo, "nodos": len(g), "clases": len(g.clases), "costo": valor}
+
+
+def simplificar_egraph(texto, costo="literales", max_nodos=MAX_NODOS, max_segundos=LIMITE_SEGUNDOS):
+    def transformar(expr):
+        mejor, est = optimizar(expr, costo, max_nodos, max_segundos)
+        return mejor, f"{est['nodos']} e-nodos, {est['clases']} clases, {est['motivo']}"
+
+    return simplificar_con(texto, transformar, f"Saturación de igualdades (e-graph, {costo})")
@@ -0,0 +1,262 @@
+# Evaluación rápida de una expresión sobre muchas filas de señales 0/1
+# (por ejemplo, para usar la expresión simplificada como filtro).
+#   - compilar(expr): genera el código de una función de Python con una
+#     operación de bits por nodo (los subárboles compartidos se calculan una
+#     vez). La misma función sirve para una fila (enteros 0/1), para
+#     columnas empaquetadas en enteros (bit r = fila r) y para columnas de
+#     NumPy (arrays de bool): solo cambia el valor de `_uno`.
+#   - evaluar(f, filas): por columnas sin NumPy, en trozos de `chunk` filas
+#     empaquetadas en enteros, como tabla_verdad.
+#   - evaluar_columnas(f, {nombre: columna}): lo mismo con los datos ya
+#     guardados por columnas.
+#   - evaluar_matriz(f, matriz): por columnas con NumPy, en trozos.
+#   - evaluar_csv(f, flujo): lee un CSV con cabecera por trozos.
+#   python -m evaluador "A*B'+C" datos.csv [--contar]
+import argparse
+import csv
+import sys
+from itertools import islice
+
+from logic import And, Const, Not, Var, hijos, parsear
+from tabla_verdad import variables
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# filas por trozo: acota la memoria sea cual sea el tamaño de la entrada
+CHUNK = 1 << 16
+# nodos anidados en una misma expresión antes de pasar a una variable local
+# (el compilador de Python tiene un límite de anidamiento)
+MAX_ANIDADO = 40
+
+
+def interpretar(expr, valores):
+    # recorrido directo del árbol para una fila: {nombre: 0/1} -> 0/1
+    hechos = {}
+    pila = [expr]
+    while pila:
+        e = pila[-1]
+        if e in hechos:
+            pila.pop()
+            continue
+        pendientes = [h for h in hijos(e) if h not in hechos]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(e, Const):
+            hechos[e] = e.v
+        elif isinstance(e, Var):
+            hechos[e] = valores[e.nombre]
+        elif isinstance(e, Not):
+            hechos[e] = 1 - hechos[e.x]
+        elif isinstance(e, And):
+            hechos[e] = int(all(hechos[h] for h in e.cosas))
+        else:
+            hechos[e] = int(any(hechos[h] for h in e.cosas))
+    return hechos[expr]
+
+
+def fuente(expr, orden):
+    # código de `def evaluar(<variables>, _uno=1)`; un nodo usado más de una
+    # vez o demasiado anidado se guarda en una variable local t<k>
+    usos, pila = {expr: 1}, [expr]
+    while pila:
+        e = pila.pop()
+        for h in hijos(e):
+            if h in usos:
+                usos[h] += 1
+            else:
+                usos[h] = 1
+                pila.append(h)
+    params = {nombre: f"v{i}" for i, nombre in enumerate(orden)}
+    lineas, texto, alto = [], {}, {}
+    pila = [expr]
+    while pila:
+        e = pila[-1]
+        if e in texto:
+            pila.pop()
+            continue
+        pendientes = [h for h in hijos(e) if h not in texto]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(e, Const):
+            t, a = ("_uno" if e.v else "(_uno ^ _uno)"), 0
+        elif isinstance(e, Var):
+            t, a = params[e.nombre], 0
+        elif isinstance(e, Not):
+            t, a = f"({texto[e.x]} ^ _uno)", alto[e.x] + 1
+        else:
+            op = " & " if isinstance(e, And) else " | "
+            t = "(" + op.join(texto[h] for h in e.cosas) + ")"
+            a = max(alto[h] for h in e.cosas) + 1
+        if not isinstance(e, (Const, Var)) and (usos[e] > 1 or a >= MAX_ANIDADO) and e is not expr:
+            nombre = f"t{len(lineas)}"
+            lineas.append(f"    {nombre} = {t}")
+            t, a = nombre, 0
+        texto[e], alto[e] = t, a
+    args = ", ".join(params[n] for n in orden)
+    cabecera = f"def evaluar({args + ', ' if args else ''}_uno=1):"
+    return "\n".join([cabecera, *lineas, f"    return {texto[expr]}"]) + "\n"
+
+
+def compilar(expr, orden=None):
+    # función especializada; argumentos en `orden` (por defecto las variables
+    # ordenadas por nombre), también disponibles como f.orden y f.fuente
+    if isinstance(expr, str):
+        expr = parsear(expr)
+    orden = variables(expr) if orden is None else [n.upper() for n in orden]
+    codigo = fuente(expr, orden)
+    espacio = {}
+    exec(compile(codigo, "<evaluador>", "exec"), espacio)
+    f = espacio["evaluar"]
+    f.orden = orden
+    f.fuente = codigo
+    return f
+
+
+# 0/1 <-> dígitos "0"/"1": int(..., 2) y format(..., "b") hacen el
+# empaquetado en C, sin un bucle de Python por fila
+_A_DIGITO = bytes.maketrans(b"\x00\x01", b"01")
+_A_BIT = bytes.maketrans(b"01", b"\x00\x01")
+_DIGITOS = frozenset("01")
+
+
+def _empaquetar(columna):
+    # secuencia de 0/1 -> entero con el bit r = fila r
+    return int(bytes(columna)[::-1].translate(_A_DIGITO) or b"0", 2)
+
+
+def _desempaquetar(r, n):
+    # entero -> bytes con un 0/1 por fila
+    return format(r, f"0{n}b").encode()[::-1].translate(_A_BIT)
+
+
+def evaluar(f, filas, chunk=CHUNK):
+    # filas: secuencias con los valores en el orden de f.orden; genera un 0/1
+    # por fila. Cada trozo se transpone a columnas empaquetadas y se evalúa
+    # con una sola llamada a f
+    filas = iter(filas)
+    while True:
+        trozo = list(islice(filas, chunk))
+        if not trozo:
+            return
+        n = len(trozo)
+        columnas = [_empaquetar(c) for c in zip(*trozo)] if f.orden else []
+        yield from _desempaquetar(f(*columnas, _uno=(1 << n) - 1), n)
+
+
+def evaluar_columnas(f, columnas, chunk=CHUNK):
+    # columnas: {nombre: secuencia de 0/1 (bytes, bytearray, lista)}, ya por
+    # columnas (sin transponer filas). Devuelve bytes con un 0/1 por fila
+    cols = {n.upper(): c for n, c in columnas.items()}
+    datos = [cols[n] for n in f.orden]
+    n = len(next(iter(cols.values()))) if cols else 0
+    salida = bytearray()
+    for i in range(0, n, chunk):
+        k = min(chunk, n - i)
+        salida += _desempaquetar(f(*(_empaquetar(c[i:i + k]) for c in datos), _uno=(1 << k) - 1), k)
+    return bytes(salida)
+
+
+def evaluar_matriz(f, matriz, columnas=None, chunk=CHUNK):
+    # NumPy: matriz 2D de 0/1 o bool (una fila por registro); `columnas` da el
+    # nombre de cada columna de la matriz (por defecto, f.orden). Devuelve un
+    # array de bool con el resultado por fila
+    if np is None:
+        raise RuntimeError("evaluar_matriz necesita NumPy; sin él, usar evaluar()")
+    matriz = np.asarray(matriz)
+    columnas = f.orden if columnas is None else [c.upper() for c in columnas]
+    indices = [columnas.index(n) for n in f.orden]
+    salida = np.empty(len(matriz), dtype=bool)
+    for i in range(0, len(matriz), chunk):
+        bloque = matriz[i:i + chunk]
+        args = [bloque[:, j].astype(bool, copy=False) for j in indices]
+        salida[i:i + len(bloque)] = f(*args, _uno=True) if args else f(_uno=True)
+    return salida
+
+
+def _columna_csv(filas, j, nombre, primera):
+    # texto "0110..." de la columna j de un trozo (un dígito por fila).
+    # ValueError con la fila (contando desde 1 sin la cabecera) y la columna
+    # de la primera celda que no es 0 ni 1: una celda vacía o de dos
+    # caracteres desplazaría los bits de todas las filas siguientes
+    columna = "".join([fila[j].strip() if j < len(fila) else "" for fila in filas])
+    if len(columna) == len(filas) and _DIGITOS.issuperset(columna):
+        return columna
+    for k, fila in enumerate(filas):
+        valor = fila[j].strip() if j < len(fila) else ""
+        if valor not in _DIGITOS:
+            raise ValueError(f"Fila {primera + k}, columna {nombre}: se esperaba 0 o 1 y hay {valor!r}")
+
+
+def evaluar_csv(f, flujo, chunk=CHUNK, delimitador=","):
+    # CSV con cabecera (nombres de las señales, sin distinguir mayúsculas) y
+    # celdas 0/1. Genera (filas, resultados) por trozo: resultados es un array
+    # de bool con NumPy o bytes con un 0/1 por fila sin él
+    lector = csv.reader(flujo, delimiter=delimitador)
+    cabecera = [c.strip().upper() for c in next(lector)]
+    faltan = [n for n in f.orden if n not in cabecera]
+    if faltan:
+        raise ValueError(f"Columnas que faltan en el CSV: {', '.join(faltan)}")
+    indices = [cabecera.index(n) for n in f.orden]
+    primera = 1
+    while True:
+        filas = list(islice(lector, chunk))
+        if not filas:
+            return
+        n = len(filas)
+        columnas = [_columna_csv(filas, j, nombre, primera) for j, nombre in zip(indices, f.orden)]
+        if np is not None:
+            args = [np.frombuffer(c.encode(), dtype=np.uint8) == 49 for c in columnas]
+            res = f(*args, _uno=True) if args else np.full(n, bool(f(_uno=1)))
+        else:
+            # la columna de texto "0110..." se empaqueta directamente
+            args = [int(c[::-1], 2) for c in columnas]
+            res = _desempaquetar(f(*args, _uno=(1 << n) - 1), n)
+        primera += n
+        yield filas, res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m evaluador", description="Filtra las filas de un CSV de señales 0/1 con una expresión.")
+    parser.add_argument("expresion")
+    parser.add_argument("entrada", nargs="?", default="-", help="CSV con cabecera ('-' = entrada estándar)")
+    parser.add_argument("--contar", action="store_true", help="solo el número de filas que cumplen")
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    args = parser.parse_args(argv)
+
+    f = compilar(args.expresion)
+    archivo = sys.stdin if args.entrada == "-" else open(args.entrada, newline="", encoding="utf-8")
+    try:
+        flujo = archivo
+        if not args.contar:
+            cabecera = archivo.readline()
+            sys.stdout.write(cabecera)
+            flujo = _con_cabecera(cabecera, archivo)
+        escritor = csv.writer(sys.stdout, lineterminator="\n")
+        total = 0
+        for filas, res in evaluar_csv(f, flujo, args.chunk):
+            if args.contar:
+                total += int(sum(res))
+            else:
+                escritor.writerows(fila for fila, r in zip(filas, res) if r)
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+    if args.contar:
+        print(total)
+    return 0
+
+
+def _con_cabecera(cabecera, flujo):
+    yield cabecera
+    yield from flujo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
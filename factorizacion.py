@@ -0,0 +1,256 @@
+# Factorización algebraica (multinivel) de sumas de productos grandes, con
+# kernels y co-kernels (Brayton-McMullen):
+#   - un cubo es un frozenset de literales; un literal es el entero
+#     2 * id_de_símbolo + negado. Una SOP es una lista de cubos sin repetir
+#     y sin cubos que contengan a otro.
+#   - dividir(F, D): división débil (algebraica), F = Q*D + R.
+#   - kernels(F): cocientes libres de cubos de F entre sus co-kernels,
+#     recorriendo el índice literal -> cubos (la matriz de cubos).
+#   - factorizar(F): extracción voraz; en cada nivel se divide por el kernel
+#     (o el literal) que más literales ahorra y se sigue con Q, D y R.
+# Solo usa álgebra de polinomios: fuera de quitar los cubos contradictorios
+# (x*x' = 0) y los que contienen a otro (minimizar_contencion), no aplica
+# leyes booleanas como x + x' = 1, así que el resultado es equivalente
+# siempre y la factorización es rápida incluso con cientos de productos.
+#   python -m factorizacion "A*B*C + A*B*D + A*E + F*C + F*D"
+import argparse
+import sys
+
+from logic import And, Const, Not, Or, Var, hijos, simplificar_con, tabla_simbolos
+
+# kernels evaluados como mucho por nivel de la factorización
+MAX_KERNELS = 400
+# cubos como mucho al pasar a suma de productos una expresión que no lo es
+MAX_CUBOS = 20_000
+
+
+def literal(nombre, negado=False):
+    return 2 * tabla_simbolos.id(nombre) + negado
+
+
+def _hoja(lit):
+    v = Var(tabla_simbolos.nombre(lit >> 1))
+    return Not(v) if lit & 1 else v
+
+
+def minimizar_contencion(cubos):
+    # quita repetidos, cubos contradictorios (x*x') y cubos que contienen a
+    # otro (a + a*b = a)
+    unicos = {c for c in cubos if not any(l ^ 1 in c for l in c)}
+    res = []
+    for c in sorted(unicos, key=len):
+        if not any(d <= c for d in res if len(d) < len(c)):
+            res.append(c)
+    return res
+
+
+def a_sop(expr, max_cubos=MAX_CUBOS):
+    # AST -> lista de cubos; las negaciones bajan por De Morgan y los
+    # productos de sumas se reparten (ValueError si pasan de max_cubos).
+    # Lista vacía = 0; [frozenset()] = 1
+    def sop(e, negado):
+        if isinstance(e, Const):
+            return [frozenset()] if e.v != negado else []
+        if isinstance(e, Var):
+            return [frozenset([literal(e.nombre, negado)])]
+        if isinstance(e, Not):
+            return sop(e.x, not negado)
+        suma = isinstance(e, Or) != negado
+        partes = [sop(h, negado) for h in e.cosas]
+        if suma:
+            return minimizar_contencion([c for p in partes for c in p])
+        res = [frozenset()]
+        for p in partes:
+            res = minimizar_contencion([a | b for a in res for b in p])
+            if len(res) > max_cubos:
+                raise ValueError(f"La suma de productos pasa de {max_cubos} cubos")
+        return res
+
+    try:
+        return sop(expr, False)
+    except RecursionError:
+        raise ValueError("Expresión demasiado profunda para pasarla a suma de productos") from None
+
+
+def indice(F):
+    # matriz de cubos por literal: literal -> [cubos que lo tienen]
+    res = {}
+    for c in F:
+        for l in c:
+            res.setdefault(l, []).append(c)
+    return res
+
+
+def dividir(F, D):
+    # división débil: (Q, R) con F = Q*D + R y Q máximo
+    por_literal = indice(F)
+    Q = None
+    for d in D:
+        if d:
+            # solo los cubos que tienen el literal menos frecuente de d
+            l = min(d, key=lambda x: len(por_literal.get(x, ())))
+            candidatos = por_literal.get(l, ())
+        else:
+            candidatos = F
+        qd = {c - d for c in candidatos if d <= c}
+        Q = qd if Q is None else Q & qd
+        if not Q:
+            return [], list(F)
+    producto = {q | d for q in Q for d in D}
+    return sorted(Q, key=sorted), [c for c in F if c not in producto]
+
+
+def comun(F):
+    # mayor cubo común a todos los cubos de F
+    return frozenset.intersection(*F) if F else frozenset()
+
+
+def kernels(F, limite=MAX_KERNELS):
+    # [(kernel, co-kernel)]: para cada literal (en orden) que está en dos o
+    # más cubos, se divide por el mayor cubo común C de esos cubos y se
+    # sigue con el cociente; si C tiene un literal anterior, ese kernel ya
+    # salió por otra rama
+    res = []
+
+    def buscar(G, desde, cokernel):
+        por_literal = indice(G)
+        for l in sorted(por_literal):
+            if len(res) >= limite:
+                return
+            if l < desde:
+                continue
+            S = por_literal[l]
+            if len(S) < 2:
+                continue
+            C = comun(S)
+            if any(x < l for x in C):
+                continue
+            buscar([c - C for c in S], l + 1, cokernel | C)
+        if len(G) >= 2 and not comun(G):
+            res.append((G, cokernel))
+
+    buscar(list(F), 0, frozenset())
+    return res
+
+
+def literales_sop(F):
+    return sum(len(c) for c in F)
+
+
+def _mejor_divisor(F):
+    # el kernel o literal que más literales ahorra al dividir: sin factorizar
+    # F cuesta lits(F); dividido, lits(Q) + lits(D) + lits(R)
+    total = literales_sop(F)
+    mejor, ahorro = None, 0
+    candidatos = [k for k, _ in kernels(F) if len(k) < len(F) or comun(F)]
+    por_literal = indice(F)
+    frecuente = max(por_literal, key=lambda l: (len(por_literal[l]), -l), default=None)
+    if frecuente is not None and len(por_literal[frecuente]) >= 2:
+        candidatos.append([frozenset([frecuente])])
+    for D in candidatos:
+        Q, R = dividir(F, D)
+        if not Q:
+            continue
+        a = total - (literales_sop(Q) + literales_sop(D) + literales_sop(R))
+        if a > ahorro:
+            mejor, ahorro = (Q, D, R), a
+    return mejor
+
+
+def _arbol_sop(F):
+    if not F:
+        return Const(0)
+    terminos = []
+    for c in sorted(F, key=lambda c: (len(c), sorted(c))):
+        if not c:
+            return Const(1)
+        hojas = [_hoja(l) for l in sorted(c)]
+        terminos.append(hojas[0] if len(hojas) == 1 else And(hojas))
+    return terminos[0] if len(terminos) == 1 else Or(terminos)
+
+
+def _producto(a, b):
+    cosas = []
+    for x in (a, b):
+        cosas.extend(x.cosas if isinstance(x, And) else (x,))
+    return And(cosas)
+
+
+def _suma(a, b):
+    cosas = []
+    for x in (a, b):
+        cosas.extend(x.cosas if isinstance(x, Or) else (x,))
+    return Or(cosas)
+
+
+def factorizar_sop(F):
+    # lista de cubos -> AST factorizado
+    F = minimizar_contencion(F)
+    if len(F) <= 1:
+        return _arbol_sop(F)
+    # primero el cubo común a todos: F = C * (F / C)
+    C = comun(F)
+    if C:
+        return _producto(_arbol_sop([C]), factorizar_sop([c - C for c in F]))
+    division = _mejor_divisor(F)
+    if division is None:
+        return _arbol_sop(F)
+    Q, D, R = division
+    arbol = _producto(factorizar_sop(Q), factorizar_sop(D))
+    return _suma(arbol, factorizar_sop(R)) if R else arbol
+
+
+def contar(expr):
+    # (literales, compuertas): hojas Var del árbol escrito y nodos
+    # And/Or/Not distintos del DAG
+    lits, pila = 0, [expr]
+    while pila:
+        e = pila.pop()
+        if isinstance(e, Var):
+            lits += 1
+        else:
+            pila.extend(hijos(e))
+    vistos, pila = set(), [expr]
+    while pila:
+        e = pila.pop()
+        if e not in vistos:
+            vistos.add(e)
+            pila.extend(hijos(e))
+    return lits, sum(1 for e in vistos if isinstance(e, (And, Or, Not)))
+
+
+def factorizar(expr, max_cubos=MAX_CUBOS):
+    # AST -> (AST factorizado, informe con literales y compuertas antes/después)
+    resultado = factorizar_sop(a_sop(expr, max_cubos))
+    (la, ca), (ld, cd) = contar(expr), contar(resultado)
+    if ld > la or (ld == la and cd >= ca):
+        resultado, ld, cd = expr, la, ca
+    return resultado, {"literales_antes": la, "literales_despues": ld,
+                       "compuertas_antes": ca, "compuertas_despues": cd}
+
+
+def factorizar_expresion(texto):
+    def transformar(expr):
+        resultado, info = factorizar(expr)
+        return resultado, (f"literales {info['literales_antes']} -> {info['literales_despues']}, "
+                           f"compuertas {info['compuertas_antes']} -> {info['compuertas_despues']}")
+
+    return simplificar_con(texto, transformar, "Factorización algebraica (kernels)", "error factorización")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m factorizacion", description="Factoriza sumas de productos con kernels.")
+    parser.add_argument("expresion", nargs="?", help="expresión; sin ella se lee una por línea de la entrada estándar")
+    args = parser.parse_args(argv)
+    textos = [args.expresion] if args.expresion else [l.strip() for l in sys.stdin if l.strip()]
+    for texto in textos:
+        final, pasos = factorizar_expresion(texto)
+        if final == "error":
+            print(f"{texto}  ->  error: {pasos[0][2]}")
+        else:
+            print(f"{texto}  ->  {final}" + (f"   ({pasos[0][3]})" if pasos else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,241 @@
+import bisect
+import heapq
 import re
+import sys
+import threading
+import weakref
+from collections import OrderedDict
 
 # Clases para el AST
-class Const:
-    def __init__(self, v):
-        self.v = int(v)
+# Los nodos son inmutables y se internan en una tabla única: dos subárboles
+# estructuralmente iguales son el mismo objeto, así que la igualdad es `is`
+# y el hash viene precalculado.
+_tabla_unica = weakref.WeakValueDictionary()
+_candado_tabla = threading.Lock()
+
+def _internar(cls, clave, campos):
+    nodo = _tabla_unica.get(clave)
+    if nodo is not None:
+        return nodo
+    with _candado_tabla:
+        nodo = _tabla_unica.get(clave)
+        if nodo is None:
+            nodo = object.__new__(cls)
+            for k, v in campos:
+                object.__setattr__(nodo, k, v)
+            object.__setattr__(nodo, "_h", hash(clave))
+            _tabla_unica[clave] = nodo
+    return nodo
+
+class Nodo:
+    __slots__ = ("_h", "__weakref__")
+    def __setattr__(self, k, v):
+        raise AttributeError("Los nodos del AST son inmutables")
+    def __delattr__(self, k):
+        raise AttributeError("Los nodos del AST son inmutables")
+    def __hash__(self):
+        return self._h
+    def __copy__(self):
+        return self
+    def __deepcopy__(self, memo):
+        return self
+
+class Const(Nodo):
+    __slots__ = ("v",)
+    def __new__(cls, v):
+        v = int(v)
+        return _internar(cls, (Const, v), (("v", v),))
+    def __reduce__(self):
+        return (Const, (self.v,))
     def __repr__(self):
         return str(self.v)
 
-class Var:
-    def __init__(self, nombre):
-        self.nombre = nombre.upper()
+# Tabla de símbolos global: cada nombre de variable (ya en mayúsculas) recibe
+# un id entero denso en orden de aparición. Los ids sirven de índice directo
+# para tablas y máscaras de bits; no se reutilizan mientras viva el proceso.
+class TablaSimbolos:
+    def __init__(self):
+        self._ids = {}
+        self._nombres = []
+        self._candado = threading.Lock()
+
+    def id(self, nombre):
+        i = self._ids.get(nombre)
+        if i is None:
+            with self._candado:
+                i = self._ids.get(nombre)
+                if i is None:
+                    i = len(self._nombres)
+                    self._nombres.append(nombre)
+                    self._ids[nombre] = i
+        return i
+
+    def nombre(self, i):
+        return self._nombres[i]
+
+    def __len__(self):
+        return len(self._nombres)
+
+    def __contains__(self, nombre):
+        return nombre.upper() in self._ids
+
+tabla_simbolos = TablaSimbolos()
+
+class Var(Nodo):
+    __slots__ = ("id", "nombre")
+    def __new__(cls, nombre):
+        nombre = nombre.upper()
+        i = tabla_simbolos.id(nombre)
+        return _internar(cls, (Var, i), (("id", i), ("nombre", nombre)))
+    def __reduce__(self):
+        return (Var, (self.nombre,))
     def __repr__(self):
         return self.nombre
 
-class Not:
-    def __init__(self, x):
-        self.x = x
+class Not(Nodo):
+    __slots__ = ("x",)
+    def __new__(cls, x):
+        return _internar(cls, (Not, x), (("x", x),))
+    def __reduce__(self):
+        return (Not, (self.x,))
     def __repr__(self):
-        # Paréntesis solo si es necesario
-        if isinstance(self.x, (And, Or)):
-            return f"({self.x})'"
-        return f"{self.x}'"
-
-class And:
-    def __init__(self, cosas):
-        self.cosas = tuple(cosas)
+        return texto(self)
+
+class And(Nodo):
+    __slots__ = ("cosas", "_indice")
+    def __new__(cls, cosas):
+        cosas = tuple(cosas)
+        return _internar(cls, (And, cosas), (("cosas", cosas), ("_indice", None)))
+    def __reduce__(self):
+        return (And, (self.cosas,))
     def __repr__(self):
-        partes = []
-        for c in self.cosas:
-            s = str(c)
-            if isinstance(c, Or):
-                s = f"({s})"
-            partes.append(s)
-        return "*".join(partes)
-
-class Or:
-    def __init__(self, cosas):
-        self.cosas = tuple(cosas)
+        return texto(self)
+
+class Or(Nodo):
+    __slots__ = ("cosas", "_indice")
+    def __new__(cls, cosas):
+        cosas = tuple(cosas)
+        return _internar(cls, (Or, cosas), (("cosas", cosas), ("_indice", None)))
+    def __reduce__(self):
+        return (Or, (self.cosas,))
     def __repr__(self):
-        return "+".join(str(c) for c in self.cosas)
+        return texto(self)
+
+def texto(e):
+    # Escritura iterativa (sin recursión, para entradas muy profundas): la
+    # pila mezcla nodos por expandir y trozos de texto ya listos. Paréntesis
+    # solo donde hacen falta: negación de un grupo y suma dentro de producto.
+    partes = []
+    pila = [e]
+    while pila:
+        e = pila.pop()
+        t = type(e)
+        if t is str:
+            partes.append(e)
+        elif t is Var:
+            partes.append(e.nombre)
+        elif t is Not:
+            x = e.x
+            if type(x) is Var:
+                partes.append(x.nombre + "'")
+            elif type(x) is And or type(x) is Or:
+                pila += (")'", x, "(")
+            else:
+                pila += ("'", x)
+        elif t is And:
+            for i, c in enumerate(reversed(e.cosas)):
+                if i:
+                    pila.append("*")
+                if type(c) is Or:
+                    pila += (")", c, "(")
+                else:
+                    pila.append(c)
+        elif t is Or:
+            cosas = e.cosas
+            pila.append(cosas[-1])
+            for c in cosas[-2::-1]:
+                pila += ("+", c)
+        else:
+            partes.append(repr(e))
+    return "".join(partes)
+
+def son_complementarios(a, b):
+    # x y x' (en cualquier orden); con nodos internados basta comparar identidad
+    return (isinstance(a, Not) and a.x is b) or (isinstance(b, Not) and b.x is a)
+
+class IndiceOperandos:
+    # Índice de los operandos de un And/Or, calculado en una pasada la primera
+    # vez que se pide y guardado en el nodo (es inmutable):
+    #   polaridad    término base -> 1 (aparece x), 2 (aparece x') o 3 (ambos)
+    #   complemento  algún par x, x'
+    #   duplicados   algún operando repetido
+    #   constantes   1 si aparece 0, 2 si aparece 1
+    __slots__ = ("polaridad", "complemento", "duplicados", "constantes")
+
+    def __init__(self, cosas):
+        polaridad = {}
+        vistos = set()
+        constantes = 0
+        for c in cosas:
+            vistos.add(c)
+            if type(c) is Not:
+                base, bit = c.x, 2
+            else:
+                base, bit = c, 1
+                if type(c) is Const:
+                    constantes |= 2 if c.v else 1
+            polaridad[base] = polaridad.get(base, 0) | bit
+        self.polaridad = polaridad
+        self.complemento = 3 in polaridad.values()
+        self.duplicados = len(vistos) != len(cosas)
+        self.constantes = constantes
+
+def indice_operandos(e):
+    ind = e._indice
+    if ind is None:
+        ind = IndiceOperandos(e.cosas)
+        object.__setattr__(e, "_indice", ind)
+    return ind
+
+def polaridad_de(t):
+    # (término base, bit de polaridad) de un operando: x -> (x, 1); x' -> (x, 2)
+    return (t.x, 2) if type(t) is Not else (t, 1)
+
+def clave_orden(e):
+    # orden canónico y determinista de operandos: constantes, luego literales
+    # por nombre con x justo antes de x', luego el resto por su texto
+    if type(e) is Const:
+        return (0, "", e.v)
+    if type(e) is Var:
+        return (1, e.nombre, 0)
+    if type(e) is Not and type(e.x) is Var:
+        return (1, e.x.nombre, 1)
+    return (2, texto(e), 0)
+
+def canonico(e):
+    # misma expresión con los operandos de cada And/Or en orden canónico
+    # (clave_orden): dos expresiones que solo difieren en el orden de sumandos
+    # o factores dan el mismo nodo. En orden, los complementarios y repetidos
+    # quedan contiguos. Recorrido iterativo de abajo arriba.
+    hechos = {}
+    pila = [e]
+    while pila:
+        n = pila[-1]
+        if n in hechos:
+            pila.pop()
+            continue
+        pendientes = [h for h in hijos(n) if h not in hechos]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(n, Not):
+            hechos[n] = Not(hechos[n.x])
+        elif isinstance(n, (And, Or)):
+            hechos[n] = type(n)(sorted((hechos[h] for h in n.cosas), key=clave_orden))
+        else:
+            hechos[n] = n
+    return hechos[e]
 
 # Normalizador de símbolos
 simbolos = {
@@ -47,102 +244,154 @@ simbolos = {
     "¬": "'", "~": "'", "!": "'",
 }
 
+# Nombres de variable: una letra, o una letra seguida de letras, dígitos y
+# guiones bajos con al menos un dígito o guion bajo (x17, clk_en, A_2). Una
+# tira solo de letras son variables de una letra multiplicadas: AB = A*B.
+_nombre_re = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+
+def nombres_en(pieza):
+    # divide una coincidencia de _nombre_re en nombres de variable
+    return list(pieza) if pieza.isalpha() else [pieza]
+
+def _partir_tira(m):
+    # una tira de caracteres de nombre pegados: los dígitos iniciales son
+    # constantes sueltas y el resto, un nombre o varias letras sueltas
+    tira = m.group()
+    resto = tira.lstrip("0123456789")
+    partes = list(tira[:len(tira) - len(resto)])
+    if resto:
+        partes.extend(nombres_en(resto) if resto[0].isalpha() else [resto])
+    return "*".join(partes)
+
+_tira_re = re.compile(r"[A-Za-z0-9_]{2,}")
+# multiplicación implícita entre tiras ya partidas: tras ')' o "'", o tras un
+# carácter de nombre si lo que sigue va después de espacios o es '('
+_implicita_re = re.compile(r"([)'])\s*(?=[A-Za-z0-9_(])|([A-Za-z0-9_])(?:\s+(?=[A-Za-z0-9_(])|(?=\())")
+
 def normalizar(txt):
     for k, v in simbolos.items():
         txt = txt.replace(k, v)
-    txt = re.sub(r"\s+", "", txt)
-    txt = re.sub(r"([A-Za-z0-9)'])(?=[A-Za-z(])", r"\1*", txt)
-    return txt
+    txt = _tira_re.sub(_partir_tira, txt)
+    txt = _implicita_re.sub(lambda m: (m.group(1) or m.group(2)) + "*", txt)
+    return re.sub(r"\s+", "", txt)
 
 # Errores
 class ParseError(Exception):
+    def __init__(self, mensaje, pos=None):
+        # pos: índice (0-based) en el texto normalizado donde se detectó el error
+        super().__init__(mensaje if pos is None else f"{mensaje} (posición {pos})")
+        self.pos = pos
+
+class Cancelado(Exception):
+    # la simplificación se interrumpió desde fuera (cancelación o tiempo agotado)
     pass
 
+class NoEquivalente(Exception):
+    # con usar_bdd=True y traza=False, el resultado no es equivalente a la
+    # entrada según el BDD (con traza se avisa con un paso "NO EQUIVALENTE")
+    def __init__(self, final):
+        super().__init__(f"{final} no es equivalente a la entrada (BDD)")
+        self.final = final
+
+# Tokenizador: una sola pasada sobre el texto normalizado
+_token_re = re.compile(r"[A-Za-z][A-Za-z0-9_]*|[01]|[+*'()]|.", re.S)
+
+def tokenizar(txt):
+    # genera (tipo, valor, posición); tipo es "var", "const" o el propio símbolo
+    for m in _token_re.finditer(txt):
+        ch = m.group()
+        if ch in "+*'()":
+            yield ch, ch, m.start()
+        elif ch == "0" or ch == "1":
+            yield "const", ch, m.start()
+        elif ch[0].isalpha():
+            pos = m.start()
+            for nombre in nombres_en(ch):
+                yield "var", nombre, pos
+                pos += len(nombre)
+        else:
+            raise ParseError(f"Símbolo inválido '{ch}'", m.start())
+
+# Perfilado opcional (ver perfilado.py): objeto de estadísticas activo o None
+_perfil = None
+
 def parsear(txt):
+    if _perfil is not None:
+        return _perfil.medir_parser(_parsear, txt)
+    return _parsear(txt)
+
+def _parsear(txt):
+    return analizar(txt, Var, Const, Not, And, Or)
+
+def analizar(txt, variable, constante, negar, producto, suma):
+    # Parser iterativo por precedencia (+ < * < ' postfijo), común a los
+    # nodos internados de este módulo y a los arrays de arena.py: cada uno
+    # pasa sus constructores (variable(nombre), constante(v), negar(x),
+    # producto([x, y, ...]) y suma([x, y, ...]), n-arios de 2 o más). Cada
+    # nivel de paréntesis es un marco (sumandos, factores, posición de
+    # apertura) en una pila explícita, así que ni la longitud ni la
+    # profundidad usan recursión.
     txt = normalizar(txt)
     if txt == "":
         raise ParseError("Expresión vacía")
 
-    def strip_outer_parens(s: str) -> str:
-        # quita un par de paréntesis exteriores si están balanceados
-        if not (s.startswith("(") and s.endswith(")")):
-            return s
-        count = 0
-        for i, ch in enumerate(s):
-            if ch == "(":
-                count += 1
-            elif ch == ")":
-                count -= 1
-            if count == 0 and i != len(s) - 1:
-                return s  # hay algo fuera del par externo
-        return s[1:-1]
-
-    def parse_expr(s: str):
-        s = s.strip()
-        if s == "":
-            raise ParseError("Expresión incompleta")
-        s = strip_outer_parens(s)
-
-        # 1) buscar + al nivel superior (derecha→izquierda)
-        count = 0
-        for i in range(len(s)-1, -1, -1):
-            ch = s[i]
-            if ch == ")":
-                count += 1
-            elif ch == "(":
-                count -= 1
-            elif count == 0 and ch == "+":
-                left = s[:i]
-                right = s[i+1:]
-                return Or([parse_expr(left), parse_expr(right)])
-
-        # 2) buscar * al nivel superior
-        count = 0
-        for i in range(len(s)-1, -1, -1):
-            ch = s[i]
-            if ch == ")":
-                count += 1
-            elif ch == "(":
-                count -= 1
-            elif count == 0 and ch == "*":
-                left = s[:i]
-                right = s[i+1:]
-                return And([parse_expr(left), parse_expr(right)])
-
-        # 3) NOT postfijo sobre el factor (una o más comillas)
-        if s.endswith("'"):
-            n = len(s) - len(s.rstrip("'"))
-            core = s[:-n]
-            if core == "":
-                raise ParseError("Negación sin operando")
-            node = parse_expr(core)
-            for _ in range(n):
-                node = Not(node)
-            return node
-
-        # 4) constantes
-        if s == "0" or s == "1":
-            return Const(s)
-
-        # 5) variable de una letra
-        if re.fullmatch(r"[A-Za-z]", s):
-            return Var(s)
-
-        # 6) caso de paréntesis internos o forma inválida
-        if s.startswith("(") and s.endswith(")"):
-            return parse_expr(strip_outer_parens(s))
-
-        raise ParseError(f"Expresión inválida: {s}")
-
-    return parse_expr(txt)
+    def cerrar(sumandos, factores):
+        # factores pendientes -> producto; sumandos -> suma (n-arios y planos)
+        sumandos.append(factores[0] if len(factores) == 1 else producto(factores))
+        return sumandos[0] if len(sumandos) == 1 else suma(sumandos)
+
+    pila = []
+    sumandos, factores, abierto = [], [], None
+    espera_operando = True
+    pos = 0
+    for tipo, valor, pos in tokenizar(txt):
+        if espera_operando:
+            if tipo == "var":
+                factores.append(variable(valor))
+            elif tipo == "const":
+                factores.append(constante(valor))
+            elif tipo == "(":
+                pila.append((sumandos, factores, abierto))
+                sumandos, factores, abierto = [], [], pos
+                continue
+            elif tipo == "'":
+                raise ParseError("Negación sin operando", pos)
+            else:
+                raise ParseError("Expresión incompleta", pos)
+            espera_operando = False
+            continue
+
+        if tipo == "'":
+            factores[-1] = negar(factores[-1])
+        elif tipo == "*":
+            espera_operando = True
+        elif tipo == "+":
+            sumandos.append(factores[0] if len(factores) == 1 else producto(factores))
+            factores = []
+            espera_operando = True
+        elif tipo == ")":
+            if not pila:
+                raise ParseError("Paréntesis de cierre sin apertura", pos)
+            nodo = cerrar(sumandos, factores)
+            sumandos, factores, abierto = pila.pop()
+            factores.append(nodo)
+        else:
+            raise ParseError(f"Falta un operador antes de '{valor}'", pos)
+
+    if espera_operando:
+        raise ParseError("Expresión incompleta", len(txt))
+    if pila:
+        raise ParseError("Paréntesis sin cerrar", abierto)
+    return cerrar(sumandos, factores)
 # Leyes booleanas (solo ejemplos, puedes expandir)
 def ley_idempotencia(e):
+    if isinstance(e, (And, Or)) and not indice_operandos(e).duplicados:
+        return e, ""
     if isinstance(e, Or):
         vistos, nuevos = set(), []
         for t in e.cosas:
-            k = repr(t)
-            if k not in vistos:
-                vistos.add(k)
+            if t not in vistos:
+                vistos.add(t)
                 nuevos.append(t)
         if len(nuevos) != len(e.cosas):
             return (nuevos[0] if len(nuevos) == 1 else Or(tuple(nuevos))), "Ley de Idempotencia (+ n-aria)"
@@ -150,9 +399,8 @@ def ley_idempotencia(e):
     if isinstance(e, And):
         vistos, nuevos = set(), []
         for t in e.cosas:
-            k = repr(t)
-            if k not in vistos:
-                vistos.add(k)
+            if t not in vistos:
+                vistos.add(t)
                 nuevos.append(t)
         if len(nuevos) != len(e.cosas):
             return (nuevos[0] if len(nuevos) == 1 else And(tuple(nuevos))), "Ley de Idempotencia (* n-aria)"
@@ -186,6 +434,8 @@ def ley_asociativa(e):
 
 def ley_neutro(e):
     # x + 0 = x ; x * 1 = x
+    if isinstance(e, (And, Or)) and not indice_operandos(e).constantes:
+        return e, ""
     if isinstance(e, Or):
         for c in e.cosas:
             if isinstance(c, Const) and c.v == 0:
@@ -202,37 +452,37 @@ def ley_neutro(e):
 
 def ley_anulador(e):
     # x + 1 = 1 ; x * 0 = 0
-    if isinstance(e, Or):
-        for c in e.cosas:
-            if isinstance(c, Const) and c.v == 1:
-                return Const(1), "Ley del Anulador"
-    if isinstance(e, And):
-        for c in e.cosas:
-            if isinstance(c, Const) and c.v == 0:
-                return Const(0), "Ley del Anulador"
+    if isinstance(e, Or) and indice_operandos(e).constantes & 2:
+        return Const(1), "Ley del Anulador"
+    if isinstance(e, And) and indice_operandos(e).constantes & 1:
+        return Const(0), "Ley del Anulador"
     return e, ""
 
 def ley_absorcion(e):
+    # x + x*y = x ; x * (x + y) = x. Un solo recorrido: para cada factor de
+    # los operandos compuestos, los índices de los operandos que lo contienen;
+    # luego el primer operando x (en orden) que aparezca dentro de otro.
     if isinstance(e, Or):
-        t = list(e.cosas)
-        for a in t:
-            for b in t:
-                if a is b:
-                    continue
-                if isinstance(b, And):
-                    if any(str(a) == str(f) for f in b.cosas):
-                        nuevos = [x for x in t if x is not b]
-                        return (a if len(nuevos) == 1 else Or(nuevos)), "Ley de Absorción"
-    if isinstance(e, And):
-        t = list(e.cosas)
-        for a in t:
-            for b in t:
-                if a is b:
-                    continue
-                if isinstance(b, Or):
-                    if any(str(a) == str(f) for f in b.cosas):
-                        nuevos = [x for x in t if x is not b]
-                        return (a if len(nuevos) == 1 else And(nuevos)), "Ley de Absorción"
+        interno = And
+    elif isinstance(e, And):
+        interno = Or
+    else:
+        return e, ""
+    t = list(e.cosas)
+    contienen = {}
+    for j, b in enumerate(t):
+        if isinstance(b, interno):
+            for x in b.cosas:
+                lista = contienen.setdefault(x, [])
+                if not lista or lista[-1] != j:
+                    lista.append(j)
+    if not contienen:
+        return e, ""
+    for i, a in enumerate(t):
+        for j in contienen.get(a, ()):
+            if j != i:
+                nuevos = t[:j] + t[j+1:]
+                return (a if len(nuevos) == 1 else type(e)(nuevos)), "Ley de Absorción"
     return e, ""
 
 
@@ -243,12 +493,12 @@ def ley_complemento(e):
     if isinstance(e, Or):
         if len(e.cosas) == 2:
             a, b = e.cosas
-            if (isinstance(a, Not) and str(a.x) == str(b)) or (isinstance(b, Not) and str(b.x) == str(a)):
+            if son_complementarios(a, b):
                 return Const(1), "Ley del Complemento"
     if isinstance(e, And):
         if len(e.cosas) == 2:
             a, b = e.cosas
-            if (isinstance(a, Not) and str(a.x) == str(b)) or (isinstance(b, Not) and str(b.x) == str(a)):
+            if son_complementarios(a, b):
                 return Const(0), "Ley del Complemento"
     return e, ""
 
@@ -268,47 +518,79 @@ def ley_demorgan(e):
 def ley_distributiva_factor(e):
     if isinstance(e, Or):
         terms = list(e.cosas)
-        ands = [t for t in terms if isinstance(t, And)]
-        for i in range(len(ands)):
-            for j in range(i+1, len(ands)):
-                a = ands[i].cosas
-                b = ands[j].cosas
-                comunes = [x for x in a if any(str(x)==str(y) for y in b)]
+        pos = [k for k, t in enumerate(terms) if isinstance(t, And)]
+        # factor -> productos (índices en pos, crecientes) que lo contienen; la
+        # pareja de i es el primer producto posterior con algún factor común
+        aparece = {}
+        for n, k in enumerate(pos):
+            for x in terms[k].cosas:
+                lista = aparece.setdefault(x, [])
+                if not lista or lista[-1] != n:
+                    lista.append(n)
+        for i in range(len(pos)):
+            j = None
+            for x in terms[pos[i]].cosas:
+                lista = aparece[x]
+                p = bisect.bisect_right(lista, i)
+                if p < len(lista) and (j is None or lista[p] < j):
+                    j = lista[p]
+            if j is not None:
+                a = terms[pos[i]].cosas
+                b = terms[pos[j]].cosas
+                en_b = set(b)
+                comunes = [x for x in a if x in en_b]
                 if comunes:
-                    resto_a = [x for x in a if all(str(x)!=str(c) for c in comunes)]
-                    resto_b = [x for x in b if all(str(x)!=str(c) for c in comunes)]
-                    if not resto_a: resto_a = []
-                    if not resto_b: resto_b = []
-                    or_interno = Or(tuple({str(x):x for x in resto_a+resto_b}.values())) if (resto_a or resto_b) else None
-                    nuevo = And(tuple(comunes) + ((or_interno,) if or_interno else tuple()))
-                    nuevos = [x for x in terms if x not in (ands[i], ands[j])] + [nuevo]
+                    resto_a = [x for x in a if x not in comunes]
+                    resto_b = [x for x in b if x not in comunes]
+                    # x*y + x*z = x*(y + z); los restos se agrupan como productos.
+                    # Si un lado no tiene resto, x + x*z = x (no queda suma interna).
+                    # Nunca se crean And/Or de un solo operando (ocultarían el
+                    # nodo de dentro al aplanado) ni sumas dentro de la suma nueva.
+                    factores = list(comunes)
+                    if resto_a and resto_b:
+                        ra = resto_a[0] if len(resto_a) == 1 else And(resto_a)
+                        rb = resto_b[0] if len(resto_b) == 1 else And(resto_b)
+                        if ra is rb:
+                            factores.extend(resto_a)
+                        else:
+                            sumandos = [y for r in (ra, rb) for y in (r.cosas if isinstance(r, Or) else (r,))]
+                            factores.append(Or(tuple(dict.fromkeys(sumandos))))
+                    nuevo = factores[0] if len(factores) == 1 else And(factores)
+                    nuevos = [x for k, x in enumerate(terms) if k != pos[i] and k != pos[j]] + [nuevo]
+                    if len(nuevos) == 1:
+                        return nuevos[0], "Ley Distributiva (factor común)"
                     return Or(tuple(nuevos)), "Ley Distributiva (factor común)"
     return e, ""
 
 def ley_producto_suma_comun(e):
+    # (c + x) * (c + x') = c. Cada suma binaria se indexa por (común, base de
+    # x, polaridad de x) en sus dos orientaciones; la pareja de una suma es la
+    # primera suma posterior con la misma clave y la polaridad contraria.
     if isinstance(e, And):
-        ors = [t for t in e.cosas if isinstance(t, Or) and len(t.cosas) == 2]
-        otros = [t for t in e.cosas if not isinstance(t, Or)]
-        for i in range(len(ors)):
-            for j in range(i + 1, len(ors)):
-                a1, a2 = ors[i].cosas
-                b1, b2 = ors[j].cosas
-                pares = [
-                    (a1, a2, b1, b2),
-                    (a1, a2, b2, b1),
-                    (a2, a1, b1, b2),
-                    (a2, a1, b2, b1),
-                ]
-                for c, x, d, y_ in pares:
-                    comp = (
-                        (isinstance(x, Not) and repr(x.x) == repr(y_))
-                        or (isinstance(y_, Not) and repr(y_.x) == repr(x))
-                    )
-                    if repr(c) == repr(d) and comp:
-                        nuevos = otros + [c]
-                        if len(nuevos) == 1:
-                            return nuevos[0], "Ley de producto de sumas con común y complemento"
-                        return And(nuevos), "Ley de producto de sumas con común y complemento"
+        ors = [k for k, t in enumerate(e.cosas) if isinstance(t, Or) and len(t.cosas) == 2]
+        claves = {}
+        for k in ors:
+            a1, a2 = e.cosas[k].cosas
+            for c, x in ((a1, a2), (a2, a1)):
+                base, bit = polaridad_de(x)
+                claves.setdefault((c, base, bit), []).append(k)
+        for k in ors:
+            a1, a2 = e.cosas[k].cosas
+            mejor = None
+            for c, x in ((a1, a2), (a2, a1)):
+                base, bit = polaridad_de(x)
+                for j in claves.get((c, base, 3 - bit), ()):
+                    if j > k:
+                        if mejor is None or j < mejor[0]:
+                            mejor = (j, c)
+                        break
+            if mejor is not None:
+                # el par se sustituye por c; el resto de operandos se conserva
+                j, c = mejor
+                nuevos = [t for i, t in enumerate(e.cosas) if i != k and i != j] + [c]
+                if len(nuevos) == 1:
+                    return nuevos[0], "Ley de producto de sumas con común y complemento"
+                return And(nuevos), "Ley de producto de sumas con común y complemento"
     return e, ""
 
 def ley_distributiva_comun_and(e):
@@ -324,21 +606,19 @@ def ley_distributiva_comun_and(e):
         a = list(t1.cosas)
         b = list(t2.cosas)
 
-        # factores comunes por representación
-        comunes = [x for x in a if any(str(x) == str(y) for y in b)]
-        resto_a = [x for x in a if all(str(x) != str(c) for c in comunes)]
-        resto_b = [x for x in b if all(str(x) != str(c) for c in comunes)]
+        # factores comunes (identidad de nodos internados)
+        en_b = set(b)
+        comunes = [x for x in a if x in en_b]
+        en_comunes = set(comunes)
+        resto_a = [x for x in a if x not in en_comunes]
+        resto_b = [x for x in b if x not in en_comunes]
 
         # necesitamos que quede exactamente 1 factor residual en cada lado
         if len(resto_a) != 1 or len(resto_b) != 1:
             return None
 
         ra, rb = resto_a[0], resto_b[0]
-        son_complementarios = (
-            (isinstance(ra, Not) and str(ra.x) == str(rb)) or
-            (isinstance(rb, Not) and str(rb.x) == str(ra))
-        )
-        if not son_complementarios:
+        if not son_complementarios(ra, rb):
             return None
 
         # se reduce a solo el producto de los comunes
@@ -369,12 +649,8 @@ def ley_distributiva_comun_and(e):
 def ley_complemento_ext(e):
     # or raíz: si hay un par complementario -> 1
     if isinstance(e, Or):
-        terms = list(e.cosas)
-        for i in range(len(terms)):
-            for j in range(i+1, len(terms)):
-                a, b = terms[i], terms[j]
-                if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                    return Const(1), "Ley del Complemento (extendida)"
+        if indice_operandos(e).complemento:
+            return Const(1), "Ley del Complemento (extendida)"
 
         # or como hijo dentro de and: si algún hijo or tiene complemento interno, colapsa ese hijo a 1
         # y deja que la ley de identidad/anulador se encargue de limpiar el and
@@ -382,28 +658,15 @@ def ley_complemento_ext(e):
 
     # and raíz: si hay un par complementario -> 0
     if isinstance(e, And):
-        terms = list(e.cosas)
-        for i in range(len(terms)):
-            for j in range(i+1, len(terms)):
-                a, b = terms[i], terms[j]
-                if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                    return Const(0), "Ley del Complemento (extendida)"
+        if indice_operandos(e).complemento:
+            return Const(0), "Ley del Complemento (extendida)"
 
         # and que contiene un or con complemento interno: reduce ese or a 1
         nuevos = []
         changed = False
-        for t in terms:
+        for t in e.cosas:
             if isinstance(t, Or):
-                hijos = list(t.cosas)
-                hay_comp = False
-                for i in range(len(hijos)):
-                    for j in range(i+1, len(hijos)):
-                        a, b = hijos[i], hijos[j]
-                        if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                            hay_comp = True
-                            break
-                    if hay_comp: break
-                if hay_comp:
+                if indice_operandos(t).complemento:
                     nuevos.append(Const(1))
                     changed = True
                 else:
@@ -417,6 +680,8 @@ def ley_complemento_ext(e):
     # not/var/const: sin cambio
     return e, ""
 def ley_identidad_anulador_ext(e):
+    if isinstance(e, (And, Or)) and not indice_operandos(e).constantes:
+        return e, ""
     # or: 1 domina; 0 es neutro (se elimina)
     if isinstance(e, Or):
         terms = list(e.cosas)
@@ -453,17 +718,8 @@ def ley_complemento_and_en_or(e):
     partes = list(e.cosas)
     cambio = False
 
-    def and_tiene_complemento(n):
-        t = list(n.cosas)
-        for i in range(len(t)):
-            for j in range(i+1, len(t)):
-                a, b = t[i], t[j]
-                if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                    return True
-        return False
-
     for i, term in enumerate(partes):
-        if isinstance(term, And) and and_tiene_complemento(term):
+        if isinstance(term, And) and indice_operandos(term).complemento:
             partes[i] = Const(0)
             cambio = True
 
@@ -493,15 +749,16 @@ def ley_complemento_en_or_general(e):
                 planos.append(t)
         return planos
 
+    def tiene_or(node):
+        return any(isinstance(t, Or) for t in node.cosas)
+
     if isinstance(e, Or):
-        terms = flatten_or_terms(e)
-        if len(terms) != len(e.cosas):
-            return Or(tuple(terms)), "Ley Asociativa (+ aplanado)"
-        for i in range(len(terms)):
-            for j in range(i+1, len(terms)):
-                a, b = terms[i], terms[j]
-                if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                    return Const(1), "Ley del Complemento (OR n-ario)"
+        if tiene_or(e):
+            terms = flatten_or_terms(e)
+            if len(terms) != len(e.cosas):
+                return Or(tuple(terms)), "Ley Asociativa (+ aplanado)"
+        if indice_operandos(e).complemento:
+            return Const(1), "Ley del Complemento (OR n-ario)"
         return e, ""
 
     if isinstance(e, And):
@@ -509,21 +766,13 @@ def ley_complemento_en_or_general(e):
         cambio = False
         for idx, term in enumerate(partes):
             if isinstance(term, Or):
-                terms = flatten_or_terms(term)
-                if len(terms) != len(term.cosas):
-                    partes[idx] = Or(tuple(terms))
-                    cambio = True
-                    continue
-                hay_comp = False
-                for i in range(len(terms)):
-                    for j in range(i+1, len(terms)):
-                        a, b = terms[i], terms[j]
-                        if (isinstance(a, Not) and repr(a.x) == repr(b)) or (isinstance(b, Not) and repr(b.x) == repr(a)):
-                            hay_comp = True
-                            break
-                    if hay_comp:
-                        break
-                if hay_comp:
+                if tiene_or(term):
+                    terms = flatten_or_terms(term)
+                    if len(terms) != len(term.cosas):
+                        partes[idx] = Or(tuple(terms))
+                        cambio = True
+                        continue
+                if indice_operandos(term).complemento:
                     partes[idx] = Const(1)
                     cambio = True
         if cambio:
@@ -557,39 +806,607 @@ boolean_laws = [
     ley_demorgan,
 ]
 
+# Índice de despacho de leyes
+# Cada nodo se resume en una máscara con los tipos de sus hijos; cada ley
+# declara en qué tipos de raíz puede actuar y qué tipos de hijo necesita
+# (basta uno de ellos; 0 = sin requisito). Son condiciones necesarias: si no
+# se cumplen, la ley devolvería el nodo sin cambios.
+K_CERO, K_UNO, K_VAR, K_NOT, K_AND, K_OR = 1, 2, 4, 8, 16, 32
+
+_bit_tipo = {Var: K_VAR, Not: K_NOT, And: K_AND, Or: K_OR}
+
+def _bit(e):
+    if isinstance(e, Const):
+        return K_UNO if e.v else K_CERO
+    return _bit_tipo[type(e)]
+
+def forma(e):
+    f = 0
+    for h in hijos(e):
+        f |= _bit(h)
+    return f
+
+condiciones_leyes = {
+    ley_distributiva_comun_and: {Or: K_AND, And: K_OR},
+    ley_distributiva_factor: {Or: K_AND},
+    ley_asociativa: {Or: K_OR, And: K_AND},
+    ley_complemento_and_en_or: {Or: K_AND},
+    ley_complemento_en_or_general: {Or: K_OR | K_NOT, And: K_OR},
+    ley_identidad_anulador_ext: {Or: K_CERO | K_UNO, And: K_CERO | K_UNO},
+    ley_idempotencia: {Or: 0, And: 0},
+    ley_producto_suma_comun: {And: K_OR},
+    ley_neutro: {Or: K_CERO, And: K_UNO},
+    ley_anulador: {Or: K_UNO, And: K_CERO},
+    ley_complemento_ext: {Or: K_NOT, And: K_NOT | K_OR},
+    ley_complemento: {Or: K_NOT, And: K_NOT},
+    ley_doble_negacion: {Not: K_NOT},
+    ley_absorcion: {Or: K_AND, And: K_OR},
+    ley_demorgan: {Not: K_AND | K_OR},
+}
+
+# comprobaciones previas adicionales (baratas) sobre la raíz
+pruebas_leyes = {
+    ley_idempotencia: lambda e: len(e.cosas) > 1,
+    ley_complemento: lambda e: len(e.cosas) == 2,
+    ley_distributiva_comun_and: lambda e: isinstance(e, And) or len(e.cosas) == 2,
+}
+
+def construir_indice(leyes=None):
+    # tipo de raíz -> [(ley, máscara, prueba)] respetando el orden de prioridad;
+    # una ley sin condiciones registradas se prueba en cualquier nodo
+    leyes = boolean_laws if leyes is None else leyes
+    indice = {Const: [], Var: [], Not: [], And: [], Or: []}
+    for ley in leyes:
+        conds = condiciones_leyes.get(ley)
+        for tipo, lista in indice.items():
+            if conds is None:
+                lista.append((ley, 0, None))
+            elif tipo in conds:
+                lista.append((ley, conds[tipo], pruebas_leyes.get(ley)))
+    return indice
+
+_indice_leyes = None
+_leyes_indexadas = []
+
+# Simplificación paso a paso
+# Tope de reescrituras por expresión (protege de ciclos entre leyes)
+MAX_PASOS = 100_000
+
+class Paso(tuple):
+    # (antes, ley, despues, nota) como siempre; además .ruta guarda la ruta
+    # del subtérmino reescrito: índices de hijo desde la raíz, () es la raíz
+    def __new__(cls, antes, ley, despues, nota="", ruta=()):
+        p = tuple.__new__(cls, (antes, ley, despues, nota))
+        p.ruta = ruta
+        return p
+    def __getnewargs__(self):
+        return (*self, self.ruta)
+
+def hijos(e):
+    if isinstance(e, Not):
+        return (e.x,)
+    if isinstance(e, (And, Or)):
+        return e.cosas
+    return ()
+
+def reconstruir(e, nuevos):
+    # mismo tipo de nodo con otros hijos (el mismo objeto si no cambió ninguno)
+    if all(a is b for a, b in zip(hijos(e), nuevos)):
+        return e
+    if isinstance(e, Not):
+        return Not(nuevos[0])
+    return type(e)(nuevos)
+
+def aplicar_leyes(e):
+    # primera ley aplicable que cambia el nodo e (solo su raíz); el cambio se
+    # detecta por identidad: los nodos internados iguales son el mismo objeto
+    global _indice_leyes, _leyes_indexadas
+    if _indice_leyes is None or _leyes_indexadas != boolean_laws:
+        _indice_leyes = construir_indice()
+        _leyes_indexadas = list(boolean_laws)
+    perfil = _perfil
+    f = forma(e)
+    for ley, mascara, prueba in _indice_leyes[type(e)]:
+        if (mascara and not f & mascara) or (prueba is not None and not prueba(e)):
+            if perfil is not None:
+                perfil.descartar_ley(ley)
+            continue
+        if perfil is None:
+            e2, nombre = ley(e)
+        else:
+            e2, nombre = perfil.medir_ley(ley, e)
+        if nombre and e2 is not e:
+            return e2, nombre
+    return e, ""
 
+def sustituir(e, ruta, sub):
+    # e con `sub` en lugar del subtérmino de la ruta (índices de hijo)
+    camino = []
+    for i in ruta:
+        camino.append((e, i))
+        e = hijos(e)[i]
+    for nodo, i in reversed(camino):
+        hs = list(hijos(nodo))
+        hs[i] = sub
+        sub = reconstruir(nodo, hs)
+    return sub
+
+# nodos que Traza recorre o reconstruye, como mínimo, entre dos puntos de
+# control (copias del cursor para saltar a un paso sin rehacer los anteriores)
+COSTE_PUNTO = 4096
+
+# Las rutas de los pasos se anotan enlazadas: None es la raíz y
+# (padre, i, profundidad) el hijo i del subtérmino de la ruta `padre`. Así el
+# motor anota un paso sin copiar la ruta entera (cada marco de la pila tiene
+# su enlace) y los pasos de un mismo subárbol comparten el prefijo.
+
+def _ruta(enlace, desde=0):
+    # tupla de índices de la ruta enlazada, desde la profundidad `desde`
+    ruta = []
+    while enlace is not None and enlace[2] > desde:
+        ruta.append(enlace[1])
+        enlace = enlace[0]
+    ruta.reverse()
+    return tuple(ruta)
+
+def _enlazar(enlace, ruta):
+    # ruta enlazada de `enlace` seguida de los índices de `ruta`
+    prof = 0 if enlace is None else enlace[2]
+    for i in ruta:
+        prof += 1
+        enlace = (enlace, i, prof)
+    return enlace
+
+class _Cursor:
+    # La expresión completa como camino [(nodo, i)] de la raíz al foco más el
+    # subtérmino del foco. Llevar el foco a otra ruta solo reconstruye los
+    # nodos que se dejan atrás (hasta el ancestro común), así que repetir
+    # pasos en rutas cercanas no rehace la rama entera en cada uno. `coste`
+    # cuenta los niveles subidos y bajados.
+    __slots__ = ("camino", "foco", "enlace", "coste")
+
+    def __init__(self, foco, camino=(), enlace=None):
+        self.camino = list(camino)
+        self.foco = foco
+        self.enlace = enlace
+        self.coste = 0
+
+    def copia(self):
+        return _Cursor(self.foco, self.camino, self.enlace)
+
+    def mover(self, enlace):
+        # el ancestro común se encuentra por identidad de los enlaces (los
+        # pasos de un mismo marco comparten el suyo); las rutas iguales con
+        # enlaces distintos solo cuestan subir hasta donde se juntan
+        origen, destino, bajar = self.enlace, enlace, []
+        while origen is not destino:
+            po = 0 if origen is None else origen[2]
+            pd = 0 if destino is None else destino[2]
+            if po >= pd:
+                nodo, i = self.camino.pop()
+                hs = list(hijos(nodo))
+                hs[i] = self.foco
+                self.foco = reconstruir(nodo, hs)
+                origen = origen[0]
+                self.coste += 1
+            if pd >= po:
+                bajar.append(destino[1])
+                destino = destino[0]
+        for i in reversed(bajar):
+            self.camino.append((self.foco, i))
+            self.foco = hijos(self.foco)[i]
+        self.coste += len(bajar)
+        self.enlace = enlace
+
+    def raiz(self, foco=None):
+        # la expresión completa (con `foco` en lugar del subtérmino del foco),
+        # sin mover el cursor
+        foco = self.foco if foco is None else foco
+        for nodo, i in reversed(self.camino):
+            hs = list(hijos(nodo))
+            hs[i] = foco
+            foco = reconstruir(nodo, hs)
+        return foco
+
+class Traza:
+    # Registro compacto de una simplificación: la expresión inicial y, por
+    # paso, (ley, ruta enlazada, subtérmino reemplazado, subtérmino nuevo,
+    # nota). Los subtérminos son nodos del AST (compartidos), no textos; los
+    # Paso con antes/despues completos se escriben solo al leerlos, llevando
+    # un cursor por los pasos desde el punto de control más cercano. Se usa
+    # como una lista de Paso (len, índices, iteración, append de un Paso ya
+    # escrito).
+    __slots__ = ("inicial", "registros", "_cursor", "_k", "_puntos", "_indices_puntos")
+
+    def __init__(self, inicial):
+        self.inicial = inicial
+        self.registros = []
+        self._cursor = _Cursor(inicial)  # la expresión antes del paso _k
+        self._k = 0
+        self._puntos = [_Cursor(inicial)]  # cursor antes del paso _indices_puntos[j]
+        self._indices_puntos = [0]
+
+    def anotar(self, ley, ruta, antes, despues, nota=""):
+        self.registros.append((ley, ruta, antes, despues, nota))
+
+    def append(self, paso):
+        self.registros.append(paso)
+
+    def __len__(self):
+        return len(self.registros)
+
+    def _avanzar(self, cursor, k):
+        r = self.registros[k]
+        if not isinstance(r, Paso):
+            cursor.mover(r[1])
+            cursor.foco = r[3]
+
+    def _situar(self, k):
+        # el cursor con la expresión antes del paso k; guarda un punto de
+        # control cada vez que lo recorrido desde el anterior pasa de
+        # COSTE_PUNTO (o de la profundidad del foco, que es lo que cuesta la
+        # copia)
+        if k < self._k:
+            j = bisect.bisect_right(self._indices_puntos, k) - 1
+            self._k, self._cursor = self._indices_puntos[j], self._puntos[j].copia()
+        c = self._cursor
+        while self._k < k:
+            self._avanzar(c, self._k)
+            self._k += 1
+            if c.coste >= max(COSTE_PUNTO, len(c.camino)) and self._k > self._indices_puntos[-1]:
+                self._puntos.append(c.copia())
+                self._indices_puntos.append(self._k)
+                c.coste = 0
+        return c
+
+    def raiz(self, k):
+        # expresión completa antes del paso k (k = len(self): la final)
+        return self._situar(k).raiz()
+
+    def _paso(self, k, cursor, antes=None):
+        # (Paso k, expresión después de él); `antes` ahorra reconstruir la
+        # expresión previa si ya se tiene
+        r = self.registros[k]
+        if isinstance(r, Paso):
+            return r, antes
+        cursor.mover(r[1])
+        if antes is None:
+            antes = cursor.raiz()
+        despues = cursor.raiz(r[3])
+        return Paso(representar(antes), r[0], representar(despues), r[4], _ruta(r[1])), despues
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("paso fuera de rango")
+        return self._paso(k, self._situar(k))[0]
+
+    def __iter__(self):
+        cursor, antes = _Cursor(self.inicial), self.inicial
+        for k in range(len(self.registros)):
+            paso, antes = self._paso(k, cursor, antes)
+            self._avanzar(cursor, k)
+            yield paso
 
+    def __repr__(self):
+        return f"Traza({len(self)} pasos)"
 
+# conflictos máximos del SAT al verificar un paso con demasiadas variables
+# para la tabla de verdad
+MAX_CONFLICTOS_VERIFICAR = 20_000
 
+def nota_verificacion(antes, despues):
+    # compara las tablas de verdad del subtérmino antes y después del paso;
+    # si tiene demasiadas variables, lo decide el SAT (miter antes != despues)
+    import tabla_verdad
+    try:
+        contra = tabla_verdad.contraejemplo(antes, despues)
+    except ValueError:
+        import sat
+        try:
+            contra = sat.contraejemplo(antes, despues, MAX_CONFLICTOS_VERIFICAR)
+        except ValueError:
+            return "sin verificar (demasiadas variables)"
+    if contra is None:
+        return "verificado"
+    valores = ", ".join(f"{k}={v}" for k, v in contra.items())
+    return f"NO EQUIVALENTE ({valores})"
+
+# cada cuántas iteraciones del motor se consulta `detener`
+CADA_CONSULTA = 256
+
+# cotas por defecto del memo de subárboles
+MAX_MEMO = 50_000
+MAX_MEMO_PASOS = 200_000
+
+class MemoSubarboles:
+    # Memo acotado subárbol -> (forma normal, fragmento de pasos) para
+    # reescribir. Como los nodos están internados, la clave es la estructura:
+    # el mismo subárbol en otra expresión (o en la misma tras editar otra
+    # parte) es el mismo objeto. El fragmento son los registros de la Traza
+    # con la ruta relativa al subárbol; al acertar se vuelven a anotar con la
+    # ruta actual, así los pasos salen iguales que sin memo y solo se
+    # recalcula lo que cambió. Sin traza se guarda solo la forma normal (y el
+    # número de pasos, que cuenta para max_pasos).
+    # Cotas: max_entradas y max_pasos (pasos guardados en fragmentos); None
+    # = sin cota. Al pasarse se expulsa según `politica`:
+    #   "lru": la entrada usada hace más tiempo
+    #   "costo": GreedyDual, la que menos pasos ahorra, con envejecimiento
+    # No es seguro entre hilos: un memo por hilo o proceso.
+    POLITICAS = ("lru", "costo")
+
+    def __init__(self, max_entradas=MAX_MEMO, max_pasos=MAX_MEMO_PASOS, politica="lru"):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política desconocida: {politica}")
+        self.max_entradas = max_entradas
+        self.max_pasos = max_pasos
+        self.politica = politica
+        self.limpiar()
+
+    def limpiar(self):
+        # nodo -> [forma, fragmento o None, pasos, verificado, (prioridad, orden)]
+        self._entradas = OrderedDict()
+        self._monton = []
+        self._envejecimiento = 0
+        self._orden = 0
+        self.pasos_guardados = 0
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, nodo):
+        return nodo in self._entradas
+
+    def buscar(self, nodo, traza=False, verificar=False):
+        # (forma, fragmento, pasos) o None; con traza hace falta el fragmento
+        # y con verificar, que sus pasos estén verificados
+        entrada = self._entradas.get(nodo)
+        if entrada is None or (traza and entrada[1] is None) or (verificar and not entrada[3]):
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        if self.politica == "lru":
+            self._entradas.move_to_end(nodo)
+        else:
+            self._priorizar(nodo, entrada)
+        return entrada[0], entrada[1], entrada[2]
+
+    def guardar(self, nodo, forma, fragmento, pasos, verificado):
+        vieja = self._entradas.pop(nodo, None)
+        if vieja is not None:
+            self._quitar(vieja)
+        entrada = [forma, fragmento, pasos, verificado, None]
+        self._entradas[nodo] = entrada
+        largo = len(fragmento) if fragmento else 0
+        self.pasos_guardados += largo
+        self.bytes += _BYTES_ENTRADA + (sys.getsizeof(fragmento) + largo * _BYTES_REGISTRO if fragmento is not None else 0)
+        if self.politica == "costo":
+            self._priorizar(nodo, entrada)
+        self._recortar()
+
+    def _priorizar(self, nodo, entrada):
+        # GreedyDual: prioridad = envejecimiento actual + pasos que ahorra
+        self._orden += 1
+        entrada[4] = (self._envejecimiento + entrada[2] + 1, self._orden)
+        heapq.heappush(self._monton, (*entrada[4], nodo))
+
+    def _quitar(self, entrada):
+        largo = len(entrada[1]) if entrada[1] else 0
+        self.pasos_guardados -= largo
+        self.bytes -= _BYTES_ENTRADA + (sys.getsizeof(entrada[1]) + largo * _BYTES_REGISTRO if entrada[1] is not None else 0)
+
+    def _recortar(self):
+        while self._entradas and (
+            (self.max_entradas is not None and len(self._entradas) > self.max_entradas)
+            or (self.max_pasos is not None and self.pasos_guardados > self.max_pasos)
+        ):
+            if self.politica == "lru":
+                _, entrada = self._entradas.popitem(last=False)
+            else:
+                # las prioridades viejas del montón se descartan al salir
+                prioridad, orden, nodo = heapq.heappop(self._monton)
+                entrada = self._entradas.get(nodo)
+                if entrada is None or entrada[4] != (prioridad, orden):
+                    continue
+                del self._entradas[nodo]
+                self._envejecimiento = prioridad
+            self._quitar(entrada)
+            self.expulsiones += 1
+        if len(self._monton) > 4 * len(self._entradas) + 64:
+            self._monton = [(*e[4], n) for n, e in self._entradas.items()]
+            heapq.heapify(self._monton)
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+            "entradas": len(self._entradas),
+            "pasos_guardados": self.pasos_guardados,
+            "bytes_aprox": self.bytes,
+            "expulsiones": self.expulsiones,
+            "max_entradas": self.max_entradas,
+            "max_pasos": self.max_pasos,
+            "politica": self.politica,
+        }
+
+# tamaño aproximado de una entrada del memo (lista + hueco en el dict) y de
+# un registro de la traza (tupla de 5; los nodos se comparten)
+_BYTES_ENTRADA = sys.getsizeof([None] * 5) + 100
+_BYTES_REGISTRO = sys.getsizeof((None,) * 5)
+
+def reescribir(expr, max_pasos=MAX_PASOS, verificar=False, detener=None, traza=True, memo=None, observar=None):
+    # Motor de punto fijo de abajo arriba. La pila de trabajo tiene un marco
+    # [nodo, hijos, i] por nivel: se normalizan los hijos de izquierda a
+    # derecha, se reconstruye el nodo si alguno cambió (queda sucio) y se
+    # prueban las leyes sobre él; si una ley lo reescribe, el resultado se
+    # vuelve a procesar en el mismo marco. Los nodos ya en forma normal se
+    # recuerdan, así que tras un cambio solo se revisitan sus ancestros.
+    # Con verificar=True cada paso se comprueba con tablas de verdad y el
+    # resultado queda en su nota ("verificado" o "NO EQUIVALENTE (...)").
+    # `detener` es una función opcional que se consulta cada CADA_CONSULTA
+    # iteraciones; si devuelve un motivo (texto no vacío) se lanza Cancelado.
+    # Los pasos se devuelven como Traza (se escriben al leerlos); con
+    # traza=False no se registra nada y se devuelve None en su lugar.
+    # `memo` (MemoSubarboles) se puede compartir entre varias llamadas: un
+    # subárbol ya simplificado antes (en otra expresión o en una versión
+    # anterior de esta) se sustituye por su forma normal y sus pasos se
+    # vuelven a anotar desde el memo. Cada marco guarda también el nodo
+    # original, dónde empezaban sus pasos (para guardar el fragmento) y su
+    # ruta enlazada (ver _ruta), con la que se anotan sus pasos.
+    # `observar` recibe la Traza en cuanto se crea: otro hilo puede ir
+    # leyendo los pasos ya anotados mientras el motor sigue (la interfaz los
+    # muestra según llegan).
+    normales = set()
+    pasos = Traza(expr) if traza else None
+    if observar is not None and pasos is not None:
+        observar(pasos)
+    hechos = 0
+    if memo is not None:
+        guardado = memo.buscar(expr, traza, verificar)
+        if guardado is not None and guardado[2] <= max_pasos:
+            if traza:
+                for ley, ruta, antes, despues, nota in guardado[1]:
+                    pasos.anotar(ley, _enlazar(None, ruta), antes, despues, nota)
+            return guardado[0], pasos
+    resultado = expr
+    pila = [[expr, list(hijos(expr)), 0, expr, 0, 0, None]]
+    vueltas = 0
+    while pila:
+        vueltas += 1
+        if detener is not None and vueltas % CADA_CONSULTA == 0:
+            motivo = detener()
+            if motivo:
+                raise Cancelado(motivo)
+        marco = pila[-1]
+        nodo, hs, i = marco[0], marco[1], marco[2]
+        if i < len(hs):
+            h = hs[i]
+            if h in normales:
+                marco[2] = i + 1
+                continue
+            guardado = memo.buscar(h, traza, verificar) if memo is not None and hijos(h) else None
+            if guardado is not None and hechos + guardado[2] <= max_pasos:
+                forma, fragmento, n = guardado
+                if traza and fragmento:
+                    base = (marco[6], i, len(pila))
+                    for ley, ruta, antes, despues, nota in fragmento:
+                        pasos.anotar(ley, _enlazar(base, ruta), antes, despues, nota)
+                hechos += n
+                hs[i] = forma
+                normales.add(forma)
+                marco[2] = i + 1
+            else:
+                pila.append([h, list(hijos(h)), 0, h, len(pasos.registros) if traza else 0, hechos,
+                             (marco[6], i, len(pila)) if traza else None])
+            continue
+
+        actual = reconstruir(nodo, hs)
+        nombre = ""
+        if hechos < max_pasos:
+            nuevo, nombre = aplicar_leyes(actual)
+        if nombre:
+            hechos += 1
+            if traza:
+                nota = nota_verificacion(actual, nuevo) if verificar else ""
+                pasos.anotar(nombre, marco[6], actual, nuevo, nota)
+            pila[-1] = [nuevo, list(hijos(nuevo)), 0, marco[3], marco[4], marco[5], marco[6]]
+            continue
+
+        if hechos < max_pasos:
+            normales.add(actual)
+            if memo is not None and hijos(marco[3]):
+                fragmento = None
+                if traza:
+                    d = len(pila) - 1
+                    fragmento = [(r[0], _ruta(r[1], d), r[2], r[3], r[4]) for r in pasos.registros[marco[4]:]]
+                memo.guardar(marco[3], actual, fragmento, hechos - marco[5], verificar)
+                if actual is not marco[3] and hijos(actual):
+                    memo.guardar(actual, actual, [], 0, True)
+        pila.pop()
+        if pila:
+            padre = pila[-1]
+            padre[1][padre[2]] = actual
+            padre[2] += 1
+        else:
+            resultado = actual
+    return resultado, pasos
 
-# Simplificación paso a paso
 def simplificar_paso(e):
-    pasos = []
-    for ley in boolean_laws:
-        antes = representar(e)
-        e2, nombre = ley(e)
-        despues = representar(e2)
-        if nombre and despues != antes:
-            pasos.append((antes, nombre, despues, ""))
-            e = e2
-            break
-    return e, pasos
-
-def simplificar_expresion(texto):
+    # un único paso de reescritura, en el subtérmino más profundo que lo admita
+    return reescribir(e, max_pasos=1)
+
+def pasos_no_equivalentes(pasos):
+    if isinstance(pasos, Traza):
+        # sin escribir los pasos que no hacen falta
+        # los registros son tuplas (ley, ruta, antes, despues, nota) o Paso ya
+        # escritos (la comprobación final con BDD), con la nota en r[3]
+        return [pasos[k] for k, r in enumerate(pasos.registros)
+                if r[3 if isinstance(r, Paso) else 4].startswith("NO EQUIVALENTE")]
+    return [p for p in pasos if p[3].startswith("NO EQUIVALENTE")]
+
+def simplificar_expresion(texto, max_pasos=MAX_PASOS, verificar=False, usar_bdd=False, detener=None, traza=True,
+                          memo=None, observar=None):
     try:
         expr = parsear(texto)
     except Exception as err:
-        return "error", [("entrada", "error parseo", str(err), "")]
-    todos = []
-    actual = expr
-    for _ in range(10):  # Hasta 10 pasos para evitar bucles infinitos
-        nuevo, pasos = simplificar_paso(actual)
-        todos.extend(pasos)
-        if representar(nuevo) == representar(actual):
-            break
-        actual = nuevo
-    final = representar(actual)
-    return final, todos
+        return "error", [Paso("entrada", "error parseo", str(err), "")]
+    return simplificar_arbol(expr, max_pasos, verificar, usar_bdd, detener, traza, memo, observar)
+
+def simplificar_arbol(expr, max_pasos=MAX_PASOS, verificar=False, usar_bdd=False, detener=None, traza=True, memo=None,
+                      observar=None):
+    # como simplificar_expresion, pero a partir de un AST ya parseado.
+    # usar_bdd: si el BDD de la entrada es constante o un literal se devuelve
+    # directamente; si no, al final se compara el BDD del resultado con el de
+    # la entrada y, si difieren, se añade un paso marcado "NO EQUIVALENTE"
+    # (sin traza, se lanza NoEquivalente).
+    # traza=False: solo el resultado; los pasos se devuelven como None
+    # memo: MemoSubarboles compartido entre llamadas (ver reescribir)
+    # observar: recibe la Traza mientras se llena (ver reescribir)
+    if usar_bdd:
+        import bdd
+        gestor = bdd.BDD()
+        raiz = gestor.desde_ast(expr)
+        if gestor.es_constante(raiz) or gestor.literal(raiz):
+            final = gestor.a_ast(raiz)
+            if not traza:
+                return representar(final), None
+            if final is expr:
+                return representar(final), []
+            return representar(final), [Paso(representar(expr), "Forma canónica (BDD)", representar(final), "")]
+    final, pasos = reescribir(expr, max_pasos, verificar, detener, traza, memo, observar)
+    if usar_bdd and gestor.desde_ast(final) != raiz:
+        texto_final = representar(final)
+        if not traza:
+            raise NoEquivalente(texto_final)
+        pasos.append(Paso(texto_final, "Comprobación con BDD", texto_final, "NO EQUIVALENTE a la entrada"))
+    return representar(final), pasos
+
+def simplificar_con(texto, transformar, ley, ley_error="error"):
+    # modo alternativo a simplificar_expresion: devuelve (final, pasos), con
+    # un solo paso `ley` de la entrada al resultado.
+    # transformar(expr) -> (resultado, nota); si lanza ValueError se devuelve
+    # un paso `ley_error` con el mensaje
+    try:
+        expr = parsear(texto)
+    except ParseError as err:
+        return "error", [Paso("entrada", "error parseo", str(err), "")]
+    try:
+        resultado, nota = transformar(expr)
+    except ValueError as err:
+        return "error", [Paso(representar(expr), ley_error, str(err), "")]
+    antes, final = representar(expr), representar(resultado)
+    if final == antes:
+        return final, []
+    return final, [Paso(antes, ley, final, nota)]
 
 def representar(e):
     if isinstance(e, str):
@@ -0,0 +1,194 @@
+# Simplificación por lotes sin interfaz gráfica.
+#   python -m lote expresiones.txt -o resultados.jsonl
+#   cat expresiones.txt | python -m lote - --procesos 8 --sin-pasos
+# Lee una expresión por línea (las líneas en blanco se saltan) y escribe una
+# línea JSON por expresión, en el orden de entrada.
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import logic
+
+_opciones = {}
+# almacén persistente de solo lectura de este proceso (--cache); las
+# escrituras las hace el proceso principal con lo que devuelven los trabajadores
+_almacen = None
+# memo de subárboles de este proceso (--memo-subarboles): los casi
+# duplicados reutilizan los subárboles ya simplificados
+_memo = None
+
+
+def _configurar(opciones):
+    global _almacen, _memo
+    _opciones.clear()
+    _opciones.update(opciones)
+    _almacen = None
+    _memo = None
+    if opciones.get("memo_subarboles"):
+        _memo = logic.MemoSubarboles(opciones["memo_subarboles"], politica=opciones.get("politica_memo", "lru"))
+    if opciones.get("cache"):
+        import almacen
+        _almacen = almacen.AlmacenResultados(opciones["cache"], solo_lectura=True)
+
+
+def _modo_cache(opciones):
+    # solo el modo leyes depende únicamente de las leyes (la versión de la
+    # clave); con --verificar las notas cambian, así que tampoco se guarda
+    if not opciones.get("cache") or opciones.get("modo", "leyes") != "leyes" or opciones.get("verificar"):
+        return None
+    import almacen
+    return almacen.modo_leyes(opciones.get("max_pasos", logic.MAX_PASOS))
+
+
+def procesar(item):
+    return _procesar(item)[0]
+
+
+def _procesar(item):
+    # (línea JSON, (texto, final, pasos) para guardar en el almacén o None)
+    numero, texto = item
+    t0 = time.perf_counter()
+    modo = _modo_cache(_opciones) if _almacen is not None else None
+    guardado = _almacen.obtener(texto, modo, con_pasos=_opciones.get("pasos", True)) if modo else None
+    if guardado is not None:
+        final, pasos = guardado
+    elif _opciones.get("modo") == "sop":
+        import minimizador
+        final, pasos = minimizador.minimizar_sop(texto)
+    elif _opciones.get("modo") == "egraph":
+        import egraph
+        final, pasos = egraph.simplificar_egraph(texto, _opciones.get("costo", "literales"))
+    elif _opciones.get("modo") == "factor":
+        import factorizacion
+        final, pasos = factorizacion.factorizar_expresion(texto)
+    else:
+        final, pasos = logic.simplificar_expresion(
+            texto,
+            max_pasos=_opciones.get("max_pasos", logic.MAX_PASOS),
+            verificar=_opciones.get("verificar", False),
+            traza=_opciones.get("pasos", True),
+            memo=_memo,
+        )
+    registro = {"linea": numero, "entrada": texto}
+    filas = None
+    if final == "error":
+        registro["error"] = pasos[0][2]
+    else:
+        registro["final"] = final
+        if _opciones.get("pasos", True):
+            filas = registro["pasos"] = [list(p) + [list(getattr(p, "ruta", ()))] for p in pasos]
+    registro["tiempo_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    nuevo = (texto, final, filas) if modo and guardado is None and final != "error" else None
+    return json.dumps(registro, ensure_ascii=False), nuevo
+
+
+def leer(flujo):
+    for numero, linea in enumerate(flujo, 1):
+        texto = linea.strip()
+        if texto:
+            yield numero, texto
+
+
+def resultados(items, opciones, procesos=None, chunk=64, max_pendientes=None):
+    # Genera las líneas JSON en orden. Con --cache los resultados nuevos se
+    # guardan desde aquí, por lotes, en un único escritor.
+    modo = _modo_cache(opciones)
+    if modo is None:
+        for linea, _ in _resultados(items, opciones, procesos, chunk, max_pendientes):
+            yield linea
+        return
+    import almacen
+    with almacen.AlmacenResultados(opciones["cache"]) as escritor:
+        for linea, nuevo in _resultados(items, opciones, procesos, chunk, max_pendientes):
+            if nuevo is not None:
+                escritor.guardar(*nuevo, modo=modo)
+            yield linea
+
+
+def _procesar_trozo(trozo):
+    return [_procesar(item) for item in trozo]
+
+
+def _resultados(items, opciones, procesos, chunk, max_pendientes):
+    # Con más de un proceso se reparte en trozos de `chunk` expresiones. Los
+    # trozos se envían desde este hilo y solo hay una ventana de ellos leídos
+    # y aún no escritos, así que la memoria no depende del tamaño de la
+    # entrada; al cerrar el generador (salida cerrada, error en un
+    # trabajador) el pool se termina sin ningún hilo esperando la entrada.
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        _configurar(opciones)
+        for item in items:
+            yield _procesar(item)
+        return
+    max_pendientes = max(max_pendientes or 0, chunk * procesos * 4)
+    ventana = max(procesos, -(-max_pendientes // chunk))
+    items = iter(items)
+    with multiprocessing.Pool(procesos, initializer=_configurar, initargs=(opciones,)) as pool:
+        enviados = collections.deque()
+        while True:
+            trozo = list(itertools.islice(items, chunk))
+            if trozo:
+                enviados.append(pool.apply_async(_procesar_trozo, (trozo,)))
+            if not enviados:
+                break
+            if not trozo or len(enviados) >= ventana:
+                yield from enviados.popleft().get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lote", description="Simplifica expresiones booleanas por lotes (JSONL).")
+    parser.add_argument("entrada", nargs="?", default="-", help="archivo con una expresión por línea ('-' = entrada estándar)")
+    parser.add_argument("-o", "--salida", default="-", help="archivo JSONL de salida ('-' = salida estándar)")
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--chunk", type=int, default=64, help="expresiones por envío a cada proceso")
+    parser.add_argument("--max-pasos", type=int, default=logic.MAX_PASOS, help="tope de reescrituras por expresión")
+    parser.add_argument("--modo", choices=("leyes", "sop", "egraph", "factor"), default="leyes",
+                        help="leyes (paso a paso), sop (minimización exacta), egraph (saturación de igualdades) "
+                             "o factor (factorización algebraica con kernels)")
+    parser.add_argument("--costo", choices=("literales", "profundidad"), default="literales", help="coste de extracción del modo egraph")
+    parser.add_argument("--sin-pasos", action="store_true", help="no incluir la lista de pasos")
+    parser.add_argument("--memo-subarboles", type=int, default=0, metavar="N",
+                        help="memo de N subárboles por proceso para casi duplicados (0 = sin memo)")
+    parser.add_argument("--politica-memo", choices=logic.MemoSubarboles.POLITICAS, default="lru")
+    parser.add_argument("--cache", metavar="RUTA", default=None, help="caché persistente SQLite de resultados (modo leyes)")
+    parser.add_argument("--verificar", action="store_true", help="comprobar cada paso con tablas de verdad")
+    args = parser.parse_args(argv)
+
+    opciones = {
+        "modo": args.modo,
+        "costo": args.costo,
+        "max_pasos": args.max_pasos,
+        "pasos": not args.sin_pasos,
+        "verificar": args.verificar,
+        "cache": args.cache,
+        "memo_subarboles": args.memo_subarboles,
+        "politica_memo": args.politica_memo,
+    }
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    lineas = resultados(leer(entrada), opciones, args.procesos, args.chunk)
+    try:
+        for linea in lineas:
+            salida.write(linea + "\n")
+    except BrokenPipeError:
+        # la salida se cerró antes de tiempo (p. ej. `| head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        # cierra el pool aunque se deje de leer a medias
+        lineas.close()
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
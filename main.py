@@ -1,6 +1,17 @@
+import os
+
 import customtkinter as ctk
 from theme import COLORES, ESTILO_CONFIG
 from UI_logic import UILogic
+from trabajador import TrabajadorSimplificacion
+from vista_pasos import VistaPasos
+
+# espera tras la última tecla antes de lanzar la vista previa (ms)
+ESPERA_PREVIA_MS = 350
+# cada cuánto se recogen los resultados del trabajador (ms)
+INTERVALO_REVISION_MS = 50
+# si está definida, ruta de la caché persistente de resultados (SQLite)
+VARIABLE_CACHE = "SIMPLIFICADOR_CACHE"
 
 class BooleanSimplifierApp(ctk.CTk):
     def __init__(self):
@@ -22,6 +33,7 @@ class BooleanSimplifierApp(ctk.CTk):
         self.input_entry = ctk.CTkEntry(self.input_frame, width=800,height=90, **ESTILO_CONFIG["CTkEntry"])
         self.input_entry.pack(side="left", padx=10)
         self.input_entry.bind("<Return>", lambda e: self.simplify_step_by_step())
+        self.input_entry.bind("<KeyRelease>", self.programar_previa)
 
 # ...existing code...
 
@@ -60,9 +72,21 @@ class BooleanSimplifierApp(ctk.CTk):
         self.btn_simplify.pack(side="left", padx=15)
         self.btn_result = ctk.CTkButton(self.button_frame, text="Mostrar resultado final", command=self.show_final_result, **ESTILO_CONFIG["CTkButton_op"])
         self.btn_result.pack(side="left", padx=15)
-        self.btn_exit = ctk.CTkButton(self.button_frame, text="Salir", command=self.quit, **ESTILO_CONFIG["CTkButton_clear"])
+        self.btn_cancel = ctk.CTkButton(self.button_frame, text="Cancelar", command=self.cancelar, state="disabled", **ESTILO_CONFIG["CTkButton_mem"])
+        self.btn_cancel.pack(side="left", padx=15)
+        self.btn_exit = ctk.CTkButton(self.button_frame, text="Salir", command=self.salir, **ESTILO_CONFIG["CTkButton_clear"])
         self.btn_exit.pack(side="left", padx=15)
 
+        # Vista previa mientras se escribe
+        self.previa_var = ctk.BooleanVar(value=False)
+        self.previa_check = ctk.CTkCheckBox(self, text="Vista previa en vivo", variable=self.previa_var, command=self.programar_previa, **ESTILO_CONFIG["CTkLabel_body"])
+        self.previa_check.pack(pady=(0, 5))
+
+        # Panel opcional con el perfilado de leyes y parser de la última petición
+        self.perfil_var = ctk.BooleanVar(value=False)
+        self.perfil_check = ctk.CTkCheckBox(self, text="Mostrar perfilado", variable=self.perfil_var, command=self.alternar_perfil, **ESTILO_CONFIG["CTkLabel_body"])
+        self.perfil_check.pack(pady=(0, 5))
+
 
 
         # Área de resultados
@@ -71,6 +95,17 @@ class BooleanSimplifierApp(ctk.CTk):
         self.result_text = ctk.CTkTextbox(self.result_frame, font=ESTILO_CONFIG["CTkLabel_body"]["font"], wrap="word", height=300)
         self.result_text.pack(fill="both", expand=True, padx=10, pady=10)
         self.result_text.configure(state="disabled")
+        # pasos paginados, abreviados y escritos según llegan
+        self.vista = VistaPasos(self.result_frame, self.result_text)
+        self.perfil_text = ctk.CTkTextbox(self.result_frame, font=("Courier New", 11), wrap="none", height=160)
+        self.perfil_text.configure(state="disabled")
+
+        # Simplificación en segundo plano
+        self.trabajador = TrabajadorSimplificacion()
+        self._previa_pendiente = None
+        self._texto_previa = ""
+        self.protocol("WM_DELETE_WINDOW", self.salir)
+        self.after(INTERVALO_REVISION_MS, self.revisar_trabajador)
 
     def insert_symbol(self, symbol):
         if symbol == 'Limpiar':
@@ -81,39 +116,110 @@ class BooleanSimplifierApp(ctk.CTk):
             self.input_entry.insert(0, current[:-1])
         else:
             self.input_entry.insert("end", symbol)
+        self.programar_previa()
 
-    def simplify_step_by_step(self):
-        expr = self.input_entry.get()
-        expr = UILogic.normalizar(expr)
-        valid, msg = UILogic.validar(expr)
+    def escribir_resultado(self, texto):
+        self.vista.ocultar()
         self.result_text.configure(state="normal")
         self.result_text.delete("1.0", "end")
-        if not valid:
-            self.result_text.insert("end", f"Error: {msg}\n")
-            self.result_text.configure(state="disabled")
-            return
-        pasos = UILogic.simplificar_pasos(expr)
-        if not pasos:
-            self.result_text.insert("end", "No se realizaron simplificaciones.\n")
-        else:
-            for antes, ley, despues, nota in pasos:
-                self.result_text.insert("end", f"{antes}  --[{ley}]→  {despues}\n")
+        self.result_text.insert("end", texto)
         self.result_text.configure(state="disabled")
 
+    def lanzar(self, modo):
+        expr = UILogic.normalizar(self.input_entry.get())
+        if modo == "previa" and not expr:
+            self.trabajador.cancelar()
+            self.escribir_resultado("")
+            return
+        self.trabajador.enviar(expr, modo)
+        if modo != "previa":
+            self.escribir_resultado("Simplificando...\n")
+            self.btn_cancel.configure(state="normal")
+
+    def simplify_step_by_step(self):
+        self.lanzar("pasos")
+
     def show_final_result(self):
-        expr = self.input_entry.get()
-        expr = UILogic.normalizar(expr)
-        valid, msg = UILogic.validar(expr)
-        self.result_text.configure(state="normal")
-        self.result_text.delete("1.0", "end")
-        if not valid:
-            self.result_text.insert("end", f"Error: {msg}\n")
-            self.result_text.configure(state="disabled")
+        self.lanzar("final")
+
+    def programar_previa(self, event=None):
+        # debounce: cada tecla reinicia la espera; la petición anterior se
+        # cancela en el trabajador al enviar la nueva. Las teclas que no
+        # cambian el texto (Enter, flechas...) no lanzan nada.
+        texto = self.input_entry.get()
+        if event is not None and texto == self._texto_previa:
             return
-        final = UILogic.simplificar_final(expr)
-        self.result_text.insert("end", f"Expresión simplificada: {final}\n")
-        self.result_text.configure(state="disabled")
+        self._texto_previa = texto
+        if self._previa_pendiente is not None:
+            self.after_cancel(self._previa_pendiente)
+            self._previa_pendiente = None
+        if self.previa_var.get():
+            self._previa_pendiente = self.after(ESPERA_PREVIA_MS, self.lanzar_previa)
+
+    def lanzar_previa(self):
+        self._previa_pendiente = None
+        self.lanzar("previa")
+
+    def cancelar(self):
+        self.trabajador.cancelar()
+
+    def revisar_trabajador(self):
+        for modo, estado, datos, perfil in self.trabajador.recoger():
+            if estado != "parcial":
+                self.btn_cancel.configure(state="disabled")
+            self.mostrar(modo, estado, datos)
+            if perfil is not None:
+                self.mostrar_perfil(perfil)
+        self.after(INTERVALO_REVISION_MS, self.revisar_trabajador)
+
+    def mostrar(self, modo, estado, datos):
+        if estado == "error":
+            self.escribir_resultado(f"Error: {datos}\n")
+        elif estado == "cancelado":
+            self.escribir_resultado("Simplificación cancelada.\n")
+        elif estado == "tiempo agotado":
+            self.escribir_resultado(f"Tiempo agotado ({self.trabajador.limite_segundos:g} s).\n")
+        elif modo == "pasos":
+            if estado == "ok" and not datos:
+                self.escribir_resultado("No se realizaron simplificaciones.\n")
+            else:
+                # "parcial": la Traza que el motor sigue llenando
+                self.vista.mostrar(datos, en_curso=(estado == "parcial"))
+        elif modo == "previa":
+            self.escribir_resultado(f"Vista previa: {datos}\n")
+        else:
+            self.escribir_resultado(f"Expresión simplificada: {datos}\n")
+
+    def alternar_perfil(self):
+        activo = self.perfil_var.get()
+        self.trabajador.perfilar = activo
+        if activo:
+            self.perfil_text.pack(fill="x", padx=10, pady=(0, 10))
+        else:
+            self.perfil_text.pack_forget()
+
+    def mostrar_perfil(self, perfil):
+        cache = UILogic.estadisticas_cache()
+        texto = perfil.resumen()
+        texto += f"\n\ncaché: {cache['aciertos']} aciertos, {cache['fallos']} fallos, {cache['entradas']} entradas\n"
+        sub = cache["subarboles"]
+        texto += (f"subárboles: {sub['tasa_aciertos']:.0%} aciertos, {sub['entradas']} entradas, "
+                  f"{sub['bytes_aprox'] // 1024} KiB\n")
+        if cache["disco"] is not None:
+            disco = cache["disco"]
+            texto += f"caché en disco: {disco['aciertos']} aciertos, {disco['fallos']} fallos\n"
+        self.perfil_text.configure(state="normal")
+        self.perfil_text.delete("1.0", "end")
+        self.perfil_text.insert("end", texto)
+        self.perfil_text.configure(state="disabled")
+
+    def salir(self):
+        self.trabajador.cerrar()
+        UILogic.cerrar_almacen()
+        self.quit()
 
 if __name__ == "__main__":
+    if os.environ.get(VARIABLE_CACHE):
+        UILogic.usar_almacen(os.environ[VARIABLE_CACHE])
     app = BooleanSimplifierApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,163 @@
+# Minimización exacta en dos niveles (implicantes primos + cobertura mínima).
+# Un implicante es un par (valor, máscara) de enteros: los bits de la máscara
+# son las variables eliminadas y valor tiene 0 en esas posiciones. El bit i
+# corresponde a la variable i del orden de tabla_verdad (alfabético). Los
+# conjuntos de mintérminos son enteros de 2^n bits, como en tabla_verdad.
+from logic import And, Const, Not, Or, Var, simplificar_con
+import tabla_verdad
+
+# tamaño máximo de la expansión de Petrick antes de pasar a la cobertura voraz
+MAX_TERMINOS_PETRICK = 256
+
+
+def minterminos(tabla):
+    res = []
+    while tabla:
+        bajo = tabla & -tabla
+        res.append(bajo.bit_length() - 1)
+        tabla ^= bajo
+    return res
+
+
+def implicantes_primos(tabla, n):
+    # Los implicantes se combinan variable a variable, como en Quine-McCluskey,
+    # pero sobre subtablas enteras: partiendo por la variable más alta x,
+    #   P(f) = P(f0*f1) ∪ {x'*p : p en P(f0) - P(f0*f1)} ∪ {x*p : p en P(f1) - P(f0*f1)}
+    # donde f0 y f1 son las dos mitades de la tabla. Las subfunciones repetidas
+    # se memorizan, así que no se enumeran los implicantes no primos.
+    memo = {}
+
+    def primos(f, k):
+        clave = (f, k)
+        res = memo.get(clave)
+        if res is not None:
+            return res
+        filas = 1 << k
+        if f == 0:
+            res = frozenset()
+        elif f == (1 << filas) - 1:
+            res = frozenset([(0, (1 << k) - 1)])
+        else:
+            mitad = filas >> 1
+            f0, f1 = f & ((1 << mitad) - 1), f >> mitad
+            comunes = primos(f0 & f1, k - 1)
+            alto = 1 << (k - 1)
+            res = frozenset(
+                [(v, m | alto) for v, m in comunes]
+                + [(v, m) for v, m in primos(f0, k - 1) - comunes]
+                + [(v | alto, m) for v, m in primos(f1, k - 1) - comunes]
+            )
+        memo[clave] = res
+        return res
+
+    return sorted(primos(tabla, n))
+
+
+def literales(implicante, n):
+    return n - bin(implicante[1]).count("1")
+
+
+def cobertura(implicante, n):
+    # mintérminos que cubre (v, máscara), como entero de 2^n bits
+    v, mascara = implicante
+    c = (1 << (1 << n)) - 1
+    for i in range(n):
+        if not mascara >> i & 1:
+            col = tabla_verdad.patron_variable(i, n)
+            c &= col if v >> i & 1 else ~col
+    return c
+
+
+def _petrick(restantes, cubren, costo):
+    # producto de sumas (una suma por mintérmino) expandido a suma de
+    # productos; cada producto es un entero con un bit por implicante
+    productos = {0}
+    for m in restantes:
+        nuevos = set()
+        for p in productos:
+            for j in cubren[m]:
+                nuevos.add(p | (1 << j))
+        # absorción: X + X*Y = X
+        minimos = []
+        for p in sorted(nuevos, key=lambda x: bin(x).count("1")):
+            if not any(p & q == q for q in minimos):
+                minimos.append(p)
+        if len(minimos) > MAX_TERMINOS_PETRICK:
+            return None
+        productos = minimos
+    mejor = min(productos, key=costo)
+    return [j for j in range(mejor.bit_length()) if mejor >> j & 1]
+
+
+def cobertura_minima(primos, tabla, n):
+    cubre = [cobertura(imp, n) for imp in primos]
+
+    # implicantes esenciales: cubren algún mintérmino que nadie más cubre
+    una, varias = 0, 0
+    for c in cubre:
+        varias |= una & c
+        una |= c
+    solo_una = una & ~varias
+    elegidos = {j for j, c in enumerate(cubre) if c & solo_una}
+    pendientes = tabla
+    for j in elegidos:
+        pendientes &= ~cubre[j]
+    if not pendientes:
+        return sorted(elegidos)
+
+    candidatos = [j for j, c in enumerate(cubre) if c & pendientes and j not in elegidos]
+    restantes = minterminos(pendientes)
+    extra = None
+    if len(restantes) <= MAX_TERMINOS_PETRICK:
+        cubren = {m: [j for j in candidatos if cubre[j] >> m & 1] for m in restantes}
+
+        def costo(p):
+            idx = [j for j in range(p.bit_length()) if p >> j & 1]
+            return len(idx), sum(literales(primos[j], n) for j in idx)
+
+        extra = _petrick(restantes, cubren, costo)
+    if extra is None:
+        # voraz: el que cubre más mintérminos pendientes, con menos literales
+        extra = []
+        while pendientes:
+            j = max(candidatos, key=lambda j: (bin(cubre[j] & pendientes).count("1"), -literales(primos[j], n)))
+            extra.append(j)
+            pendientes &= ~cubre[j]
+    return sorted(elegidos.union(extra))
+
+
+def a_expresion(implicantes, orden):
+    n = len(orden)
+    if not implicantes:
+        return Const(0)
+
+    def clave(imp):
+        v, mascara = imp
+        return [2 if mascara >> i & 1 else 1 - (v >> i & 1) for i in range(n)]
+
+    terminos = []
+    for v, mascara in sorted(implicantes, key=clave):
+        lits = []
+        for i, nombre in enumerate(orden):
+            if not mascara >> i & 1:
+                lits.append(Var(nombre) if v >> i & 1 else Not(Var(nombre)))
+        if not lits:
+            return Const(1)
+        terminos.append(lits[0] if len(lits) == 1 else And(lits))
+    return terminos[0] if len(terminos) == 1 else Or(terminos)
+
+
+def minimizar(expr, max_vars=tabla_verdad.MAX_VARIABLES):
+    # suma de productos mínima equivalente a expr (AST -> AST)
+    orden, tabla = tabla_verdad.tabla_verdad(expr, max_vars=max_vars)
+    n = len(orden)
+    if tabla == (1 << (1 << n)) - 1:
+        return Const(1)
+    primos = implicantes_primos(tabla, n)
+    elegidos = cobertura_minima(primos, tabla, n)
+    return a_expresion([primos[j] for j in elegidos], orden)
+
+
+def minimizar_sop(texto):
+    return simplificar_con(texto, lambda expr: (minimizar(expr), ""), "Minimización SOP exacta",
+                           "error minimización")
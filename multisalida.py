@@ -0,0 +1,195 @@
+# Simplificación de familias de expresiones que comparten subtérminos (por
+# ejemplo, los bits de salida de un mismo circuito). Al parsear, la tabla
+# única de logic ya junta todas las salidas en un solo DAG; el motor de
+# reescritura comparte entre ellas un memo subárbol -> forma normal, así que
+# cada nodo compartido se simplifica una sola vez. El resultado incluye el
+# DAG compartido de las salidas simplificadas, con referencias por nodo y
+# las compuertas que se ahorran frente a construir cada salida por separado.
+#   python -m multisalida salidas.txt [--json]
+import argparse
+import json
+import sys
+
+from logic import (MAX_PASOS, And, MemoSubarboles, Not, Or, ParseError, Paso, Var, hijos,
+                   parsear, reescribir, representar)
+
+
+def compuertas(raices):
+    # nodos And/Or/Not distintos alcanzables desde las raíces
+    vistos, pila = set(), list(raices)
+    while pila:
+        e = pila.pop()
+        if e in vistos:
+            continue
+        vistos.add(e)
+        pila.extend(hijos(e))
+    return sum(1 for e in vistos if isinstance(e, (And, Or, Not)))
+
+
+class DAG:
+    # DAG compartido de varias raíces: nodos en orden topológico (hijos antes
+    # que padres), referencias de cada nodo (padres que lo usan + salidas que
+    # son ese nodo) y las compuertas ahorradas al compartir. Una raíz None
+    # (salida que no se pudo parsear) conserva su posición sin aportar nodos
+    def __init__(self, raices):
+        self.raices = list(raices)
+        self.nodos = []
+        self.referencias = {}
+        presentes = [r for r in self.raices if r is not None]
+        for r in presentes:
+            self.referencias[r] = self.referencias.get(r, 0) + 1
+        vistos = set()
+        for r in presentes:
+            pila = [r]
+            while pila:
+                e = pila[-1]
+                if e in vistos:
+                    pila.pop()
+                    continue
+                pendientes = [h for h in hijos(e) if h not in vistos]
+                if pendientes:
+                    pila.extend(pendientes)
+                    continue
+                pila.pop()
+                vistos.add(e)
+                self.nodos.append(e)
+                for h in hijos(e):
+                    self.referencias[h] = self.referencias.get(h, 0) + 1
+        self.compuertas_separadas = sum(compuertas([r]) for r in presentes)
+        self.compuertas_compartidas = sum(1 for e in self.nodos if isinstance(e, (And, Or, Not)))
+
+    @property
+    def ahorradas(self):
+        return self.compuertas_separadas - self.compuertas_compartidas
+
+    def compartidos(self):
+        # compuertas usadas más de una vez, en orden topológico
+        return [e for e in self.nodos if isinstance(e, (And, Or, Not)) and self.referencias[e] > 1]
+
+    def texto(self):
+        # una línea por subexpresión compartida (t1 = ...) y por salida
+        # (S0 = ...), escritas en función de las anteriores
+        nombres = {e: f"t{i}" for i, e in enumerate(self.compartidos(), 1)}
+        escrito = {}
+        for e in self.nodos:
+            if isinstance(e, Not):
+                s = _ref(e.x, nombres, escrito)
+                escrito[e] = f"({s})'" if _en_linea(e.x, nombres, (And, Or)) else s + "'"
+            elif isinstance(e, And):
+                escrito[e] = "*".join(
+                    f"({_ref(h, nombres, escrito)})" if _en_linea(h, nombres, (Or,)) else _ref(h, nombres, escrito)
+                    for h in e.cosas
+                )
+            elif isinstance(e, Or):
+                escrito[e] = "+".join(_ref(h, nombres, escrito) for h in e.cosas)
+            else:
+                escrito[e] = representar(e)
+        lineas = [f"{nombres[e]} = {escrito[e]}    ({self.referencias[e]} usos)" for e in self.compartidos()]
+        lineas += [f"S{i} = {'error' if r is None else _ref(r, nombres, escrito)}" for i, r in enumerate(self.raices)]
+        return "\n".join(lineas)
+
+    def como_dict(self):
+        ids = {e: i for i, e in enumerate(self.nodos)}
+        return {
+            "nodos": [
+                {
+                    "id": ids[e],
+                    "tipo": type(e).__name__,
+                    "valor": e.nombre if isinstance(e, Var) else (representar(e) if not hijos(e) else None),
+                    "hijos": [ids[h] for h in hijos(e)],
+                    "referencias": self.referencias[e],
+                }
+                for e in self.nodos
+            ],
+            "salidas": [None if r is None else ids[r] for r in self.raices],
+            "compuertas_separadas": self.compuertas_separadas,
+            "compuertas_compartidas": self.compuertas_compartidas,
+            "compuertas_ahorradas": self.ahorradas,
+        }
+
+
+def _ref(e, nombres, escrito):
+    return nombres.get(e) or escrito[e]
+
+
+def _en_linea(e, nombres, tipos):
+    # hace falta paréntesis si el hijo se escribe entero (no por su nombre)
+    return isinstance(e, tipos) and e not in nombres
+
+
+class ResultadoMultisalida:
+    def __init__(self, textos, finales, pasos, errores, dag, dag_entrada):
+        self.textos = textos
+        self.finales = finales    # texto simplificado o "error", por salida
+        self.pasos = pasos        # Traza, lista de error o None, por salida
+        self.errores = errores    # mensaje de error o None, por salida
+        self.dag = dag            # DAG de las salidas simplificadas
+        self.dag_entrada = dag_entrada
+
+    def como_dict(self):
+        return {
+            "salidas": [
+                {"entrada": t, "final": f} if err is None else {"entrada": t, "error": err}
+                for t, f, err in zip(self.textos, self.finales, self.errores)
+            ],
+            "dag": self.dag.como_dict(),
+            "compuertas_entrada": {
+                "separadas": self.dag_entrada.compuertas_separadas,
+                "compartidas": self.dag_entrada.compuertas_compartidas,
+            },
+        }
+
+
+def simplificar_multisalida(textos, max_pasos=MAX_PASOS, traza=False, detener=None):
+    textos = list(textos)
+    memo = MemoSubarboles(max_entradas=None, max_pasos=None)
+    entradas, arboles, finales, pasos, errores = [], [], [], [], []
+    for texto in textos:
+        try:
+            expr = parsear(texto)
+        except ParseError as err:
+            finales.append("error")
+            pasos.append([Paso("entrada", "error parseo", str(err), "")])
+            errores.append(str(err))
+            # None conserva el índice de la línea en los DAG
+            entradas.append(None)
+            arboles.append(None)
+            continue
+        final, p = reescribir(expr, max_pasos, detener=detener, traza=traza, memo=memo)
+        entradas.append(expr)
+        arboles.append(final)
+        finales.append(representar(final))
+        pasos.append(p)
+        errores.append(None)
+    return ResultadoMultisalida(textos, finales, pasos, errores, DAG(arboles), DAG(entradas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m multisalida", description="Simplifica varias salidas compartiendo subexpresiones.")
+    parser.add_argument("entrada", nargs="?", default="-", help="una expresión por línea ('-' = entrada estándar)")
+    parser.add_argument("--json", action="store_true", help="salida en JSON (con el DAG completo)")
+    parser.add_argument("--max-pasos", type=int, default=MAX_PASOS)
+    args = parser.parse_args(argv)
+
+    flujo = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    try:
+        textos = [l.strip() for l in flujo if l.strip()]
+    finally:
+        if flujo is not sys.stdin:
+            flujo.close()
+    res = simplificar_multisalida(textos, args.max_pasos)
+    if args.json:
+        print(json.dumps(res.como_dict(), ensure_ascii=False))
+        return 0
+    for i, (texto, final, err) in enumerate(zip(res.textos, res.finales, res.errores)):
+        print(f"S{i}: {texto}  ->  {final if err is None else 'error: ' + err}")
+    print()
+    print(res.dag.texto())
+    print()
+    print(f"compuertas: {res.dag.compuertas_separadas} por separado, "
+          f"{res.dag.compuertas_compartidas} compartidas ({res.dag.ahorradas} ahorradas)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
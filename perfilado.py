@@ -0,0 +1,136 @@
+# Perfilado opcional de las leyes y del parser.
+#
+#   with perfilado.perfilar() as est:
+#       logic.simplificar_expresion("AB+AB'")
+#   print(est.resumen())
+#   est.a_json("perfil.json")
+#
+# Mientras no hay ningún perfilar() activo, logic solo paga una comprobación
+# `is None` por ley probada y por llamada a parsear.
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import logic
+
+_candado = threading.Lock()
+
+
+class Medida:
+    __slots__ = ("llamadas", "aciertos", "descartes", "tiempo", "tiempo_max", "bytes")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.aciertos = 0
+        self.descartes = 0  # veces que el índice de despacho la saltó
+        self.tiempo = 0.0
+        self.tiempo_max = 0.0
+        self.bytes = 0
+
+    def como_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class Estadisticas:
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.leyes = {}
+        self.parser = Medida()
+
+    def _medida(self, ley):
+        m = self.leyes.get(ley.__name__)
+        if m is None:
+            m = self.leyes[ley.__name__] = Medida()
+        return m
+
+    def _anotar(self, m, acierto, dt, asignados):
+        m.llamadas += 1
+        m.aciertos += acierto
+        m.tiempo += dt
+        if dt > m.tiempo_max:
+            m.tiempo_max = dt
+        m.bytes += asignados
+
+    def _antes(self):
+        # memoria trazada al empezar una medida, con el pico puesto a cero:
+        # al terminar, pico - antes son los bytes asignados durante la llamada
+        # aunque se liberen antes de volver (la variación neta no los cuenta)
+        if not self.memoria:
+            return 0
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def _asignados(self, antes):
+        return tracemalloc.get_traced_memory()[1] - antes if self.memoria else 0
+
+    def medir_ley(self, ley, e):
+        antes = self._antes()
+        t0 = time.perf_counter()
+        e2, nombre = ley(e)
+        dt = time.perf_counter() - t0
+        asignados = self._asignados(antes)
+        self._anotar(self._medida(ley), bool(nombre) and e2 is not e, dt, asignados)
+        return e2, nombre
+
+    def descartar_ley(self, ley):
+        self._medida(ley).descartes += 1
+
+    def medir_parser(self, parsear, txt):
+        antes = self._antes()
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            arbol = parsear(txt)
+            ok = True
+            return arbol
+        finally:
+            dt = time.perf_counter() - t0
+            asignados = self._asignados(antes)
+            self._anotar(self.parser, ok, dt, asignados)
+
+    def como_dict(self):
+        return {
+            "leyes": {nombre: m.como_dict() for nombre, m in self.leyes.items()},
+            "parser": self.parser.como_dict(),
+        }
+
+    def a_json(self, ruta=None):
+        texto = json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+        if ruta is not None:
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(texto)
+        return texto
+
+    def resumen(self):
+        # tabla de texto ordenada por tiempo acumulado
+        filas = [f"{'ley':<32} {'llamadas':>8} {'aciertos':>8} {'descartes':>9} {'total ms':>9} {'máx ms':>8} {'KiB':>7}"]
+        medidas = sorted(self.leyes.items(), key=lambda kv: -kv[1].tiempo)
+        for nombre, m in medidas + [("(parser)", self.parser)]:
+            filas.append(
+                f"{nombre:<32} {m.llamadas:>8} {m.aciertos:>8} {m.descartes:>9} "
+                f"{m.tiempo * 1000:>9.2f} {m.tiempo_max * 1000:>8.3f} {m.bytes / 1024:>7.1f}"
+            )
+        return "\n".join(filas)
+
+
+@contextmanager
+def perfilar(memoria=False):
+    # activa el perfilado global de logic mientras dura el bloque; con
+    # memoria=True también mide bytes asignados (tracemalloc, más lento; el
+    # pico de tracemalloc se reinicia en cada medida)
+    est = Estadisticas(memoria)
+    iniciado = memoria and not tracemalloc.is_tracing()
+    if iniciado:
+        tracemalloc.start()
+    with _candado:
+        anterior = logic._perfil
+        logic._perfil = est
+    try:
+        yield est
+    finally:
+        with _candado:
+            logic._perfil = anterior
+        if iniciado:
+            tracemalloc.stop()
@@ -0,0 +1,426 @@
+# Equivalencia por SAT para expresiones con demasiadas variables para la tabla
+# de verdad: codificación de Tseitin del AST a CNF, un resolutor CDCL en
+# Python puro (literales vigilados, aprendizaje 1UIP, VSIDS, reinicios de Luby
+# y guardado de fase) y el "miter" a != b, que es insatisfacible si y solo si
+# las dos expresiones son equivalentes. Las CNF se pueden exportar en DIMACS
+# para contrastarlas con un resolutor externo.
+#   python -m sat "x1*x2 + x1*x2'" [--dimacs miter.cnf]
+import argparse
+import heapq
+import sys
+
+from logic import And, Const, Not, Var, hijos, parsear, simplificar_arbol
+
+SAT, INSAT, DESCONOCIDO = "sat", "unsat", "desconocido"
+
+# conflictos por unidad de la secuencia de Luby entre reinicios
+REINICIO_BASE = 100
+DECAIMIENTO = 0.95
+
+
+class CNF:
+    # Cláusulas con literales DIMACS (enteros != 0, -v es la negación de v).
+    # `nombres` guarda qué variable del AST es cada variable de la CNF.
+    def __init__(self):
+        self.nvars = 0
+        self.clausulas = []
+        self.nombres = {}  # id de variable -> nombre
+        self._por_nombre = {}
+        self._cierto = None
+
+    def nueva(self):
+        self.nvars += 1
+        return self.nvars
+
+    def variable(self, nombre):
+        v = self._por_nombre.get(nombre)
+        if v is None:
+            v = self._por_nombre[nombre] = self.nueva()
+            self.nombres[v] = nombre
+        return v
+
+    def cierto(self):
+        # variable fijada a 1 (para las constantes del AST)
+        if self._cierto is None:
+            self._cierto = self.nueva()
+            self.agregar([self._cierto])
+        return self._cierto
+
+    def agregar(self, clausula):
+        self.clausulas.append(list(clausula))
+
+    def dimacs(self):
+        lineas = [f"c {v} {nombre}" for v, nombre in sorted(self.nombres.items())]
+        lineas.append(f"p cnf {self.nvars} {len(self.clausulas)}")
+        lineas.extend(" ".join(map(str, c)) + " 0" for c in self.clausulas)
+        return "\n".join(lineas) + "\n"
+
+    def escribir_dimacs(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(self.dimacs())
+
+
+def leer_dimacs(texto):
+    # CNF desde texto DIMACS; los comentarios "c <var> <nombre>" recuperan nombres
+    cnf = CNF()
+    actual = []
+    for linea in texto.splitlines():
+        partes = linea.split()
+        if not partes:
+            continue
+        if partes[0] == "c":
+            if len(partes) == 3 and partes[1].isdigit():
+                cnf.nombres[int(partes[1])] = partes[2]
+                cnf._por_nombre[partes[2]] = int(partes[1])
+            continue
+        if partes[0] == "p":
+            cnf.nvars = int(partes[2])
+            continue
+        for x in map(int, partes):
+            if x == 0:
+                cnf.agregar(actual)
+                actual = []
+            else:
+                actual.append(x)
+                cnf.nvars = max(cnf.nvars, abs(x))
+    if actual:
+        cnf.agregar(actual)
+    return cnf
+
+
+def tseitin(expr, cnf=None, hechos=None):
+    # Codifica expr en cnf y devuelve el literal que vale lo mismo que expr.
+    # Una variable nueva por And/Or (las negaciones son literales negados);
+    # los subárboles compartidos (nodos internados) se codifican una vez, y
+    # `hechos` permite compartirlos también entre varias llamadas.
+    cnf = CNF() if cnf is None else cnf
+    hechos = {} if hechos is None else hechos
+    pila = [expr]
+    while pila:
+        e = pila[-1]
+        if e in hechos:
+            pila.pop()
+            continue
+        pendientes = [h for h in hijos(e) if h not in hechos]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(e, Const):
+            lit = cnf.cierto() if e.v else -cnf.cierto()
+        elif isinstance(e, Var):
+            lit = cnf.variable(e.nombre)
+        elif isinstance(e, Not):
+            lit = -hechos[e.x]
+        else:
+            g = cnf.nueva()
+            hs = [hechos[h] for h in e.cosas]
+            if isinstance(e, And):
+                # g -> h_i ; (h_1 * ... * h_n) -> g
+                for h in hs:
+                    cnf.agregar([-g, h])
+                cnf.agregar([g] + [-h for h in hs])
+            else:
+                # h_i -> g ; g -> (h_1 + ... + h_n)
+                for h in hs:
+                    cnf.agregar([g, -h])
+                cnf.agregar([-g] + hs)
+            lit = g
+        hechos[e] = lit
+    return cnf, hechos[expr]
+
+
+def miter(a, b):
+    # CNF satisfacible si y solo si existe una asignación con a != b
+    cnf, hechos = CNF(), {}
+    _, la = tseitin(a, cnf, hechos)
+    _, lb = tseitin(b, cnf, hechos)
+    cnf.agregar([la, lb])
+    cnf.agregar([-la, -lb])
+    return cnf
+
+
+def luby(i):
+    # i-ésimo término (desde 1) de la secuencia de Luby: 1 1 2 1 1 2 4 ...
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class Resolutor:
+    # CDCL. Internamente el literal v (1..n) es 2v y su negación 2v+1, así que
+    # negar es `l ^ 1`; valor[l] vale 1, 0 o -1 (sin asignar).
+    def __init__(self, cnf):
+        self.n = cnf.nvars
+        n2 = 2 * (self.n + 1)
+        self.valor = [-1] * n2
+        self.nivel = [0] * (self.n + 1)
+        self.razon = [None] * (self.n + 1)
+        self.actividad = [0.0] * (self.n + 1)
+        self.fase = [1] * (self.n + 1)  # 1: probar antes el literal negado
+        self.vigilas = [[] for _ in range(n2)]
+        self.clausulas = []
+        self.traza = []
+        self.limites = []  # posición en traza donde empieza cada nivel
+        self.cabeza = 0
+        self.incremento = 1.0
+        self.monticulo = [(0.0, v) for v in range(1, self.n + 1)]
+        self.conflictos = 0
+        self.aprendidas = 0
+        self.modelo = None
+        self.insatisfacible = False
+        for c in cnf.clausulas:
+            self._agregar_original(c)
+
+    @staticmethod
+    def _interno(x):
+        return 2 * x if x > 0 else 2 * -x + 1
+
+    def _agregar_original(self, clausula):
+        lits = []
+        vistos = set()
+        for x in clausula:
+            l = self._interno(x)
+            if l ^ 1 in vistos:
+                return  # tautología
+            if l not in vistos:
+                vistos.add(l)
+                lits.append(l)
+        if self.insatisfacible:
+            return
+        if not lits:
+            self.insatisfacible = True
+        elif len(lits) == 1:
+            if self.valor[lits[0]] == 0:
+                self.insatisfacible = True
+            elif self.valor[lits[0]] == -1:
+                # se propaga al empezar resolver(), con todas las cláusulas ya vigiladas
+                self._asignar(lits[0], None)
+        else:
+            self._vigilar(lits)
+
+    def _vigilar(self, lits):
+        self.clausulas.append(lits)
+        self.vigilas[lits[0]].append(lits)
+        self.vigilas[lits[1]].append(lits)
+
+    def _asignar(self, l, razon):
+        v = l >> 1
+        self.valor[l] = 1
+        self.valor[l ^ 1] = 0
+        self.nivel[v] = len(self.limites)
+        self.razon[v] = razon
+        self.traza.append(l)
+
+    def _propagar(self):
+        # devuelve la cláusula en conflicto o None
+        valor, vigilas, traza = self.valor, self.vigilas, self.traza
+        while self.cabeza < len(traza):
+            falso = traza[self.cabeza] ^ 1
+            self.cabeza += 1
+            lista = vigilas[falso]
+            i = j = 0
+            n = len(lista)
+            while i < n:
+                c = lista[i]
+                i += 1
+                if c[0] == falso:
+                    c[0], c[1] = c[1], falso
+                if valor[c[0]] == 1:
+                    lista[j] = c
+                    j += 1
+                    continue
+                for k in range(2, len(c)):
+                    if valor[c[k]] != 0:
+                        c[1], c[k] = c[k], falso
+                        vigilas[c[1]].append(c)
+                        break
+                else:
+                    lista[j] = c
+                    j += 1
+                    if valor[c[0]] == 0:
+                        # conflicto: se conservan las vigilancias que quedan
+                        while i < n:
+                            lista[j] = lista[i]
+                            j += 1
+                            i += 1
+                        del lista[j:]
+                        self.cabeza = len(traza)
+                        return c
+                    self._asignar(c[0], c)
+            del lista[j:]
+        return None
+
+    def _analizar(self, conflicto):
+        # aprendizaje 1UIP: devuelve (cláusula aprendida, nivel de retroceso)
+        nivel_actual = len(self.limites)
+        vistos = bytearray(self.n + 1)
+        aprendida = [None]
+        pendientes = 0
+        p = None
+        indice = len(self.traza) - 1
+        razon = conflicto
+        while True:
+            for q in razon:
+                if q == p:
+                    continue
+                v = q >> 1
+                if not vistos[v] and self.nivel[v] > 0:
+                    vistos[v] = 1
+                    self._activar(v)
+                    if self.nivel[v] == nivel_actual:
+                        pendientes += 1
+                    else:
+                        aprendida.append(q)
+            while not vistos[self.traza[indice] >> 1]:
+                indice -= 1
+            p = self.traza[indice]
+            indice -= 1
+            v = p >> 1
+            vistos[v] = 0
+            pendientes -= 1
+            if pendientes == 0:
+                break
+            razon = self.razon[v]
+        aprendida[0] = p ^ 1
+        if len(aprendida) == 1:
+            return aprendida, 0
+        # segundo vigilado: el literal de nivel más alto tras el UIP
+        k = max(range(1, len(aprendida)), key=lambda i: self.nivel[aprendida[i] >> 1])
+        aprendida[1], aprendida[k] = aprendida[k], aprendida[1]
+        return aprendida, self.nivel[aprendida[1] >> 1]
+
+    def _activar(self, v):
+        self.actividad[v] += self.incremento
+        if self.actividad[v] > 1e100:
+            self.actividad = [a * 1e-100 for a in self.actividad]
+            self.incremento *= 1e-100
+            self.monticulo = [(-self.actividad[w], w) for w in range(1, self.n + 1) if self.valor[2 * w] == -1]
+            heapq.heapify(self.monticulo)
+        elif self.valor[2 * v] == -1:
+            heapq.heappush(self.monticulo, (-self.actividad[v], v))
+            if len(self.monticulo) > 8 * (self.n + 1):
+                # demasiadas entradas obsoletas: se reconstruye
+                self.monticulo = [(-self.actividad[w], w) for w in range(1, self.n + 1) if self.valor[2 * w] == -1]
+                heapq.heapify(self.monticulo)
+
+    def _retroceder(self, nivel):
+        if len(self.limites) <= nivel:
+            return
+        inicio = self.limites[nivel]
+        for l in self.traza[inicio:]:
+            v = l >> 1
+            self.fase[v] = l & 1
+            self.valor[l] = self.valor[l ^ 1] = -1
+            self.razon[v] = None
+            heapq.heappush(self.monticulo, (-self.actividad[v], v))
+        del self.traza[inicio:]
+        del self.limites[nivel:]
+        self.cabeza = inicio
+
+    def _decidir(self):
+        while self.monticulo:
+            _, v = heapq.heappop(self.monticulo)
+            if self.valor[2 * v] == -1:
+                return 2 * v + self.fase[v]
+        return None
+
+    def resolver(self, max_conflictos=None):
+        # SAT (modelo en self.modelo: variable -> 0/1), INSAT o DESCONOCIDO
+        # si se alcanza max_conflictos
+        if self.insatisfacible:
+            return INSAT
+        reinicio = 1
+        limite_reinicio = REINICIO_BASE * luby(reinicio)
+        desde_reinicio = 0
+        while True:
+            conflicto = self._propagar()
+            if conflicto is not None:
+                self.conflictos += 1
+                desde_reinicio += 1
+                if not self.limites:
+                    self.insatisfacible = True
+                    return INSAT
+                aprendida, nivel = self._analizar(conflicto)
+                self._retroceder(nivel)
+                if len(aprendida) == 1:
+                    self._asignar(aprendida[0], None)
+                else:
+                    self._vigilar(aprendida)
+                    self.aprendidas += 1
+                    self._asignar(aprendida[0], aprendida)
+                self.incremento /= DECAIMIENTO
+                if max_conflictos is not None and self.conflictos >= max_conflictos:
+                    self._retroceder(0)
+                    return DESCONOCIDO
+                continue
+            if desde_reinicio >= limite_reinicio:
+                reinicio += 1
+                limite_reinicio = REINICIO_BASE * luby(reinicio)
+                desde_reinicio = 0
+                self._retroceder(0)
+                continue
+            l = self._decidir()
+            if l is None:
+                self.modelo = {v: self.valor[2 * v] for v in range(1, self.n + 1)}
+                return SAT
+            self.limites.append(len(self.traza))
+            self._asignar(l, None)
+
+
+def resolver(cnf, max_conflictos=None):
+    # (estado, modelo): modelo es {variable: 0/1} si el estado es SAT
+    r = Resolutor(cnf)
+    estado = r.resolver(max_conflictos)
+    return estado, r.modelo
+
+
+def contraejemplo(a, b, max_conflictos=None):
+    # None si a y b son equivalentes; si no, una asignación (nombre -> 0/1)
+    # donde difieren. Lanza ValueError si se agota max_conflictos.
+    cnf = miter(a, b)
+    estado, modelo = resolver(cnf, max_conflictos)
+    if estado == INSAT:
+        return None
+    if estado == DESCONOCIDO:
+        raise ValueError(f"SAT sin decidir tras {max_conflictos} conflictos")
+    return {nombre: modelo[v] for v, nombre in sorted(cnf.nombres.items(), key=lambda x: x[1])}
+
+
+def equivalentes(a, b, max_conflictos=None):
+    return contraejemplo(a, b, max_conflictos) is None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sat", description="Comprueba por SAT que la simplificación es equivalente a la entrada.")
+    parser.add_argument("expresion")
+    parser.add_argument("--dimacs", help="escribe el miter (entrada != simplificada) en este archivo DIMACS")
+    parser.add_argument("--max-conflictos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    entrada = parsear(args.expresion)
+    final, _ = simplificar_arbol(entrada, traza=False)
+    print(f"simplificada: {final}")
+    salida = parsear(final)
+    if args.dimacs:
+        miter(entrada, salida).escribir_dimacs(args.dimacs)
+    try:
+        contra = contraejemplo(entrada, salida, args.max_conflictos)
+    except ValueError as err:
+        print(f"sin decidir: {err}")
+        return 2
+    if contra is None:
+        print("equivalentes")
+        return 0
+    print("NO EQUIVALENTES: " + ", ".join(f"{k}={v}" for k, v in contra.items()))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+# Servicio HTTP/JSON local de simplificación (solo biblioteca estándar).
+#   python -m servicio --puerto 8765 --procesos 4
+#   POST /simplificar   {"expresion": "AB+AB'", "pasos": false}
+#                       {"expresiones": ["AB+AB'", "A+A"]}
+#   GET  /estadisticas  latencias (p50/p90/p99), cola, lotes, rechazos
+#   GET  /salud
+# Las peticiones que llegan a la vez se juntan en lotes (hasta `lote`
+# expresiones o `ventana_ms` de espera) que se simplifican en un pool de
+# procesos, así el bucle de eventos nunca se bloquea. Conexiones HTTP/1.1
+# persistentes (keep-alive). Si la cola está llena se responde 503 con
+# Retry-After en lugar de acumular trabajo sin límite.
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import logic
+
+TAM_LOTE = 32
+VENTANA_MS = 2.0
+MAX_COLA = 1024
+MAX_CUERPO = 1 << 20
+# segundos sin peticiones antes de cerrar una conexión persistente
+INACTIVIDAD = 30.0
+# latencias que se guardan para los percentiles
+MUESTRAS = 10_000
+
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class Rechazo(Exception):
+    # respuesta de error HTTP: (estado, mensaje)
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _trabajar(trabajos):
+    # en un proceso del pool: [(texto, pasos, max_pasos)] -> [dict]
+    res = []
+    for texto, pasos, max_pasos in trabajos:
+        final, p = logic.simplificar_expresion(texto, max_pasos=max_pasos, traza=pasos)
+        if final == "error":
+            res.append({"entrada": texto, "error": p[0][2]})
+            continue
+        r = {"entrada": texto, "final": final}
+        if pasos:
+            r["pasos"] = [list(x) + [list(getattr(x, "ruta", ()))] for x in p]
+        res.append(r)
+    return res
+
+
+def percentiles(valores, ps=(50, 90, 99)):
+    # {"p50": ..., ...} por el método del rango más cercano
+    if not valores:
+        return {f"p{p}": None for p in ps}
+    orden = sorted(valores)
+    return {f"p{p}": orden[min(len(orden) - 1, max(0, -(-p * len(orden) // 100) - 1))] for p in ps}
+
+
+class Servicio:
+    def __init__(self, procesos=None, lote=TAM_LOTE, ventana_ms=VENTANA_MS, max_cola=MAX_COLA,
+                 max_pasos=logic.MAX_PASOS):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tam_lote = lote
+        self.ventana = ventana_ms / 1000
+        self.max_cola = max_cola
+        self.max_pasos = max_pasos
+        self.latencias = collections.deque(maxlen=MUESTRAS)
+        self.peticiones = 0
+        self.rechazadas = 0
+        self.lotes = 0
+        self.expresiones = 0
+        self.conexiones = 0
+        self._cola = None
+        self._pool = None
+        self._servidor = None
+        self._tareas = set()
+        self._clientes = {}     # tarea de cada conexión abierta -> escritor
+
+    async def iniciar(self, host="127.0.0.1", puerto=8765):
+        # devuelve el puerto real (con puerto=0 lo elige el sistema)
+        self._cola = asyncio.Queue(self.max_cola)
+        self._en_vuelo = asyncio.Semaphore(self.procesos)
+        self._pool = ProcessPoolExecutor(self.procesos)
+        self._agrupador = asyncio.create_task(self._agrupar())
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def cerrar(self):
+        self._servidor.close()
+        # cerrar el transporte hace que cada conexión lea EOF y termine sola
+        for escritor in list(self._clientes.values()):
+            escritor.close()
+        await asyncio.gather(*self._clientes, return_exceptions=True)
+        await self._servidor.wait_closed()
+        self._agrupador.cancel()
+        for t in list(self._tareas):
+            await t
+        self._pool.shutdown(cancel_futures=True)
+
+    # --- lotes ---
+
+    async def simplificar(self, texto, pasos=False):
+        # encola una expresión y espera su resultado; Rechazo(503) si la
+        # cola está llena
+        return (await self.simplificar_varias([texto], pasos))[0]
+
+    async def simplificar_varias(self, textos, pasos=False):
+        # encola todas las expresiones o ninguna (Rechazo(503) si no caben) y
+        # espera sus resultados en orden. Si una falla o se deja de esperar,
+        # las demás se cancelan: el agrupador salta las que sigan en la cola
+        if len(textos) > self.max_cola - self._cola.qsize():
+            self.rechazadas += 1
+            raise Rechazo(503, "cola llena")
+        loop = asyncio.get_running_loop()
+        futuros = []
+        for texto in textos:
+            futuro = loop.create_future()
+            self._cola.put_nowait(((texto, pasos, self.max_pasos), futuro))
+            futuros.append(futuro)
+        try:
+            return list(await asyncio.gather(*futuros))
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+
+    async def _agrupar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            limite = loop.time() + self.ventana
+            while len(lote) < self.tam_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                resto = limite - loop.time()
+                if resto <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), resto))
+                except asyncio.TimeoutError:
+                    break
+            # las de peticiones que ya fallaron o se abandonaron no se calculan
+            lote = [x for x in lote if not x[1].done()]
+            if not lote:
+                continue
+            # como mucho un lote por proceso: el resto espera en la cola
+            await self._en_vuelo.acquire()
+            tarea = asyncio.create_task(self._ejecutar(lote))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+
+    async def _ejecutar(self, lote):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            res = await loop.run_in_executor(pool, _trabajar, [t for t, _ in lote])
+        except Exception as err:
+            if isinstance(err, BrokenProcessPool) and self._pool is pool:
+                # un proceso murió: este lote falla, los siguientes van a un
+                # pool nuevo (solo lo cambia el primer lote que lo ve roto)
+                self._pool = ProcessPoolExecutor(self.procesos)
+                pool.shutdown(wait=False, cancel_futures=True)
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(err)
+        else:
+            self.lotes += 1
+            self.expresiones += len(lote)
+            for (_, futuro), r in zip(lote, res):
+                if not futuro.done():
+                    futuro.set_result(r)
+        finally:
+            self._en_vuelo.release()
+
+    # --- HTTP ---
+
+    async def _atender(self, lector, escritor):
+        self.conexiones += 1
+        tarea = asyncio.current_task()
+        self._clientes[tarea] = escritor
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), INACTIVIDAD)
+                except asyncio.TimeoutError:
+                    break
+                if not linea:
+                    break
+                partes = linea.decode("latin-1").split()
+                if len(partes) != 3:
+                    self._responder(escritor, 400, {"error": "línea de petición inválida"}, False)
+                    break
+                metodo, ruta, version = partes
+                cabeceras = {}
+                while True:
+                    l = await lector.readline()
+                    if l in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = l.decode("latin-1").partition(":")
+                    cabeceras[k.strip().lower()] = v.strip()
+                conexion = cabeceras.get("connection", "").lower()
+                seguir = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+                try:
+                    largo = int(cabeceras.get("content-length") or 0)
+                except ValueError:
+                    largo = -1
+                if largo < 0:
+                    self._responder(escritor, 400, {"error": "Content-Length inválido"}, False)
+                    break
+                if largo > MAX_CUERPO:
+                    self._responder(escritor, 413, {"error": "cuerpo demasiado grande"}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+                t0 = time.perf_counter()
+                try:
+                    estado, datos = 200, await self._despachar(metodo, ruta.split("?")[0], cuerpo)
+                except Rechazo as r:
+                    estado, datos = r.estado, {"error": str(r)}
+                except Exception as err:
+                    # fallo del servicio (p. ej. BrokenProcessPool en el lote):
+                    # 500 y la conexión sigue
+                    estado, datos = 500, {"error": f"error interno: {type(err).__name__}: {err}"}
+                if metodo == "POST" and estado == 200:
+                    self.latencias.append(time.perf_counter() - t0)
+                self._responder(escritor, estado, datos, seguir)
+                await escritor.drain()
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # el cliente cortó la conexión: no hay a quién responder
+            pass
+        except ValueError:
+            # línea de petición o cabecera más larga que el límite del lector
+            self._responder_al_cerrar(escritor, 400, "petición mal formada")
+        except Exception as err:
+            self._responder_al_cerrar(escritor, 500, f"error interno: {type(err).__name__}: {err}")
+        finally:
+            del self._clientes[tarea]
+            escritor.close()
+
+    async def _despachar(self, metodo, ruta, cuerpo):
+        if ruta == "/salud":
+            return {"ok": True}
+        if ruta == "/estadisticas":
+            return self.estadisticas()
+        if ruta != "/simplificar":
+            raise Rechazo(404, f"ruta desconocida: {ruta}")
+        if metodo != "POST":
+            raise Rechazo(405, "usar POST")
+        try:
+            peticion = json.loads(cuerpo or b"{}")
+        except ValueError:
+            raise Rechazo(400, "JSON inválido") from None
+        if not isinstance(peticion, dict):
+            raise Rechazo(400, "se esperaba un objeto JSON")
+        self.peticiones += 1
+        pasos = bool(peticion.get("pasos", False))
+        if "expresiones" in peticion:
+            textos = peticion["expresiones"]
+            if not isinstance(textos, list) or not all(isinstance(t, str) for t in textos):
+                raise Rechazo(400, "'expresiones' debe ser una lista de textos")
+            return {"resultados": await self.simplificar_varias(textos, pasos)}
+        texto = peticion.get("expresion")
+        if not isinstance(texto, str):
+            raise Rechazo(400, "falta 'expresion'")
+        return await self.simplificar(texto, pasos)
+
+    def _responder(self, escritor, estado, datos, seguir):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode()
+        cabeceras = [
+            f"HTTP/1.1 {estado} {_MOTIVOS.get(estado, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(cuerpo)}",
+            f"Connection: {'keep-alive' if seguir else 'close'}",
+        ]
+        if estado == 503:
+            cabeceras.append("Retry-After: 1")
+        escritor.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode() + cuerpo)
+
+    def _responder_al_cerrar(self, escritor, estado, mensaje):
+        # último intento de respuesta antes de cerrar; si el transporte ya no
+        # sirve no hay nada más que hacer
+        if escritor.is_closing():
+            return
+        try:
+            self._responder(escritor, estado, {"error": mensaje}, False)
+        except (ConnectionError, RuntimeError):
+            pass
+
+    def estadisticas(self):
+        lat = {k: None if v is None else round(v * 1000, 3) for k, v in percentiles(self.latencias).items()}
+        return {
+            "peticiones": self.peticiones,
+            "rechazadas": self.rechazadas,
+            "expresiones": self.expresiones,
+            "lotes": self.lotes,
+            "media_por_lote": self.expresiones / self.lotes if self.lotes else 0.0,
+            "cola": self._cola.qsize() if self._cola is not None else 0,
+            "max_cola": self.max_cola,
+            "conexiones": self.conexiones,
+            "latencia_ms": lat,
+        }
+
+
+class Cliente:
+    # cliente asyncio con una conexión persistente
+    def __init__(self, host="127.0.0.1", puerto=8765):
+        self.host = host
+        self.puerto = puerto
+        self._lector = self._escritor = None
+
+    async def pedir(self, metodo, ruta, datos=None):
+        # (estado, dict); reabre la conexión si el servidor la cerró
+        if self._escritor is None or self._escritor.is_closing():
+            self._lector, self._escritor = await asyncio.open_connection(self.host, self.puerto)
+        cuerpo = b"" if datos is None else json.dumps(datos, ensure_ascii=False).encode()
+        self._escritor.write(
+            f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo
+        )
+        await self._escritor.drain()
+        estado = int((await self._lector.readline()).split()[1])
+        cabeceras = {}
+        while True:
+            l = await self._lector.readline()
+            if l in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = l.decode("latin-1").partition(":")
+            cabeceras[k.strip().lower()] = v.strip()
+        respuesta = json.loads(await self._lector.readexactly(int(cabeceras.get("content-length", 0))))
+        if cabeceras.get("connection", "").lower() == "close":
+            await self.cerrar()
+        return estado, respuesta
+
+    async def simplificar(self, texto, pasos=False):
+        return await self.pedir("POST", "/simplificar", {"expresion": texto, "pasos": pasos})
+
+    async def estadisticas(self):
+        return (await self.pedir("GET", "/estadisticas"))[1]
+
+    async def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            try:
+                await self._escritor.wait_closed()
+            except ConnectionError:
+                pass
+            self._escritor = None
+
+
+async def _principal(args):
+    servicio = Servicio(args.procesos, args.lote, args.ventana_ms, args.max_cola, args.max_pasos)
+    puerto = await servicio.iniciar(args.host, args.puerto)
+    print(f"escuchando en http://{args.host}:{puerto} ({servicio.procesos} procesos)", file=sys.stderr)
+    try:
+        await servicio.servir()
+    finally:
+        await servicio.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m servicio", description="Servicio HTTP/JSON local de simplificación.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--lote", type=int, default=TAM_LOTE, help="expresiones por lote como máximo")
+    parser.add_argument("--ventana-ms", type=float, default=VENTANA_MS, help="espera máxima para completar un lote")
+    parser.add_argument("--max-cola", type=int, default=MAX_COLA, help="expresiones en espera antes de responder 503")
+    parser.add_argument("--max-pasos", type=int, default=logic.MAX_PASOS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_principal(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
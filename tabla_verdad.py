@@ -0,0 +1,111 @@
+# Tablas de verdad empaquetadas en enteros de Python: el bit r del entero es
+# el valor de la expresión para la asignación número r, en la que la variable
+# i del orden vale (r >> i) & 1. Cada operación del AST es una sola operación
+# de bits sobre las 2^n filas a la vez.
+from logic import And, Const, Not, Var, hijos, tabla_simbolos
+
+# 2^24 filas = 2 MiB por tabla; se puede subir con max_vars
+MAX_VARIABLES = 24
+
+
+def variables(expr):
+    vistos, nombres, pila = set(), set(), [expr]
+    while pila:
+        e = pila.pop()
+        if e in vistos:
+            continue
+        vistos.add(e)
+        if isinstance(e, Var):
+            nombres.add(e.nombre)
+        else:
+            pila.extend(hijos(e))
+    return sorted(nombres)
+
+
+def patron_variable(i, n):
+    # columna de la variable i sobre 2^n filas: bloques de 2^i ceros y 2^i unos
+    bloque = 1 << i
+    p = ((1 << bloque) - 1) << bloque
+    ancho = 2 * bloque
+    total = 1 << n
+    while ancho < total:
+        p |= p << ancho
+        ancho *= 2
+    return p & ((1 << total) - 1)
+
+
+def tabla_verdad(expr, orden=None, max_vars=MAX_VARIABLES):
+    # devuelve (orden, bits)
+    orden = variables(expr) if orden is None else list(orden)
+    n = len(orden)
+    if n > max_vars:
+        raise ValueError(f"Demasiadas variables para la tabla de verdad: {n} > {max_vars}")
+    lleno = (1 << (1 << n)) - 1
+    # columnas indexadas por id de símbolo: la búsqueda en el recorrido es un
+    # entero, sin comparar nombres
+    columnas = {tabla_simbolos.id(nombre.upper()): patron_variable(i, n) for i, nombre in enumerate(orden)}
+
+    # usos de cada nodo del DAG, para soltar las tablas que ya no hacen falta
+    usos, pila = {expr: 1}, [expr]
+    while pila:
+        e = pila.pop()
+        for h in hijos(e):
+            if h in usos:
+                usos[h] += 1
+            else:
+                usos[h] = 1
+                pila.append(h)
+
+    valores = {}
+    pila = [expr]
+    while pila:
+        e = pila[-1]
+        if e in valores:
+            pila.pop()
+            continue
+        pendientes = [h for h in hijos(e) if h not in valores]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        if isinstance(e, Const):
+            v = lleno if e.v else 0
+        elif isinstance(e, Var):
+            v = columnas.get(e.id)
+            if v is None:
+                raise ValueError(f"Variable fuera del orden: {e.nombre}")
+        elif isinstance(e, Not):
+            v = lleno ^ valores[e.x]
+        elif isinstance(e, And):
+            v = lleno
+            for h in e.cosas:
+                v &= valores[h]
+        else:
+            v = 0
+            for h in e.cosas:
+                v |= valores[h]
+        for h in hijos(e):
+            usos[h] -= 1
+            if usos[h] == 0:
+                del valores[h]
+        valores[e] = v
+    return orden, valores[expr]
+
+
+def asignacion(fila, orden):
+    return {nombre: (fila >> i) & 1 for i, nombre in enumerate(orden)}
+
+
+def contraejemplo(a, b, max_vars=MAX_VARIABLES):
+    # None si a y b son equivalentes; si no, una asignación donde difieren
+    orden = sorted(set(variables(a)) | set(variables(b)))
+    _, ta = tabla_verdad(a, orden, max_vars)
+    _, tb = tabla_verdad(b, orden, max_vars)
+    dif = ta ^ tb
+    if not dif:
+        return None
+    return asignacion((dif & -dif).bit_length() - 1, orden)
+
+
+def equivalentes(a, b, max_vars=MAX_VARIABLES):
+    return contraejemplo(a, b, max_vars) is None
@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+import evaluador
+
+
+def _filtrar(csv_texto, chunk=evaluador.CHUNK):
+    f = evaluador.compilar("A*B'+C")
+    return [bytes(r) for _, r in evaluador.evaluar_csv(f, io.StringIO(csv_texto), chunk)]
+
+
+def test_csv_valido():
+    assert b"".join(_filtrar("a,b,c\n1,0,0\n0,0,1\n1,1,0\n")) == b"\x01\x01\x00"
+
+
+@pytest.mark.parametrize("csv_texto, mensaje", [
+    ("A,B,C\n1,0,0\n0,,1\n", "Fila 2, columna B"),
+    ("A,B,C\n1,0,0\n1,0,0\n0,1,2\n", "Fila 3, columna C"),
+    ("A,B,C\n10,0,0\n", "Fila 1, columna A"),
+    ("A,B,C\n1,0\n", "Fila 1, columna C"),
+])
+def test_csv_rechaza_celdas_que_no_son_0_ni_1(csv_texto, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        _filtrar(csv_texto, chunk=2)
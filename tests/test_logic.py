@@ -0,0 +1,31 @@
+import random
+
+import logic
+from logic import And, Not, Or, Var, hijos
+
+
+def _aleatoria(r, profundidad):
+    if profundidad == 0 or r.random() < 0.25:
+        v = Var(r.choice("ABCDX"))
+        return Not(v) if r.random() < 0.4 else v
+    cosas = [_aleatoria(r, profundidad - 1) for _ in range(r.choice((2, 2, 3)))]
+    return (And if r.random() < 0.5 else Or)(cosas)
+
+
+def _unarios(e):
+    pila, res = [e], []
+    while pila:
+        n = pila.pop()
+        if isinstance(n, (And, Or)) and len(n.cosas) < 2:
+            res.append(n)
+        pila.extend(hijos(n))
+    return res
+
+
+def test_factor_comun_no_deja_nodos_de_un_operando():
+    assert logic.simplificar_expresion("X*(C*B'*A+C*(D'+B'+A))", traza=False)[0] == "X*C*(D'+B'+A)"
+    r = random.Random(7)
+    for _ in range(1000):
+        e = _aleatoria(r, 4)
+        final, _ = logic.reescribir(e, traza=False)
+        assert not _unarios(final), logic.representar(e)
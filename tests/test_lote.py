@@ -0,0 +1,21 @@
+import itertools
+import json
+import threading
+
+import lote
+
+
+def test_cerrar_el_generador_termina_el_pool():
+    # una entrada sin fin: si el pool no se pudiera terminar, close() no volvería
+    items = ((n, "A*B + A*B'") for n in itertools.count(1))
+    hecho = threading.Event()
+
+    def consumir():
+        lineas = lote.resultados(items, {"pasos": False}, procesos=2, chunk=4)
+        assert json.loads(next(lineas))["final"] == "A"
+        lineas.close()
+        hecho.set()
+
+    hilo = threading.Thread(target=consumir, daemon=True)
+    hilo.start()
+    assert hecho.wait(30)
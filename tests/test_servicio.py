@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+import servicio
+
+
+def _con_servicio(prueba, **opciones):
+    async def principal():
+        s = servicio.Servicio(1, **opciones)
+        puerto = await s.iniciar("127.0.0.1", 0)
+        c = servicio.Cliente("127.0.0.1", puerto)
+        try:
+            return await asyncio.wait_for(prueba(s, c), 60)
+        finally:
+            await c.cerrar()
+            await s.cerrar()
+
+    return asyncio.run(principal())
+
+
+def test_pool_roto_se_recrea():
+    async def prueba(s, c):
+        # un proceso del pool muere: el lote que lo descubre falla con 500 y
+        # las peticiones siguientes van a un pool nuevo
+        try:
+            await asyncio.get_running_loop().run_in_executor(s._pool, os._exit, 1)
+        except Exception:
+            pass
+        estado, _ = await c.simplificar("A+A")
+        assert estado in (200, 500)
+        assert await c.simplificar("A*A'") == (200, {"entrada": "A*A'", "final": "0"})
+
+    _con_servicio(prueba)
+
+
+def test_lote_que_no_cabe_no_encola_nada():
+    async def prueba(s, c):
+        estado, datos = await c.pedir("POST", "/simplificar", {"expresiones": ["A+A"] * 5})
+        assert (estado, datos) == (503, {"error": "cola llena"})
+        assert s._cola.qsize() == 0
+        assert (await c.pedir("POST", "/simplificar", {"expresiones": ["A+A"] * 4}))[0] == 200
+
+    _con_servicio(prueba, max_cola=4)
+
+
+def test_lote_fallido_cancela_el_resto():
+    async def prueba(s, c):
+        # el agrupador no llega a sacar nada de la cola: la primera expresión
+        # falla y las demás, aún en cola, quedan canceladas
+        s._agrupador.cancel()
+        tarea = asyncio.ensure_future(s.simplificar_varias(["A", "B", "C"]))
+        await asyncio.sleep(0)
+        _, primero = s._cola.get_nowait()
+        primero.set_exception(RuntimeError("fallo"))
+        try:
+            await tarea
+        except RuntimeError:
+            pass
+        restantes = [s._cola.get_nowait()[1] for _ in range(s._cola.qsize())]
+        assert len(restantes) == 2 and all(f.cancelled() for f in restantes)
+
+    _con_servicio(prueba)
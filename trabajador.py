@@ -0,0 +1,98 @@
+# Trabajador en segundo plano para la interfaz: las simplificaciones corren en
+# un hilo aparte y la ventana recoge los resultados desde su bucle con after(),
+# así una expresión pesada no congela la ventana. Solo cuenta la última
+# petición: al enviar otra, la anterior se cancela y su resultado se descarta.
+# En modo "pasos" la Traza se entrega en cuanto se crea (estado "parcial"),
+# para que la ventana vaya mostrando los pasos mientras el motor sigue.
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import logic
+import perfilado
+from UI_logic import UILogic
+
+# tiempo máximo por petición, en segundos
+LIMITE_SEGUNDOS = 10.0
+
+
+class TrabajadorSimplificacion:
+    def __init__(self, limite_segundos=LIMITE_SEGUNDOS):
+        self.limite_segundos = limite_segundos
+        self._ejecutor = ThreadPoolExecutor(max_workers=1)
+        self._resultados = queue.Queue()
+        self._candado = threading.Lock()
+        self._evento = threading.Event()
+        self.ultimo_id = 0
+        # con perfilar=True cada petición se mide con perfilado.perfilar()
+        self.perfilar = False
+
+    def enviar(self, expr, modo):
+        # modo: "pasos", "final" o "previa"; devuelve el id de la petición
+        with self._candado:
+            self._evento.set()
+            self._evento = threading.Event()
+            self.ultimo_id += 1
+            ident, evento = self.ultimo_id, self._evento
+        self._ejecutor.submit(self._ejecutar, ident, expr, modo, evento)
+        return ident
+
+    def cancelar(self):
+        with self._candado:
+            self._evento.set()
+
+    def _ejecutar(self, ident, expr, modo, evento):
+        limite = time.monotonic() + self.limite_segundos
+
+        def detener():
+            if evento.is_set():
+                return "cancelado"
+            if time.monotonic() > limite:
+                return "tiempo agotado"
+            return None
+
+        perfil = None
+        try:
+            motivo = detener()
+            if motivo:
+                raise logic.Cancelado(motivo)
+            if self.perfilar:
+                with perfilado.perfilar() as perfil:
+                    estado, datos = self._calcular(ident, expr, modo, detener)
+            else:
+                estado, datos = self._calcular(ident, expr, modo, detener)
+        except logic.Cancelado as motivo:
+            estado, datos = str(motivo), None
+        except Exception as err:
+            estado, datos = "error", str(err)
+        self._resultados.put((ident, modo, estado, datos, perfil))
+
+    def _calcular(self, ident, expr, modo, detener):
+        valido, msg = UILogic.validar(expr)
+        if not valido:
+            return "error", msg
+        if modo == "pasos":
+            def observar(traza):
+                self._resultados.put((ident, modo, "parcial", traza, None))
+            return "ok", UILogic.simplificar_pasos(expr, detener, observar)
+        return "ok", UILogic.simplificar_final(expr, detener)
+
+    def recoger(self):
+        # resultados vigentes ya terminados: [(modo, estado, datos, perfil)],
+        # donde estado es "ok", "error", "cancelado" o "tiempo agotado" y
+        # perfil es un perfilado.Estadisticas o None si no se perfiló. Con
+        # estado "parcial", datos es la Traza que el motor sigue llenando (la
+        # petición aún no ha terminado: después llega su resultado)
+        listos = []
+        while True:
+            try:
+                ident, modo, estado, datos, perfil = self._resultados.get_nowait()
+            except queue.Empty:
+                return listos
+            if ident == self.ultimo_id:
+                listos.append((modo, estado, datos, perfil))
+
+    def cerrar(self):
+        self.cancelar()
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,189 @@
+# Vista de los pasos en el cuadro de resultados, pensada para derivaciones
+# largas y expresiones grandes:
+#   - paginada: solo se escriben los POR_PAGINA pasos de la página actual (los
+#     Paso de una Traza se generan al leerlos, así que los del resto de
+#     páginas ni siquiera se construyen);
+#   - abreviada: en una expresión de más de MAX_CARACTERES caracteres los
+#     paréntesis más largos se muestran como (…); un clic en la línea la
+#     escribe completa;
+#   - progresiva: con una Traza que el motor sigue llenando, la página se
+#     completa cada INTERVALO_MS con los pasos que van llegando.
+import bisect
+
+import customtkinter as ctk
+from theme import COLORES, ESTILO_CONFIG
+
+# pasos escritos a la vez en el cuadro
+POR_PAGINA = 50
+# longitud a partir de la cual se abrevia una expresión
+MAX_CARACTERES = 160
+# cada cuánto se miran los pasos nuevos mientras el motor sigue (ms)
+INTERVALO_MS = 100
+RESUMEN = "(…)"
+
+
+def abreviar(texto, maximo=MAX_CARACTERES):
+    # sustituye los grupos entre paréntesis más largos por (…) hasta que el
+    # texto quepa en `maximo`; si aún no cabe (sumas planas muy anchas) se
+    # recorta por el medio
+    if len(texto) <= maximo:
+        return texto
+    grupos, abiertos = [], []
+    for i, c in enumerate(texto):
+        if c == "(":
+            abiertos.append(i)
+        elif c == ")" and abiertos:
+            grupos.append((abiertos.pop(), i))
+    # del más largo al más corto: un grupo que contiene a otro ya elegido
+    # sería más largo, así que basta con saltar los que quedan dentro. Un
+    # grupo que dejaría el texto en menos de la mitad de `maximo` (por
+    # ejemplo, uno que lo envuelve entero) se salta para abreviar sus partes
+    grupos.sort(key=lambda g: g[0] - g[1])
+    inicios, elegidos = [], []
+    ahorro, falta = 0, len(texto) - maximo
+    for a, b in grupos:
+        if ahorro >= falta or b - a + 1 <= len(RESUMEN):
+            break
+        if len(texto) - ahorro - (b - a + 1 - len(RESUMEN)) < maximo // 2:
+            continue
+        k = bisect.bisect(inicios, a)
+        if k and elegidos[k - 1][1] > a:
+            continue
+        inicios.insert(k, a)
+        elegidos.insert(k, (a, b))
+        ahorro += b - a + 1 - len(RESUMEN)
+    partes, pos = [], 0
+    for a, b in elegidos:
+        partes.append(texto[pos:a])
+        partes.append(RESUMEN)
+        pos = b + 1
+    partes.append(texto[pos:])
+    res = "".join(partes)
+    if len(res) > maximo:
+        mitad = (maximo - 3) // 2
+        res = res[:mitad] + " … " + res[-mitad:]
+    return res
+
+
+def linea(k, paso, completa=False):
+    # (texto de la línea del paso k, si se abrevió)
+    antes, ley, despues = paso[0], paso[1], paso[2]
+    if not completa:
+        antes, despues = abreviar(antes), abreviar(despues)
+    return f"{k + 1}. {antes}  --[{ley}]→  {despues}\n", antes is not paso[0] or despues is not paso[2]
+
+
+class VistaPasos:
+    def __init__(self, padre, texto):
+        # texto: el CTkTextbox donde se escriben los pasos; la barra de
+        # páginas se coloca encima de él solo mientras hay pasos a la vista
+        self.texto = texto
+        self.barra = ctk.CTkFrame(padre, fg_color="transparent")
+        self.btn_anterior = ctk.CTkButton(self.barra, text="◀", width=40, command=lambda: self.ir(self.pagina - 1),
+                                          **ESTILO_CONFIG["CTkButton_op"])
+        self.btn_anterior.pack(side="left", padx=5)
+        self.etiqueta = ctk.CTkLabel(self.barra, text="", **ESTILO_CONFIG["CTkLabel_body"])
+        self.etiqueta.pack(side="left", padx=10)
+        self.btn_siguiente = ctk.CTkButton(self.barra, text="▶", width=40, command=lambda: self.ir(self.pagina + 1),
+                                           **ESTILO_CONFIG["CTkButton_op"])
+        self.btn_siguiente.pack(side="left", padx=5)
+        texto.tag_config("abreviado", foreground=COLORES["btn_clear_bg"])
+        texto.tag_bind("abreviado", "<Button-1>", self._expandir)
+        self.pasos = None
+        self.pagina = 0
+        self.escritos = 0  # líneas de la página actual ya en el cuadro
+        self.en_curso = False
+        self.expandidos = set()
+        self._pendiente = None
+
+    def mostrar(self, pasos, en_curso=False):
+        # pasos: Traza o lista de Paso. Con en_curso=True la Traza aún crece y
+        # se vuelve a mirar cada INTERVALO_MS hasta que llegue el resultado
+        # final (la misma Traza, ya completa, con en_curso=False)
+        if pasos is not self.pasos:
+            self.pasos = pasos
+            self.pagina = 0
+            self.expandidos = set()
+            self._vaciar()
+            if not self.barra.winfo_ismapped():
+                self.barra.pack(fill="x", padx=10, pady=(10, 0), before=self.texto)
+        self.en_curso = en_curso
+        self._actualizar()
+        if en_curso and self._pendiente is None:
+            self._pendiente = self.texto.after(INTERVALO_MS, self._revisar)
+
+    def ocultar(self):
+        self._cancelar_revision()
+        self.pasos = None
+        self.en_curso = False
+        self.barra.pack_forget()
+
+    def ir(self, pagina):
+        if self.pasos is None:
+            return
+        ultima = max(len(self.pasos) - 1, 0) // POR_PAGINA
+        pagina = min(max(pagina, 0), ultima)
+        if pagina != self.pagina:
+            self.pagina = pagina
+            self._vaciar()
+            self._actualizar()
+            self.texto.yview("moveto", 0)
+
+    def _revisar(self):
+        self._pendiente = None
+        if self.en_curso and self.pasos is not None:
+            self._actualizar()
+            self._pendiente = self.texto.after(INTERVALO_MS, self._revisar)
+
+    def _cancelar_revision(self):
+        if self._pendiente is not None:
+            self.texto.after_cancel(self._pendiente)
+            self._pendiente = None
+
+    def _vaciar(self):
+        self.escritos = 0
+        self.texto.configure(state="normal")
+        self.texto.delete("1.0", "end")
+        self.texto.configure(state="disabled")
+
+    def _actualizar(self):
+        # añade al cuadro los pasos de la página que aún no estaban escritos
+        # (un insert por tramo, no por paso) y actualiza la barra
+        total = len(self.pasos)
+        inicio = self.pagina * POR_PAGINA
+        fin = min(total, inicio + POR_PAGINA)
+        if inicio + self.escritos < fin:
+            self.texto.configure(state="normal")
+            tramo = []
+            for k, paso in enumerate(self.pasos[inicio + self.escritos:fin], inicio + self.escritos):
+                texto, abreviada = linea(k, paso, k in self.expandidos)
+                if abreviada:
+                    if tramo:
+                        self.texto.insert("end", "".join(tramo))
+                        tramo = []
+                    self.texto.insert("end", texto, ("abreviado", f"paso{k}"))
+                else:
+                    tramo.append(texto)
+            if tramo:
+                self.texto.insert("end", "".join(tramo))
+            self.texto.configure(state="disabled")
+            self.escritos = fin - inicio
+        if total:
+            estado = f"Pasos {inicio + 1}–{fin} de {total}"
+        else:
+            estado = "Sin pasos todavía"
+        self.etiqueta.configure(text=estado + (" (calculando…)" if self.en_curso else ""))
+        self.btn_anterior.configure(state="normal" if self.pagina > 0 else "disabled")
+        self.btn_siguiente.configure(state="normal" if fin < total else "disabled")
+
+    def _expandir(self, event=None):
+        # clic en una línea abreviada: se reescribe la página con ella entera,
+        # sin mover la vista
+        for tag in self.texto.tag_names("current"):
+            if tag.startswith("paso"):
+                self.expandidos.add(int(tag[4:]))
+                posicion = self.texto.yview()[0]
+                self._vaciar()
+                self._actualizar()
+                self.texto.yview("moveto", posicion)
+                return